@@ -0,0 +1,215 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import asyncio
+import logging
+from LLM.flashCard_genrator import FlashcardGenerator, MIN_INPUT_LENGTH
+from LLM.cards import Flashcard
+
+logger = logging.getLogger(__name__)
+
+class _WorkItem:
+    """One chunk prompt waiting for the inference worker"""
+    __slots__ = ('prompt_ids', 'num_cards', 'future')
+
+    def __init__(self, prompt_ids: List[int], num_cards: int, future: asyncio.Future):
+        self.prompt_ids = prompt_ids
+        self.num_cards = num_cards
+        self.future = future
+
+class AsyncFlashcardGenerator:
+    """
+    Non-blocking front end for FlashcardGenerator.
+    Chunk prompts from all concurrent requests go into a bounded queue. A
+    background worker collects them for up to batch_window seconds (or until
+    max_batch_size prompts are waiting), runs them through a single
+    model.generate call on a dedicated inference thread and resolves each
+    request's futures. A full queue makes callers wait (backpressure), and
+    cancelling a request drops its prompts that have not started yet.
+
+    The wrapped interface must be a FlanT5Interface (or subclass).
+    """
+
+    def __init__(self,
+                 generator: Optional[FlashcardGenerator] = None,
+                 max_batch_size: int = 8,
+                 batch_window: float = 0.02,
+                 max_queue_size: int = 64):
+        self.generator = generator or FlashcardGenerator()
+        self.llm = self.generator.llm
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = batch_window
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Single thread so model calls never overlap and the event loop stays free;
+        # created by start() and shut down by close(), so the generator can be reused
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.batches_run = 0
+        self.prompts_run = 0
+
+    async def start(self):
+        """Start the inference worker on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flashcard-inference")
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = loop.create_task(self._run_worker())
+
+    async def close(self):
+        """Stop the worker; prompts still queued are cancelled"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                item.future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def generate_from_text(self,
+                                 text: str,
+                                 num_cards: int = 20,
+                                 difficulty: str = "Mixed") -> List[Flashcard]:
+        """Generate flashcards from input text without blocking the event loop"""
+        await self.start()
+        loop = asyncio.get_running_loop()
+
+        if len(text.strip()) < MIN_INPUT_LENGTH:
+            logger.warning("Input text too short for flashcard generation.")
+            return []
+
+        try:
+            cleaned_text = self.generator._preprocess_text(text)
+            if not cleaned_text.strip():
+                logger.warning("Empty text after preprocessing")
+                return []
+
+            # Tokenizer work stays off the event loop too
+            chunks = await loop.run_in_executor(None, self.llm._chunk_text, cleaned_text)
+            if not chunks:
+                return []
+            cards_per_chunk = max(1, num_cards // len(chunks))
+            targets = [cards_per_chunk] * len(chunks)
+            targets[-1] = max(num_cards - cards_per_chunk * (len(chunks) - 1), 1)
+
+            results = await asyncio.gather(*[
+                self._generate_chunk(chunk, target) for chunk, target in zip(chunks, targets)
+            ])
+            flashcards = []
+            for chunk_id, chunk_cards in enumerate(results):
+                for card in chunk_cards:
+                    card.chunk = chunk_id
+                flashcards.extend(chunk_cards)
+            flashcards = flashcards[:num_cards]
+
+            if not flashcards:
+                logger.warning("Model returned no flashcards.")
+                return []
+            return await loop.run_in_executor(
+                None, self.generator._postprocess_flashcards, flashcards, difficulty, text
+            )
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating flashcards: {e}")
+            return []
+
+    async def _generate_chunk(self, chunk: str, num_cards: int) -> List[Flashcard]:
+        """Queue one chunk and wait for its parsed cards"""
+        metrics = self.llm.metrics
+        key = self.llm._cache_key(chunk, num_cards)
+        if key is not None:
+            cached = self.llm.cache.get(key)
+            if cached is not None:
+                metrics.count('cache_hits')
+                return cached
+            metrics.count('cache_misses')
+
+        # Tokenization, like chunking, runs off the event loop
+        prompt_ids, _ = await self._loop.run_in_executor(None, self.llm.prompt_builder.build, chunk, num_cards)
+        future = self._loop.create_future()
+        # Waits here while the queue is full
+        await self._queue.put(_WorkItem(prompt_ids, num_cards, future))
+        try:
+            samples = await future
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        with metrics.timer('parse'):
+            flashcards = self.llm._parse_samples(samples)
+        metrics.observe('cards_parsed_per_chunk', len(flashcards))
+        if key is not None:
+            self.llm.cache.put(key, flashcards)
+        return flashcards
+
+    async def _collect_batch(self) -> List[_WorkItem]:
+        """Wait for one prompt, then gather more until the window closes or the batch is full"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_worker(self):
+        while True:
+            batch = await self._collect_batch()
+            # Skip prompts whose requests were cancelled while queued
+            live = [item for item in batch if not item.future.done()]
+            if not live:
+                continue
+            try:
+                responses = await self._loop.run_in_executor(
+                    self._executor, self.llm._generate_batch,
+                    [item.prompt_ids for item in live], [item.num_cards for item in live]
+                )
+            except asyncio.CancelledError:
+                for item in live:
+                    item.future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Error in batched generation: {e}")
+                for item in live:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.prompts_run += len(live)
+            metrics = self.llm.metrics
+            metrics.observe('batch_size', len(live))
+            # Prompts left waiting once this batch is done
+            metrics.observe('queue_depth', self._queue.qsize())
+            for item, response in zip(live, responses):
+                if not item.future.done():
+                    item.future.set_result(response)
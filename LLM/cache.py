@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any
+from pathlib import Path
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from LLM.cards import Flashcard, FIELDS, card_rows
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    Content-addressed cache of parsed flashcards per chunk.
+    Lookups go through an in-memory LRU first and then, when a path is given,
+    a SQLite file that persists across runs. The disk tier is evicted by least
+    recent access once it grows past max_disk_bytes.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 memory_entries: int = 512,
+                 max_disk_bytes: int = 64 * 1024 * 1024):
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        # Cards are held as (question, answer, difficulty) tuples and handed out as fresh Flashcards
+        self._memory: "OrderedDict[str, List[tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+        self._db = None
+        self._disk_bytes = 0
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_access ON results(last_access)")
+            self._db.commit()
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    @staticmethod
+    def make_key(chunk_text: str, model_name: str, params: Dict[str, Any], prompt_version: str) -> str:
+        """Hash of everything that determines the cards generated for a chunk"""
+        payload = json.dumps({
+            'text': chunk_text,
+            'model': model_name,
+            'params': params,
+            'prompt_version': prompt_version
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Flashcard]]:
+        """Cached cards for a key, or None"""
+        with self._lock:
+            cards = self._memory.get(key)
+            if cards is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return [Flashcard(*row) for row in cards]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    cards = list(card_rows(json.loads(row[0])))
+                    self._remember(key, cards)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return [Flashcard(*row) for row in cards]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, cards: List[Flashcard]):
+        """Store the cards generated for a key"""
+        cards = list(card_rows(cards))
+        with self._lock:
+            self._remember(key, cards)
+            if self._db is None:
+                return
+            value = json.dumps([dict(zip(FIELDS, row)) for row in cards],
+                               ensure_ascii=False)
+            size = len(value.encode('utf-8'))
+            old = self._db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._disk_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def _remember(self, key: str, cards: List[tuple]):
+        self._memory[key] = cards
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Drop least recently used disk entries until under the size limit"""
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM results ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._disk_bytes -= size
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and sizes"""
+        with self._lock:
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+                'disk_bytes': self._disk_bytes
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+                self._disk_bytes = 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
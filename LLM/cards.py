@@ -0,0 +1,196 @@
+from array import array
+from typing import List, Dict, Iterable, Iterator, Callable, Union, Any, Tuple
+
+# The fields of the dict-style card API, in export order
+FIELDS = ('question', 'answer', 'difficulty')
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard')
+
+# Source chunk of a card that did not come from the chunker (e.g. loaded from a file)
+NO_CHUNK = -1
+
+CardLike = Union['Flashcard', Dict[str, str]]
+
+class Flashcard:
+    """
+    One flashcard. Slotted, so a card costs a fraction of a dict, but it
+    still answers the dict-style API (card['question'], card.get('answer'),
+    dict(card)) used throughout the generator, the exporters and the UI.
+    chunk is the index of the source chunk the card was generated from.
+    """
+
+    __slots__ = ('question', 'answer', 'difficulty', 'chunk')
+
+    def __init__(self, question: str, answer: str = '', difficulty: str = 'Medium', chunk: int = NO_CHUNK):
+        self.question = question
+        self.answer = answer
+        self.difficulty = difficulty
+        self.chunk = chunk
+
+    @classmethod
+    def from_dict(cls, card: CardLike) -> 'Flashcard':
+        """A Flashcard for a dict-style card (Flashcards are returned as they are)"""
+        if isinstance(card, cls):
+            return card
+        return cls(card.get('question', ''), card.get('answer', ''), card.get('difficulty', 'Medium'),
+                   card.get('chunk', NO_CHUNK))
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELDS
+
+    def values(self) -> List[str]:
+        return [self.question, self.answer, self.difficulty]
+
+    def items(self) -> List[Tuple[str, str]]:
+        return list(zip(FIELDS, self.values()))
+
+    def __getitem__(self, key: str) -> str:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: str):
+        if key not in FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in FIELDS else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'question': self.question, 'answer': self.answer, 'difficulty': self.difficulty}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Flashcard, dict)):
+            return self.to_dict() == {field: other.get(field) for field in FIELDS} and len(other) == len(FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Flashcard(question={self.question!r}, answer={self.answer!r}, difficulty={self.difficulty!r})"
+
+class Deck:
+    """
+    Columnar list of flashcards. Questions and answers are kept as two
+    string lists and difficulty and source chunk as compact arrays (one
+    byte and four bytes per card), so a large deck holds no per-card
+    objects. Indexing and iteration hand out Flashcard views built on
+    demand; slicing and filter() return new decks that share the strings.
+    """
+
+    def __init__(self, cards: Iterable[CardLike] = ()):
+        self.questions: List[str] = []
+        self.answers: List[str] = []
+        # Difficulty codes index into levels; unknown difficulty names are added as they appear
+        self.levels: List[str] = list(DIFFICULTIES)
+        self.difficulties = array('B')
+        self.chunks = array('i')
+        self.extend(cards)
+
+    def _level(self, difficulty: str) -> int:
+        try:
+            return self.levels.index(difficulty)
+        except ValueError:
+            self.levels.append(difficulty)
+            return len(self.levels) - 1
+
+    def append(self, card: CardLike):
+        if isinstance(card, Flashcard):
+            question, answer, difficulty, chunk = card.question, card.answer, card.difficulty, card.chunk
+        else:
+            question, answer = card['question'], card.get('answer', '')
+            difficulty, chunk = card.get('difficulty', 'Medium'), card.get('chunk', NO_CHUNK)
+        self.questions.append(question)
+        self.answers.append(answer)
+        self.difficulties.append(self._level(difficulty))
+        self.chunks.append(chunk)
+
+    def extend(self, cards: Iterable[CardLike]):
+        if isinstance(cards, Deck):
+            levels = [self._level(level) for level in cards.levels]
+            self.questions.extend(cards.questions)
+            self.answers.extend(cards.answers)
+            self.difficulties.extend(levels[code] for code in cards.difficulties)
+            self.chunks.extend(cards.chunks)
+            return
+        for card in cards:
+            self.append(card)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def _card(self, i: int) -> Flashcard:
+        return Flashcard(self.questions[i], self.answers[i], self.levels[self.difficulties[i]], self.chunks[i])
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Flashcard, 'Deck']:
+        if isinstance(key, slice):
+            return self._take(range(*key.indices(len(self))))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('deck index out of range')
+        return self._card(key)
+
+    def __setitem__(self, i: int, card: CardLike):
+        card = Flashcard.from_dict(card)
+        self.questions[i] = card.question
+        self.answers[i] = card.answer
+        self.difficulties[i] = self._level(card.difficulty)
+        self.chunks[i] = card.chunk
+
+    def __iter__(self) -> Iterator[Flashcard]:
+        levels = self.levels
+        for question, answer, level, chunk in zip(self.questions, self.answers, self.difficulties, self.chunks):
+            yield Flashcard(question, answer, levels[level], chunk)
+
+    def rows(self) -> Iterator[Tuple[str, str, str]]:
+        """(question, answer, difficulty) tuples, straight from the columns"""
+        levels = self.levels
+        return zip(self.questions, self.answers, (levels[level] for level in self.difficulties))
+
+    def _take(self, indices: Iterable[int]) -> 'Deck':
+        deck = Deck()
+        deck.levels = list(self.levels)
+        for i in indices:
+            deck.questions.append(self.questions[i])
+            deck.answers.append(self.answers[i])
+            deck.difficulties.append(self.difficulties[i])
+            deck.chunks.append(self.chunks[i])
+        return deck
+
+    def filter(self, keep: Union[Callable[[Flashcard], bool], Iterable[bool]]) -> 'Deck':
+        """Cards for which keep(card) is true, or where a boolean mask is true"""
+        if callable(keep):
+            mask = (keep(card) for card in self)
+        else:
+            mask = keep
+        return self._take(i for i, flag in enumerate(mask) if flag)
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        return [{'question': q, 'answer': a, 'difficulty': d} for q, a, d in self.rows()]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Deck, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Deck({len(self)} cards)"
+
+def card_rows(flashcards: Iterable[CardLike]) -> Iterator[Tuple[str, str, str]]:
+    """(question, answer, difficulty) of each card, without per-card objects for a Deck"""
+    if isinstance(flashcards, Deck):
+        return flashcards.rows()
+    return ((card['question'], card.get('answer', ''), card.get('difficulty', 'Medium')) for card in flashcards)
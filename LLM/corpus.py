@@ -0,0 +1,204 @@
+from typing import List, Dict, Optional, Callable, Iterator
+from pathlib import Path
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from LLM.export import FlashcardExporter, FORMATS
+
+logger = logging.getLogger(__name__)
+
+CORPUS_EXTENSIONS = ('.txt', '.md')
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+def find_corpus_files(source: str) -> List[Path]:
+    """Text files under a directory, matching a glob, or a single file"""
+    path = Path(source)
+    if path.is_dir():
+        files = [p for p in path.rglob('*') if p.is_file() and p.suffix.lower() in CORPUS_EXTENSIONS]
+    elif path.is_file():
+        files = [path]
+    else:
+        files = [Path(p) for p in glob.glob(source, recursive=True)
+                 if Path(p).is_file() and Path(p).suffix.lower() in CORPUS_EXTENSIONS]
+    return sorted(files)
+
+# Per-process generator, created once by the pool initializer
+_worker_generator = None
+
+def _init_worker(threads: int, generator_kwargs: Dict):
+    """Pool initializer: build this process's generator once"""
+    global _worker_generator
+    from LLM.flashCard_genrator import load_worker_generator
+    _worker_generator = load_worker_generator(threads, generator_kwargs)
+
+def _process_file(task: Dict) -> Dict:
+    """Generate one deck and write it; runs inside a worker"""
+    start = time.perf_counter()
+    result = {'key': task['key'], 'path': task['path'], 'output': task['output'], 'cards': 0, 'error': None}
+    try:
+        flashcards = _worker_generator.generate_from_file(task['path'], task['num_cards'], task['difficulty'])
+        if flashcards:
+            Path(task['output']).parent.mkdir(parents=True, exist_ok=True)
+            result['cards'] = FlashcardExporter.stream_to_file(flashcards, task['output'], task['format'])
+        else:
+            result['error'] = _worker_generator.last_error or "No flashcards generated"
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+class CorpusRunner:
+    """
+    Generate decks for many files with a pool of worker processes.
+    Every worker loads the model once and gets an even share of the CPU cores
+    for torch. Completed files are appended to a manifest, so an interrupted
+    run picks up where it stopped. With merge=True the per-file decks are
+    kept as JSON parts and combined into a single deck at the end, with
+    near-duplicates removed across the whole corpus.
+    """
+
+    def __init__(self,
+                 files: List[Path],
+                 output: str,
+                 fmt: str = 'csv',
+                 num_cards: int = 20,
+                 difficulty: str = 'Mixed',
+                 workers: int = 1,
+                 merge: bool = False,
+                 root: Optional[str] = None,
+                 generator_kwargs: Optional[Dict] = None,
+                 dedup_threshold: Optional[float] = 0.6):
+        self.files = files
+        self.fmt = fmt
+        self.num_cards = num_cards
+        self.difficulty = difficulty
+        self.workers = max(1, workers)
+        self.merge = merge
+        self.root = Path(root) if root and Path(root).is_dir() else None
+        self.generator_kwargs = dict(generator_kwargs or {})
+        self.generator_kwargs.setdefault('near_duplicate_threshold', dedup_threshold)
+        self.dedup_threshold = dedup_threshold
+
+        # Per-file decks go into the output directory, or next to the merged deck
+        self.output = Path(output)
+        self.deck_dir = Path(str(output) + '.parts') if merge else self.output
+        self.manifest_path = self.deck_dir / MANIFEST_NAME
+
+    def _deck_path(self, path: Path) -> Path:
+        """Where the deck for one input file goes"""
+        relative = path.relative_to(self.root) if self.root else Path(path.name)
+        if self.merge:
+            # Parts are always JSON so they can be read back for merging
+            return (self.deck_dir / relative).with_suffix('.json')
+        return (self.deck_dir / relative).with_suffix(FORMATS[self.fmt][0])
+
+    def _key(self, path: Path) -> str:
+        """
+        Manifest key of an input file: its path relative to the corpus root,
+        or its absolute path without one, so a resumed run recognises the file
+        however the corpus was named on the command line
+        """
+        resolved = path.resolve()
+        if self.root:
+            try:
+                return resolved.relative_to(self.root.resolve()).as_posix()
+            except ValueError:
+                pass
+        return str(resolved)
+
+    def completed(self) -> Dict[str, Dict]:
+        """Manifest entries of files already done, keyed by _key"""
+        done = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if not entry.get('error'):
+                            done[entry.get('key') or self._key(Path(entry['path']))] = entry
+        return done
+
+    def _tasks(self, done: Dict[str, Dict]) -> List[Dict]:
+        return [{
+            'key': self._key(path),
+            'path': str(path),
+            'output': str(self._deck_path(path)),
+            'format': 'json' if self.merge else self.fmt,
+            'num_cards': self.num_cards,
+            'difficulty': self.difficulty
+        } for path in self.files if self._key(path) not in done]
+
+    def _results(self, tasks: List[Dict]) -> Iterator[Dict]:
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        if self.workers == 1:
+            _init_worker(threads, self.generator_kwargs)
+            for task in tasks:
+                yield _process_file(task)
+            return
+
+        # spawn: forking a process that already initialised torch is unsafe
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(self.workers, initializer=_init_worker,
+                          initargs=(threads, self.generator_kwargs)) as pool:
+            for result in pool.imap_unordered(_process_file, tasks):
+                yield result
+
+    def run(self, progress: Optional[Callable[[Dict, Dict], None]] = None) -> Dict:
+        """
+        Process every file not yet in the manifest.
+        progress(result, stats) is called after each file.
+        """
+        self.deck_dir.mkdir(parents=True, exist_ok=True)
+        done = self.completed()
+        tasks = self._tasks(done)
+        logger.info(f"{len(self.files)} files, {len(done)} already done, {len(tasks)} to process")
+
+        stats = {'files': 0, 'cards': 0, 'failed': 0, 'skipped': len(done),
+                 'files_per_minute': 0.0, 'cards_per_minute': 0.0}
+        start = time.perf_counter()
+        with open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+            for result in self._results(tasks):
+                manifest.write(json.dumps(result, ensure_ascii=False) + '\n')
+                manifest.flush()
+                if result['error']:
+                    stats['failed'] += 1
+                else:
+                    stats['files'] += 1
+                    stats['cards'] += result['cards']
+                minutes = (time.perf_counter() - start) / 60
+                if minutes > 0:
+                    stats['files_per_minute'] = (stats['files'] + stats['failed']) / minutes
+                    stats['cards_per_minute'] = stats['cards'] / minutes
+                if progress:
+                    progress(result, stats)
+
+        stats['seconds'] = time.perf_counter() - start
+        if self.merge:
+            stats['merged_cards'] = self._merge()
+        return stats
+
+    def _merge(self) -> int:
+        """Combine every completed part, in input order, into the output deck"""
+        done = self.completed()
+        detector = None
+        if self.dedup_threshold:
+            from LLM.dedup import NearDuplicateDetector
+            detector = NearDuplicateDetector(self.dedup_threshold)
+
+        def cards():
+            for path in self.files:
+                entry = done.get(self._key(path))
+                if entry is None:
+                    continue
+                with open(entry['output'], 'r', encoding='utf-8') as f:
+                    for card in json.load(f)['flashcards']:
+                        if detector is None or detector.add(card):
+                            yield card
+
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        return FlashcardExporter.stream_to_file(cards(), str(self.output), self.fmt)
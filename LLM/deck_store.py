@@ -0,0 +1,200 @@
+from typing import List, Dict, Optional, Iterable, Any, Union
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from LLM.cards import Deck, Flashcard, CardLike, card_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DECK_STORE = Path(os.environ.get(
+    "FLASHCARD_DECK_STORE", Path.home() / ".cache" / "flashcard-generator" / "decks.db"
+))
+
+# Bytes hashed per read when fingerprinting a source file
+HASH_BLOCK = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY,
+    source_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    name TEXT NOT NULL,
+    card_count INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS decks_source ON decks(source_hash, params);
+CREATE TABLE IF NOT EXISTS cards (
+    id INTEGER PRIMARY KEY,
+    deck_id INTEGER NOT NULL REFERENCES decks(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    difficulty TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cards_deck ON cards(deck_id, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+    question, answer, content='cards', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS cards_ai AFTER INSERT ON cards BEGIN
+    INSERT INTO cards_fts(rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS cards_ad AFTER DELETE ON cards BEGIN
+    INSERT INTO cards_fts(cards_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+END;
+"""
+
+def hash_text(text: str) -> str:
+    """Fingerprint of a source document"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def hash_file(path: Union[str, Path]) -> str:
+    """Same fingerprint as hash_text() of the file's content, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def deck_params(llm, num_cards: int, difficulty: str, **extra) -> Dict[str, Any]:
+    """
+    The settings that decide which cards a source produces; part of a deck's
+    identity. The model interface's own settings are the ones its result
+    cache keys on.
+    """
+    from LLM.prompt_builder import PROMPT_VERSION
+    params = {
+        'model': getattr(llm, 'model_name', None),
+        'backend': getattr(llm, 'backend', None),
+        'dtype': getattr(llm, 'dtype', None),
+        'samples': getattr(llm, 'samples_per_chunk', 1),
+        'prompt_version': PROMPT_VERSION
+    }
+    if hasattr(llm, 'output_settings'):
+        params.update(llm.output_settings())
+    params.update(num_cards=num_cards, difficulty=difficulty)
+    params.update(extra)
+    return params
+
+def _match_query(query: str) -> str:
+    """
+    FTS5 query matching every word of a plain search string. Words are
+    quoted so punctuation in user input is never parsed as query syntax;
+    the last word also matches as a prefix for search-as-you-type.
+    """
+    words = ['"%s"' % word.replace('"', '""') for word in query.split()]
+    if words:
+        words[-1] += '*'
+    return ' '.join(words)
+
+class DeckStore:
+    """
+    Persistent library of generated decks in SQLite.
+    Each deck is stored with the hash of its source document and the
+    generation parameters, so find_deck() can tell whether a source has
+    already been turned into cards with the same settings. Cards are indexed
+    with FTS5 (kept in sync by triggers) for ranked full-text search over
+    questions and answers.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_DECK_STORE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        # ORDER BY rank uses BM25 with questions weighted double
+        self._db.execute("INSERT INTO cards_fts(cards_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')")
+        self._db.commit()
+
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> str:
+        return json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+    def find_deck(self, source_hash: str, params: Dict[str, Any]) -> Optional[int]:
+        """ID of the deck generated from this source with these parameters, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT id FROM decks WHERE source_hash = ? AND params = ?",
+                                   (source_hash, self._params_key(params))).fetchone()
+        return row[0] if row else None
+
+    def add_deck(self,
+                 flashcards: Iterable[CardLike],
+                 source_hash: str,
+                 params: Dict[str, Any],
+                 name: str = 'Untitled deck') -> int:
+        """
+        Store a deck in one transaction and return its ID. A deck from the
+        same source and parameters is replaced.
+        """
+        rows = [(i,) + row for i, row in enumerate(card_rows(flashcards))]
+        params_key = self._params_key(params)
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM decks WHERE source_hash = ? AND params = ?", (source_hash, params_key))
+            deck_id = self._db.execute(
+                "INSERT INTO decks (source_hash, params, name, card_count, created) VALUES (?, ?, ?, ?, ?)",
+                (source_hash, params_key, name, len(rows), time.time())
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO cards (deck_id, position, question, answer, difficulty) VALUES (?, ?, ?, ?, ?)",
+                [(deck_id,) + row for row in rows]
+            )
+        logger.info(f"Stored deck {deck_id} ({name}) with {len(rows)} cards")
+        return deck_id
+
+    def cards(self, deck_id: int) -> Deck:
+        """Cards of a deck in their original order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT question, answer, difficulty FROM cards WHERE deck_id = ? ORDER BY position", (deck_id,)
+            ).fetchall()
+        return Deck(Flashcard(q, a, d) for q, a, d in rows)
+
+    def decks(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently stored decks first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, name, card_count, created, params FROM decks ORDER BY created DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{'id': i, 'name': name, 'cards': count, 'created': created, 'params': json.loads(params)}
+                for i, name, count, created, params in rows]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matching cards across all decks, by BM25 rank (questions weigh double)"""
+        match = _match_query(query)
+        if not match:
+            return []
+        with self._lock:
+            # Rank inside FTS5 first and join only the top rows
+            rows = self._db.execute(
+                "SELECT c.question, c.answer, c.difficulty, d.id, d.name FROM "
+                "(SELECT rowid, rank FROM cards_fts WHERE cards_fts MATCH ? ORDER BY rank LIMIT ?) AS hit "
+                "JOIN cards c ON c.id = hit.rowid JOIN decks d ON d.id = c.deck_id ORDER BY hit.rank",
+                (match, limit)
+            ).fetchall()
+        return [{'question': q, 'answer': a, 'difficulty': diff, 'deck_id': deck_id, 'deck': name}
+                for q, a, diff, deck_id, name in rows]
+
+    def delete_deck(self, deck_id: int):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM decks WHERE id = ?", (deck_id,))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            decks = self._db.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+            cards = self._db.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+        return {'decks': decks, 'cards': cards}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,147 @@
+from typing import List, Dict, Optional, Tuple, Iterable, Union
+import re
+import zlib
+
+import numpy as np
+
+from LLM.cards import Deck, CardLike
+
+# Character shingles suit short texts like flashcards better than word n-grams
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+KEEP_POLICIES = ('first', 'longest')
+
+# Jaccard similarity of character 5-gram sets above which two cards are merged.
+# Measured on hand-written flashcard pairs: rephrasings that keep most of the
+# wording ("Who led the Salt March?" / "Who led the Salt March in India?",
+# reordered answers, added or dropped words) score 0.6-0.75, rewordings with
+# new vocabulary ("What is photosynthesis?" / "Explain how plants make food")
+# score 0.2-0.55, and different facts on the same topic (Indian vs Pakistani
+# independence dates) reach 0.51. 0.6 merges the first group and never the
+# last; it misses the rewordings, which need embeddings rather than shingles.
+DEFAULT_THRESHOLD = 0.6
+
+def _bands_for(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows == num_perm whose S-curve midpoint is closest to threshold"""
+    best = None
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class NearDuplicateDetector:
+    """
+    Near-duplicate flashcard detector using MinHash signatures and LSH banding.
+    Each card (question + answer) is reduced to a MinHash signature of its
+    character shingles; signatures are split into bands and only cards sharing
+    a band bucket are compared, so adding a card costs roughly constant time
+    and a whole deck or corpus is processed in linear time. Candidates count
+    as duplicates when their estimated Jaccard similarity reaches threshold.
+
+    add() returns whether a card is new. With keep='longest' a duplicate with
+    a longer answer replaces the card it duplicates in kept (a stream that
+    already emitted the first card cannot take it back; read kept instead).
+    kept is a columnar Deck and the signatures share one growing array, so
+    a detector over a whole corpus holds no per-card objects.
+    """
+
+    def __init__(self,
+                 threshold: float = DEFAULT_THRESHOLD,
+                 num_perm: int = 64,
+                 keep: str = 'first',
+                 shingle_size: int = SHINGLE_SIZE,
+                 seed: int = 1):
+        if keep not in KEEP_POLICIES:
+            raise ValueError(f"keep must be one of {KEEP_POLICIES}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.keep = keep
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _bands_for(threshold, num_perm)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        # Band hash -> index of the card in kept, or a list of indices once several share it
+        self._buckets: List[Dict[int, Union[int, List[int]]]] = [{} for _ in range(self.bands)]
+        # Row i is the signature of kept[i]; capacity doubles as cards are added
+        self._signatures = np.empty((64, num_perm), dtype=np.uint32)
+        # Representative card for each group of near-duplicates, in first-seen order
+        self.kept = Deck()
+        self.duplicates = 0
+
+    def _shingles(self, text: str) -> np.ndarray:
+        text = re.sub(r'[^a-z0-9 ]+', '', re.sub(r'\s+', ' ', text.lower())).strip()
+        n = self.shingle_size
+        if len(text) <= n:
+            grams = {text}
+        else:
+            grams = {text[i:i + n] for i in range(len(text) - n + 1)}
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, card: CardLike) -> np.ndarray:
+        """MinHash signature of a card's question and answer"""
+        hashes = self._shingles(f"{card['question']} {card['answer']}")
+        # Universal hashing (a * h + b) mod p, one permutation per row; uint64 wrap-around is intended
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        # A hash collision only adds a candidate; candidates are compared in full
+        return [hash(signature[i * self.rows:(i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+
+    def find(self, card: CardLike, signature: Optional[np.ndarray] = None) -> Optional[int]:
+        """Index in kept of a near-duplicate of card, or None"""
+        if signature is None:
+            signature = self.signature(card)
+        checked = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key, ())
+            for idx in ((bucket,) if isinstance(bucket, int) else bucket):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                if np.mean(self._signatures[idx] == signature) >= self.threshold:
+                    return idx
+        return None
+
+    def add(self, card: CardLike) -> bool:
+        """Record a card; False if it near-duplicates one already seen"""
+        signature = self.signature(card)
+        match = self.find(card, signature)
+        if match is not None:
+            self.duplicates += 1
+            if self.keep == 'longest' and len(card['answer']) > len(self.kept.answers[match]):
+                self.kept[match] = card
+            return False
+
+        idx = len(self.kept)
+        self.kept.append(card)
+        if idx == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[idx] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is None:
+                self._buckets[band][key] = idx
+            elif isinstance(bucket, int):
+                self._buckets[band][key] = [bucket, idx]
+            else:
+                bucket.append(idx)
+        return True
+
+    def deduplicate(self, cards: Iterable[CardLike]) -> Deck:
+        """Cards with near-duplicates removed according to the keep policy"""
+        start = len(self.kept)
+        for card in cards:
+            self.add(card)
+        return self.kept[start:]
@@ -1,47 +1,309 @@
-import pandas as pd
 import json
 import csv
-from typing import List, Dict
+import hashlib
+import html
+import io
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+from itertools import islice
+from typing import Dict, Iterable, Iterator, BinaryIO, TextIO, Union
 from pathlib import Path
 
+from LLM.cards import CardLike, card_rows
+
+CSV_FIELDS = ['question', 'answer', 'difficulty']
+
+# Export format -> (file extension, MIME type)
+FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'json': ('.json', 'application/json'),
+    'anki': ('.csv', 'text/csv'),
+    'quizlet': ('.txt', 'text/plain'),
+    'apkg': ('.apkg', 'application/octet-stream')
+}
+
+GENERATED_BY = 'Flan-T5 Flashcard Generator'
+
+# Every writer below consumes an iterable of cards and writes to an open
+# file object as it goes, so memory stays constant whatever the deck size.
+# flush=True flushes after each card for consumers tailing the file.
+# Cards are read through card_rows(), which takes a Deck's columns directly.
+
+def write_csv(flashcards: Iterable[CardLike], f: TextIO, flush: bool = False) -> int:
+    """CSV with a question,answer,difficulty header"""
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+    count = 0
+    for row in card_rows(flashcards):
+        writer.writerow(row)
+        count += 1
+        if flush:
+            f.flush()
+    return count
+
+def write_json(flashcards: Iterable[CardLike], f: TextIO, flush: bool = False) -> int:
+    """JSON document with the cards, their count and the generator name"""
+    f.write('{\n  "flashcards": [')
+    count = 0
+    for row in card_rows(flashcards):
+        card = dict(zip(CSV_FIELDS, row))
+        f.write((',' if count else '') + '\n    ' + json.dumps(card, ensure_ascii=False))
+        count += 1
+        if flush:
+            f.flush()
+    f.write('\n  ],\n  "total_cards": %d,\n  "generated_by": %s\n}\n' % (count, json.dumps(GENERATED_BY)))
+    return count
+
+def write_anki(flashcards: Iterable[CardLike], f: TextIO, flush: bool = False) -> int:
+    """Anki-importable CSV: question,answer (properly quoted)"""
+    writer = csv.writer(f)
+    count = 0
+    for question, answer, _ in card_rows(flashcards):
+        writer.writerow([question, answer])
+        count += 1
+        if flush:
+            f.flush()
+    return count
+
+def write_quizlet(flashcards: Iterable[CardLike], f: TextIO, flush: bool = False) -> int:
+    """Quizlet import text: question<TAB>answer per line"""
+    count = 0
+    for question, answer, _ in card_rows(flashcards):
+        question = question.replace('\t', ' ').replace('\n', ' ')
+        answer = answer.replace('\t', ' ').replace('\n', ' ')
+        f.write(f"{question}\t{answer}\n")
+        count += 1
+        if flush:
+            f.flush()
+    return count
+
+TEXT_WRITERS = {
+    'csv': write_csv,
+    'json': write_json,
+    'anki': write_anki,
+    'quizlet': write_quizlet
+}
+
+# --- Anki package (.apkg) -------------------------------------------------
+
+APKG_SCHEMA = """
+CREATE TABLE col (
+    id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null,
+    usn integer not null, ls integer not null, conf text not null,
+    models text not null, decks text not null, dconf text not null,
+    tags text not null
+);
+CREATE TABLE notes (
+    id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null,
+    flds text not null, sfld integer not null, csum integer not null,
+    flags integer not null, data text not null
+);
+CREATE TABLE cards (
+    id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null,
+    type integer not null, queue integer not null, due integer not null,
+    ivl integer not null, factor integer not null, reps integer not null,
+    lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null
+);
+CREATE TABLE revlog (
+    id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null,
+    factor integer not null, time integer not null, type integer not null
+);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+# Rows per executemany call; all batches share one transaction
+APKG_BATCH_SIZE = 5000
+
+def _stable_id(name: str) -> int:
+    """Deterministic positive 53-bit id (Anki ids must fit in a JS number)"""
+    return int(hashlib.sha1(name.encode('utf-8')).hexdigest()[:13], 16)
+
+def _apkg_collection(deck_name: str, deck_id: int, model_id: int, now: int) -> tuple:
+    """The single col row describing the note type and deck"""
+    model = {
+        'id': model_id, 'name': 'Flashcard Generator (Basic)', 'type': 0,
+        'mod': now, 'usn': -1, 'sortf': 0, 'did': deck_id, 'tags': [], 'vers': [],
+        'tmpls': [{
+            'name': 'Card 1', 'ord': 0, 'did': None, 'bqfmt': '', 'bafmt': '',
+            'qfmt': '{{Front}}',
+            'afmt': '{{FrontSide}}\n\n<hr id=answer>\n\n{{Back}}'
+        }],
+        'flds': [
+            {'name': 'Front', 'ord': 0, 'sticky': False, 'rtl': False, 'font': 'Arial', 'size': 20, 'media': []},
+            {'name': 'Back', 'ord': 1, 'sticky': False, 'rtl': False, 'font': 'Arial', 'size': 20, 'media': []}
+        ],
+        'css': '.card { font-family: arial; font-size: 20px; text-align: center; color: black; background-color: white; }',
+        'latexPre': '\\documentclass[12pt]{article}\n\\special{papersize=3in,5in}\n\\usepackage{amssymb,amsmath}\n'
+                    '\\pagestyle{empty}\n\\setlength{\\parindent}{0in}\n\\begin{document}\n',
+        'latexPost': '\\end{document}',
+        'req': [[0, 'any', [0]]]
+    }
+
+    def deck(did: int, name: str) -> Dict:
+        return {
+            'id': did, 'name': name, 'desc': '', 'mod': now, 'usn': -1, 'dyn': 0, 'conf': 1,
+            'collapsed': False, 'extendNew': 10, 'extendRev': 50,
+            'newToday': [0, 0], 'revToday': [0, 0], 'lrnToday': [0, 0], 'timeToday': [0, 0]
+        }
+
+    dconf = {'1': {
+        'id': 1, 'name': 'Default', 'mod': 0, 'usn': 0, 'dyn': False, 'maxTaken': 60,
+        'timer': 0, 'autoplay': True, 'replayq': True,
+        'new': {'delays': [1, 10], 'ints': [1, 4, 7], 'initialFactor': 2500,
+                'separate': True, 'order': 1, 'perDay': 20, 'bury': True},
+        'rev': {'perDay': 100, 'ease4': 1.3, 'fuzz': 0.05, 'minSpace': 1,
+                'ivlFct': 1, 'maxIvl': 36500, 'bury': True},
+        'lapse': {'delays': [10], 'mult': 0, 'minInt': 1, 'leechFails': 8, 'leechAction': 0}
+    }}
+    conf = {
+        'nextPos': 1, 'estTimes': True, 'activeDecks': [1], 'sortType': 'noteFld',
+        'timeLim': 0, 'sortBackwards': False, 'addToCur': True, 'curDeck': 1,
+        'newBury': True, 'newSpread': 0, 'dueCounts': True, 'curModel': str(model_id),
+        'collapseTime': 1200
+    }
+    decks = {'1': deck(1, 'Default'), str(deck_id): deck(deck_id, deck_name)}
+    return (1, now, now * 1000, now * 1000, 11, 0, 0, 0,
+            json.dumps(conf), json.dumps({str(model_id): model}),
+            json.dumps(decks), json.dumps(dconf), '{}')
+
+def _apkg_rows(flashcards: Iterable[CardLike], deck_id: int, model_id: int,
+               now: int, base_id: int) -> Iterator[tuple]:
+    """(note row, card row) pairs, one per flashcard"""
+    for position, (raw_question, raw_answer, difficulty) in enumerate(card_rows(flashcards)):
+        question = html.escape(raw_question)
+        answer = html.escape(raw_answer)
+        note_id = base_id + position
+        checksum = int(hashlib.sha1(raw_question.encode('utf-8')).hexdigest()[:8], 16)
+        guid = hashlib.sha1(f"{raw_question}\x1f{raw_answer}".encode('utf-8')).hexdigest()[:16]
+        tags = f" {difficulty} " if difficulty else ''
+        note = (note_id, guid, model_id, now, -1, tags, f"{question}\x1f{answer}",
+                raw_question, checksum, 0, '')
+        # New card; due is its position in the new queue
+        anki_card = (note_id, note_id, deck_id, 0, now, -1, 0, 0, position + 1,
+                     0, 0, 0, 0, 0, 0, 0, 0, '')
+        yield note, anki_card
+
+def write_apkg(flashcards: Iterable[CardLike], f: Union[str, Path, BinaryIO],
+               deck_name: str = 'Flashcards') -> int:
+    """
+    Anki package: an SQLite collection (collection.anki2) zipped with an empty
+    media map. Notes and cards are inserted with batched executemany calls in a
+    single transaction, so large decks export quickly in bounded memory.
+    """
+    now = int(time.time())
+    deck_id = _stable_id(f"deck:{deck_name}")
+    model_id = _stable_id('model:flashcard-generator-basic')
+    base_id = now * 1000
+
+    fd, db_path = tempfile.mkstemp(suffix='.anki2')
+    os.close(fd)
+    count = 0
+    try:
+        db = sqlite3.connect(db_path)
+        try:
+            db.executescript(APKG_SCHEMA)
+            with db:
+                db.execute("INSERT INTO col VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                           _apkg_collection(deck_name, deck_id, model_id, now))
+                rows = _apkg_rows(flashcards, deck_id, model_id, now, base_id)
+                while True:
+                    batch = list(islice(rows, APKG_BATCH_SIZE))
+                    if not batch:
+                        break
+                    db.executemany("INSERT INTO notes VALUES (?,?,?,?,?,?,?,?,?,?,?)", (n for n, _ in batch))
+                    db.executemany("INSERT INTO cards VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                                   (c for _, c in batch))
+                    count += len(batch)
+        finally:
+            db.close()
+
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+            package.write(db_path, 'collection.anki2')
+            package.writestr('media', '{}')
+    finally:
+        os.remove(db_path)
+    return count
+
 class FlashcardExporter:
     """Handle different export formats for flashcards"""
-    
+
+    @staticmethod
+    def stream_to_file(flashcards: Iterable[CardLike], filename: str, fmt: str = 'csv') -> int:
+        """
+        Write flashcards to a file as they arrive, flushing after each card.
+        Returns the number of cards written.
+        """
+        if fmt == 'apkg':
+            # A zip can only be finished once every card is in; written at the end
+            return write_apkg(flashcards, filename, deck_name=Path(filename).stem)
+        if fmt not in TEXT_WRITERS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        with open(Path(filename), 'w', newline='', encoding='utf-8') as f:
+            return TEXT_WRITERS[fmt](flashcards, f, flush=True)
+
+    @staticmethod
+    def to_bytes(flashcards: Iterable[CardLike], fmt: str = 'csv') -> bytes:
+        """Export payload in memory (e.g. for a download button)"""
+        if fmt == 'apkg':
+            buffer = io.BytesIO()
+            write_apkg(flashcards, buffer)
+            return buffer.getvalue()
+        if fmt not in TEXT_WRITERS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        buffer = io.StringIO(newline='')
+        TEXT_WRITERS[fmt](flashcards, buffer)
+        return buffer.getvalue().encode('utf-8')
+
     @staticmethod
-    def to_csv(flashcards: List[Dict[str, str]], filename: str) -> str:
+    def to_csv(flashcards: Iterable[CardLike], filename: str) -> str:
         """Export flashcards to CSV format"""
-        df = pd.DataFrame(flashcards)
         filepath = Path(filename)
-        df.to_csv(filepath, index=False)
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            write_csv(flashcards, f)
         return str(filepath)
-    
+
     @staticmethod
-    def to_json(flashcards: List[Dict[str, str]], filename: str) -> str:
+    def to_json(flashcards: Iterable[CardLike], filename: str) -> str:
         """Export flashcards to JSON format"""
         filepath = Path(filename)
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump({
-                'flashcards': flashcards,
-                'total_cards': len(flashcards),
-                'generated_by': 'Flan-T5 Flashcard Generator'
-            }, f, indent=2, ensure_ascii=False)
+            write_json(flashcards, f)
         return str(filepath)
-    
+
     @staticmethod
-    def to_anki(flashcards: List[Dict[str, str]], filename: str) -> str:
+    def to_anki(flashcards: Iterable[CardLike], filename: str) -> str:
         """Export flashcards to Anki-compatible CSV format"""
         filepath = Path(filename)
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            for card in flashcards:
-                writer.writerow([card['question'], card['answer']])
+            write_anki(flashcards, f)
         return str(filepath)
-    
+
     @staticmethod
-    def to_quizlet(flashcards: List[Dict[str, str]], filename: str) -> str:
+    def to_quizlet(flashcards: Iterable[CardLike], filename: str) -> str:
         """Export flashcards to Quizlet-compatible format"""
         filepath = Path(filename)
         with open(filepath, 'w', encoding='utf-8') as f:
-            for card in flashcards:
-                f.write(f"{card['question']}\t{card['answer']}\n")
+            write_quizlet(flashcards, f)
+        return str(filepath)
+
+    @staticmethod
+    def to_apkg(flashcards: Iterable[CardLike], filename: str, deck_name: str = 'Flashcards') -> str:
+        """Export flashcards to a native Anki package"""
+        filepath = Path(filename)
+        write_apkg(flashcards, filepath, deck_name=deck_name)
         return str(filepath)
@@ -1,18 +1,48 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Callable
+from pathlib import Path
 import re
 import logging
-from LLM.llm_interface import LLMInterface, FlanT5Interface
+from LLM.llm_interface import LLMInterface, FlanT5Interface, NO_ANSWER
+from LLM.cache import ResultCache
+from LLM.model_registry import configure_threads
+from LLM.cards import Flashcard, Deck
+from LLM.normalizer import normalize_text, SentenceFile
+from LLM.telemetry import NULL_SINK, MetricsSink
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
+# The raw model output dump is large; it has its own logger so an application can turn it off,
+# and it is only formatted when that logger is enabled for DEBUG
+raw_output_logger = logging.getLogger(f"{__name__}.raw")
+
+# Shortest input worth sending to the model
+MIN_INPUT_LENGTH = 100
 
 class FlashcardGenerator:
     """Main flashcard generator class"""
     
-    def __init__(self, llm_interface: Optional[LLMInterface] = None):
+    def __init__(self, llm_interface: Optional[LLMInterface] = None, cache: Optional[ResultCache] = None,
+                 near_duplicate_threshold: Optional[float] = 0.6, metrics: Optional[MetricsSink] = None):
         logger.info("Initializing FlashcardGenerator")
-        self.llm = llm_interface or FlanT5Interface()
+        self.llm = llm_interface or FlanT5Interface(cache=cache)
+        if llm_interface is not None and cache is not None:
+            self.llm.cache = cache
+        # Telemetry for this generator and its model interface; off unless a sink is given
+        self.metrics = metrics or getattr(self.llm, 'metrics', NULL_SINK)
+        if metrics is not None and hasattr(self.llm, 'metrics'):
+            self.llm.metrics = metrics
+        
+        # Similarity thresholds for answers filled in from the input text
+        self.min_grounding_score = 0.1
+        self.weak_grounding_score = 0.3
+        # Auto-filled cards of the last run that scored below weak_grounding_score
+        self.weakly_grounded: List[Dict[str, str]] = []
+        
+        # Near-duplicate removal (close rephrasings, see DEFAULT_THRESHOLD in LLM/dedup.py); None disables it
+        self.near_duplicate_threshold = near_duplicate_threshold
+        # Which of a group of near-duplicates generate_from_text returns: 'first' or 'longest'
+        self.duplicate_keep = 'first'
+        # Stop generating after this many consecutive chunks whose cards were all near-duplicates
+        self.max_duplicate_chunks = 2
         
         # Test data fallback
         self.test_cards = [
@@ -28,108 +58,276 @@ class FlashcardGenerator:
             }
         ]
     
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the result cache (empty when caching is off)"""
+        cache = getattr(self.llm, 'cache', None)
+        return cache.stats() if cache is not None else {}
+    
     def generate_from_text(self, 
                           text: str, 
                           num_cards: int = 20,
-                          difficulty: str = "Mixed") -> List[Dict[str, str]]:
+                          difficulty: str = "Mixed") -> Deck:
         """Generate flashcards from input text"""
-        
+        return self._generate(self.iter_flashcards, text, num_cards, difficulty)
+    
+    def generate_from_file(self,
+                           path: str,
+                           num_cards: int = 20,
+                           difficulty: str = "Mixed") -> Deck:
+        """Generate flashcards from a UTF-8 text file, read as a stream"""
+        return self._generate(self.iter_flashcards_from_file, path, num_cards, difficulty)
+    
+    def _generate(self, iter_cards: Callable, source, num_cards: int, difficulty: str) -> Deck:
+        try:
+            detector = self._near_duplicate_detector(self.duplicate_keep)
+            processed_cards = Deck(iter_cards(source, num_cards, difficulty, detector=detector))
+            if detector is not None and self.duplicate_keep != 'first':
+                # The detector swapped in the preferred card of each duplicate group
+                processed_cards = detector.kept
+            if processed_cards:
+                logger.info(f"Generated {len(processed_cards)} valid flashcards")
+            return processed_cards
+            
+        except Exception as e:
+            logger.error(f"Error generating flashcards: {e}")
+            self.last_error = f"Error generating flashcards: {e}"
+            return Deck()  # Fallback to an empty deck
+    
+    def _near_duplicate_detector(self, keep: str = 'first'):
+        """Fresh detector for one deck, or None when near-duplicate removal is off"""
+        if not self.near_duplicate_threshold:
+            return None
+        from LLM.dedup import NearDuplicateDetector
+        return NearDuplicateDetector(self.near_duplicate_threshold, keep=keep)
+    
+    def iter_flashcards(self,
+                        text: str,
+                        num_cards: int = 20,
+                        difficulty: str = "Mixed",
+                        detector=None) -> Iterator[Flashcard]:
+        """
+        Yield post-processed, de-duplicated flashcards as each chunk is decoded.
+        Pass a NearDuplicateDetector to de-duplicate across several documents
+        (e.g. a corpus); otherwise a fresh one is used for this text.
+        Sets last_error when nothing could be generated.
+        """
         logger.info(f"Generating {num_cards} flashcards, difficulty: {difficulty}")
+        self.last_error = None
+        self.weakly_grounded = []
         
-        MIN_INPUT_LENGTH = 100
         if len(text.strip()) < MIN_INPUT_LENGTH:
             logger.warning("Input text too short for flashcard generation.")
             self.last_error = f"Input text is too short (min {MIN_INPUT_LENGTH} characters required)."
-            return []
-        try:
-            # Preprocess text
+            return
+        
+        # Preprocess text
+        with self.metrics.timer('preprocess'):
             cleaned_text = self._preprocess_text(text)
-            logger.debug(f"Cleaned text length: {len(cleaned_text)}")
-            
-            if not cleaned_text.strip():
-                logger.warning("Empty text after preprocessing")
-                self.last_error = "Input text is empty after preprocessing."
-                return []
-            
-            # Generate flashcards
-            flashcards = self.llm.generate_flashcards(cleaned_text, num_cards)
+        logger.debug(f"Cleaned text length: {len(cleaned_text)}")
+        
+        if not cleaned_text.strip():
+            logger.warning("Empty text after preprocessing")
+            self.last_error = "Input text is empty after preprocessing."
+            return
+        
+        yield from self._iter_processed(self.llm.iter_flashcards(cleaned_text, num_cards),
+                                        lambda: self._split_sentences(text), difficulty, detector)
+    
+    def iter_flashcards_from_file(self,
+                                  path: str,
+                                  num_cards: int = 20,
+                                  difficulty: str = "Mixed",
+                                  detector=None) -> Iterator[Flashcard]:
+        """
+        Like iter_flashcards, for a UTF-8 text file. The file is read in blocks
+        and normalized on the fly, once per pass (see
+        FlanT5Interface.iter_flashcards_from_sentences); the document is never
+        held in memory whole, except by the grounding index when a card needs it.
+        """
+        logger.info(f"Generating {num_cards} flashcards from {path}, difficulty: {difficulty}")
+        self.last_error = None
+        self.weakly_grounded = []
+        
+        sentences = SentenceFile(Path(path))
+        # Only as far as needed to tell whether the input is long enough
+        length = 0
+        with self.metrics.timer('preprocess'):
+            for sentence in sentences:
+                length += len(sentence) + 1
+                if length >= MIN_INPUT_LENGTH:
+                    break
+        
+        if not length:
+            logger.warning("Empty text after preprocessing")
+            self.last_error = "Input text is empty after preprocessing."
+            return
+        if length < MIN_INPUT_LENGTH:
+            logger.warning("Input text too short for flashcard generation.")
+            self.last_error = f"Input text is too short (min {MIN_INPUT_LENGTH} characters required)."
+            return
+        
+        yield from self._iter_processed(self.llm.iter_flashcards_from_sentences(sentences, num_cards),
+                                        lambda: list(sentences), difficulty, detector)
+    
+    def _iter_processed(self,
+                        batches: Iterator[List[Flashcard]],
+                        source_sentences: Callable[[], List[str]],
+                        difficulty: str,
+                        detector=None) -> Iterator[Flashcard]:
+        """Post-process and de-duplicate the model's card batches as they arrive"""
+        # Shared across chunks so duplicates are caught between them too
+        seen = set()
+        index = self._index_factory(source_sentences)
+        generated = 0
+        if detector is None:
+            detector = self._near_duplicate_detector()
+        duplicate_chunks = 0
+        metrics = self.metrics
+        metrics.count('decks')
+        
+        for flashcards in batches:
+            generated += len(flashcards)
             
             # Debug output
-            logger.debug(f"Raw model output: {flashcards}")
+            if raw_output_logger.isEnabledFor(logging.DEBUG):
+                raw_output_logger.debug(f"Raw model output: {flashcards}")
             
-            # Fallback to empty if model fails
-            if not flashcards:
-                logger.warning("Model returned no flashcards.")
-                self.last_error = "Model could not generate flashcards. Try a longer or more detailed input."
-                return []
+            with metrics.timer('postprocess'):
+                cards = self._postprocess_flashcards(flashcards, difficulty, seen=seen, index=index)
+            candidates = len(cards)
+            if detector is not None:
+                with metrics.timer('dedup'):
+                    cards = [card for card in cards if detector.add(card)]
+            metrics.count('cards_kept', len(cards))
+            yield from cards
             
-            # Post-process flashcards
-            processed_cards = self._postprocess_flashcards(flashcards, difficulty, original_text=text)
-            logger.info(f"Generated {len(processed_cards)} valid flashcards")
-            self.last_error = None
-            return processed_cards
-            
-        except Exception as e:
-            logger.error(f"Error generating flashcards: {e}")
-            self.last_error = f"Error generating flashcards: {e}"
-            return []  # Fallback to empty list
+            # Later chunks are unlikely to help once the model only repeats itself. Only
+            # chunks whose cards the detector rejected count; a chunk that lost its cards
+            # to grounding or the length filters says nothing about repetition either way
+            if cards:
+                duplicate_chunks = 0
+            elif candidates and detector is not None:
+                duplicate_chunks += 1
+            if self.max_duplicate_chunks and duplicate_chunks >= self.max_duplicate_chunks:
+                logger.info(f"Stopping early: {duplicate_chunks} chunks in a row produced only duplicates")
+                break
+        
+        # Fallback to empty if model fails
+        if not generated:
+            logger.warning("Model returned no flashcards.")
+            self.last_error = "Model could not generate flashcards. Try a longer or more detailed input."
     
     def _preprocess_text(self, text: str) -> str:
-        """Clean and prepare text for processing"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        # Remove email addresses
-        text = re.sub(r'\S*@\S*\s?', '', text)
-        
-        return text.strip()
+        """Clean and prepare text for processing (whitespace, URLs and e-mails in one pass)"""
+        return normalize_text(text)
+    
+    def _split_sentences(self, text: str) -> List[str]:
+        """Sentences of the original text, used to auto-fill missing answers"""
+        return re.split(r'(?<=[.!?])\s+', text)
+    
+    def _build_index(self, sentences: List[str]):
+        """Nearest-sentence index over the source document (built once per document)"""
+        # numpy is only needed once cards come back, keep it off the import path
+        from LLM.grounding import SentenceIndex
+        return SentenceIndex(sentences)
+    
+    def _index_factory(self, source_sentences: Callable[[], List[str]]) -> Callable:
+        """Builds the document's index on first call and returns the same one after"""
+        built = []
+        def index():
+            if not built:
+                built.append(self._build_index(source_sentences()))
+            return built[0]
+        return index
     
     def _postprocess_flashcards(self, 
-                               flashcards: List[Dict[str, str]], 
+                               flashcards: List[Flashcard], 
                                difficulty: str, 
-                               original_text: str = None) -> List[Dict[str, str]]:
-        """Clean and enhance generated flashcards. Auto-fill missing answers from input text if possible."""
+                               original_text: str = None,
+                               seen: Optional[set] = None,
+                               index=None) -> List[Flashcard]:
+        """
+        Clean and enhance generated flashcards. Auto-fill missing answers from input text if possible.
+        Unanswered cards are grounded in one batched index query; matches scoring below
+        min_grounding_score are dropped and those below weak_grounding_score are kept
+        but recorded in weakly_grounded.
+        Cards are cleaned in place (dict-style cards are converted to Flashcards first).
+        Pass the same seen set (and index) across calls to post-process a stream;
+        index may be a factory (see _index_factory), called only when a card
+        needs grounding.
+        """
         processed = []
-        import difflib
-        sentences = []
-        if original_text:
-            import re
-            sentences = re.split(r'(?<=[.!?]) +', original_text)
+        unanswered = []
         for card in flashcards:
+            card = Flashcard.from_dict(card)
+            question = card.question.strip()
+            answer = card.answer.strip()
+            if difficulty != "Mixed":
+                card.difficulty = difficulty
+            # Cards without a usable answer are grounded below, in one pass
+            if question and (not answer or answer == NO_ANSWER):
+                card.question = question
+                card.answer = None
+                unanswered.append(len(processed))
+                processed.append(card)
+                continue
             # Skip empty or very short cards
-            if len(card.get('question', '')) < 5 or len(card.get('answer', '')) < 2:
-                # Try to auto-fill answer if missing
-                if card.get('question', '') and (not card.get('answer') or card.get('answer') == '(No answer provided)') and sentences:
-                    # Find the most similar sentence from the input
-                    best = difflib.get_close_matches(card['question'], sentences, n=1)
-                    if best:
-                        card['answer'] = best[0]
-                        card['difficulty'] = difficulty if difficulty != "Mixed" else card.get('difficulty', 'Medium')
-                        processed.append(card)
+            if len(question) < 5 or len(answer) < 2:
                 continue
-            # Clean up text
-            question = card['question'].strip()
-            answer = card['answer'].strip()
             # Remove quotes if they wrap the entire text
             if question.startswith('"') and question.endswith('"'):
                 question = question[1:-1]
             if answer.startswith('"') and answer.endswith('"'):
                 answer = answer[1:-1]
-            processed_card = {
-                'question': question,
-                'answer': answer,
-                'difficulty': difficulty if difficulty != "Mixed" else card.get('difficulty', 'Medium')
-            }
-            processed.append(processed_card)
-        # Remove duplicates
-        seen = set()
+            card.question = question
+            card.answer = answer
+            processed.append(card)
+        
+        if unanswered:
+            if index is None and original_text:
+                index = self._build_index(self._split_sentences(original_text))
+            elif callable(index):
+                index = index()
+            matches = index.query([processed[i].question for i in unanswered], k=1) if index is not None else []
+            filled = weak = 0
+            for i, best in zip(unanswered, matches):
+                if not best or best[0][1] < self.min_grounding_score:
+                    continue
+                sentence, score = best[0]
+                processed[i].answer = sentence
+                filled += 1
+                if score < self.weak_grounding_score:
+                    weak += 1
+                    logger.info(f"Weakly grounded answer ({score:.2f}) for: {processed[i].question}")
+                    self.weakly_grounded.append(dict(processed[i], grounding_score=score))
+            processed = [card for card in processed if card.answer is not None]
+            self.metrics.count('answers_autofilled', filled)
+            self.metrics.count('autofill_dropped', len(unanswered) - filled)
+            self.metrics.count('weakly_grounded', weak)
+        
+        # Remove duplicates; the seen set holds hashes rather than lowercased copies of every card
+        if seen is None:
+            seen = set()
         unique_cards = []
         for card in processed:
-            card_key = (card['question'].lower(), card['answer'].lower())
+            card_key = hash((card.question.lower(), card.answer.lower()))
             if card_key not in seen:
                 seen.add(card_key)
                 unique_cards.append(card)
         return unique_cards
+
+def load_worker_generator(threads: int, generator_kwargs: Dict) -> FlashcardGenerator:
+    """
+    Generator for a worker process: split torch's threads with the other
+    workers, then load the model (and draft model) now rather than on the first task
+    """
+    try:
+        configure_threads(threads)
+    except ImportError:
+        # The mock backend runs without torch
+        pass
+    generator = FlashcardGenerator(**generator_kwargs)
+    getattr(generator.llm, 'handle', None)
+    getattr(generator.llm, 'draft_handle', None)
+    return generator
@@ -0,0 +1,99 @@
+from collections import Counter
+from typing import List, Dict, Tuple
+import math
+import re
+
+import numpy as np
+
+# Words are truncated to this many characters, a cheap stand-in for stemming
+# ("revolutionized" and "revolution" share a term)
+STEM_LENGTH = 6
+
+# Function words carry no signal and have the longest postings lists
+STOP_WORDS = frozenset("""
+a an and are as at be been but by did do does for from had has have he her his how i in
+into is it its of on or she that the their them they this to was were what when where which
+who whom why will with you your
+""".split())
+
+# Bound the dense score block (queries x sentences) built per vectorized pass
+MAX_SCORE_CELLS = 4_000_000
+
+WORD = re.compile(r"[a-z0-9]+")
+
+def _terms(text: str) -> Counter:
+    return Counter(w[:STEM_LENGTH] for w in WORD.findall(text.lower()) if w not in STOP_WORDS)
+
+class SentenceIndex:
+    """
+    TF-IDF index of (stemmed) word terms over the sentences of one document.
+    Built once per document; query() scores any number of questions against
+    every sentence in a single vectorized pass over an inverted index and
+    returns cosine similarities, so callers can tell strong matches from weak
+    ones.
+    """
+
+    def __init__(self, sentences: List[str]):
+        self.sentences = [s for s in sentences if s.strip()]
+        counts = [_terms(s) for s in self.sentences]
+
+        df = Counter()
+        for c in counts:
+            df.update(c.keys())
+        n = len(self.sentences)
+        self.idf = {term: math.log((1 + n) / (1 + d)) + 1.0 for term, d in df.items()}
+
+        # term -> (sentence ids, normalised weights)
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for sid, c in enumerate(counts):
+            weights = {t: tf * self.idf[t] for t, tf in c.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for t, w in weights.items():
+                ids, ws = postings.setdefault(t, ([], []))
+                ids.append(sid)
+                ws.append(w / norm)
+        self.postings = {
+            t: (np.asarray(ids, dtype=np.int32), np.asarray(ws, dtype=np.float32))
+            for t, (ids, ws) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def _query_vector(self, text: str) -> Dict[str, float]:
+        weights = {t: tf * self.idf[t] for t, tf in _terms(text).items() if t in self.idf}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {t: w / norm for t, w in weights.items()}
+
+    def query(self, questions: List[str], k: int = 1) -> List[List[Tuple[str, float]]]:
+        """Top-k (sentence, cosine similarity) matches for each question"""
+        n = len(self.sentences)
+        if not questions or not n:
+            return [[] for _ in questions]
+        k = min(k, n)
+
+        results: List[List[Tuple[str, float]]] = []
+        block = max(1, MAX_SCORE_CELLS // n)
+        for start in range(0, len(questions), block):
+            block_questions = questions[start:start + block]
+
+            # Gather every (question, sentence, weight) contribution, then sum
+            # them into the dense score block with one bincount
+            rows, cols, vals = [], [], []
+            for qi, question in enumerate(block_questions):
+                for term, qw in self._query_vector(question).items():
+                    ids, ws = self.postings[term]
+                    rows.append(np.full(len(ids), qi, dtype=np.int64))
+                    cols.append(ids)
+                    vals.append(ws * qw)
+            scores = np.zeros((len(block_questions), n), dtype=np.float32)
+            if rows:
+                flat = np.concatenate(rows) * n + np.concatenate(cols)
+                scores = np.bincount(flat, weights=np.concatenate(vals),
+                                     minlength=len(block_questions) * n).reshape(len(block_questions), n)
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for qi in range(len(block_questions)):
+                best = sorted(top[qi], key=lambda sid: -scores[qi, sid])
+                results.append([(self.sentences[sid], float(scores[qi, sid])) for sid in best])
+        return results
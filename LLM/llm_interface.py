@@ -1,159 +1,648 @@
 from abc import ABC, abstractmethod
-from transformers import pipeline, T5ForConditionalGeneration, T5Tokenizer
-import torch
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple
+from itertools import islice
 import logging
+import re
+import zlib
+from LLM.prompt_builder import PromptBuilder, PROMPT_VERSION
+from LLM.cache import ResultCache
+from LLM.sampling import row_seed
+from LLM.cards import Flashcard
+from LLM.telemetry import NULL_SINK, MetricsSink
+from LLM.model_registry import DEFAULT_MODEL_NAME, ModelHandle, configure_threads, default_device, get_model
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Answer given to parsed cards where the model produced none
+NO_ANSWER = '(No answer provided)'
+
+# Flan-T5 encoder window, prompt template included
+MAX_INPUT_TOKENS = 512
+
+# Sentences per tokenizer call when chunking a stream of sentences
+TOKENIZE_BATCH = 1024
+
+# Content-defined chunk boundaries, used when a result cache is attached: a
+# full chunk is cut after the sentence with the lowest hash among those that
+# leave it at least ANCHOR_MIN_FILL of the token budget. The cut depends on the
+# sentences near it rather than on everything before them, so after an edit the
+# boundaries fall back into step within a chunk or two and the rest of the
+# document hits the cache. Chunks come out about a quarter smaller, so without
+# a cache chunks are filled to the budget instead
+ANCHOR_MIN_FILL = 0.5
+
+# How extra samples per chunk are drawn: independent samples, or diverse beam groups
+SAMPLE_STRATEGIES = ('sample', 'diverse_beam')
+
+# Penalty between beam groups when sample_strategy is 'diverse_beam'
+DIVERSITY_PENALTY = 1.0
+
+# Sentence ends at . ! or ? (optionally followed by a closing quote or bracket)
+# when the next sentence starts with an upper-case letter, digit or opening quote
+SENTENCE_BOUNDARY = re.compile(
+    r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+(?=["\'(\[]?[A-Z0-9])'
+)
+
+def _call_counter(counts: Dict[str, int], key: str):
+    """Forward hook counting the calls of a module"""
+    def hook(module, args, output):
+        counts[key] += 1
+    return hook
+
 class LLMInterface(ABC):
     """Abstract base class for LLM interfaces"""
     
     @abstractmethod
-    def generate_flashcards(self, text: str, num_cards: int = 20) -> List[Dict[str, str]]:
+    def generate_flashcards(self, text: str, num_cards: int = 20) -> List[Flashcard]:
         pass
+    
+    def iter_flashcards(self, text: str, num_cards: int = 20) -> Iterator[List[Flashcard]]:
+        """Yield cards in groups as they become available (one group by default)"""
+        flashcards = self.generate_flashcards(text, num_cards)
+        if flashcards:
+            yield flashcards
+    
+    def iter_flashcards_from_sentences(self, sentences: Iterable[str], num_cards: int = 20) -> Iterator[List[Flashcard]]:
+        """Like iter_flashcards, for text that arrives already split into sentences"""
+        yield from self.iter_flashcards(" ".join(sentences), num_cards)
 
 class FlanT5Interface(LLMInterface):
     """Flan-T5 implementation for flashcard generation"""
     
-    def __init__(self, model_name: str = "google/flan-t5-base"):
+    # Inference runtime; part of the cache key
+    backend = "torch"
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = 8,
+                 device: Optional[str] = None, dtype: str = "float32",
+                 cache: Optional[ResultCache] = None, seed: Optional[int] = None,
+                 threads: Optional[int] = None, samples_per_chunk: int = 1,
+                 draft_model_name: Optional[str] = None):
         """
         Initialize Flan-T5 model
         Options: flan-t5-small, flan-t5-base, flan-t5-large
+        batch_size: number of chunk prompts padded into a single generate call
+        (1 reproduces the old one-chunk-at-a-time behaviour)
+        The model is loaded lazily through the process-wide registry, so every
+        interface using the same model, device and dtype shares one copy.
+        dtype: "float32", "bfloat16" or "int8" (dynamic quantization, CPU only)
+        threads: torch intra-op threads to use on CPU (torch default when None)
+        cache: optional ResultCache for per-chunk results. Sampled output is only
+        cached when a seed is given, which also makes generation reproducible.
+        samples_per_chunk: decoder samples drawn from one encoder pass over each
+        chunk prompt; their cards are merged (1 = a single sample, as before)
+        draft_model_name: enables assisted decoding. The draft model (e.g.
+        flan-t5-small) proposes tokens that this model verifies in one forward
+        pass. It is loaded once through the registry, on the same device and
+        dtype, and uses this model's tokenizer.
         """
-        # Check if CUDA is available
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        
-        # Load model and tokenizer
-        self.tokenizer = T5Tokenizer.from_pretrained(model_name)
-        self.model = T5ForConditionalGeneration.from_pretrained(model_name)
-        self.model.to(self.device)
-    
-    def _create_prompt(self, text: str, num_cards: int) -> str:
-        """Create optimized prompt for Flan-T5"""
-        # Add more and better Q/A examples to guide the model
-        example_qa = """
-Q: What is photosynthesis?
-A: Photosynthesis is the process by which green plants use sunlight to synthesize food from carbon dioxide and water.
----
-Q: Who painted the Mona Lisa?
-A: Leonardo da Vinci painted the Mona Lisa.
----
-Q: What is the capital of France?
-A: Paris is the capital of France.
----
-Q: Who led the Salt March in India?
-A: Mahatma Gandhi led the Salt March in India.
----
-Q: When did India gain independence from British rule?
-A: India gained independence on August 15, 1947.
----
-Q: What is the main idea of the passage?
-A: The main idea is the struggle for India's independence from British rule.
----
-Q: What is the significance of the Renaissance?
-A: The Renaissance marked a period of cultural, artistic, and scientific rebirth in Europe.
----
-Q: What is Python used for?
-A: Python is used for web development, data science, artificial intelligence, and automation.
----
-Q: What is the Ganges River known for?
-A: The Ganges River is considered sacred in Hinduism and is a major river in India.
----
-Q: What is the process of human respiration?
-A: Human respiration is the process of inhaling oxygen and exhaling carbon dioxide.
----
-"""
-        prompt = f"""Read the following text and generate {num_cards} flashcards. For each flashcard, you MUST provide both a question and a short, factual answer, based only on the text. Format each as:
-Q: <question>
-A: <answer>
----
-
-Here are some examples:
-{example_qa}
-Text:
-{text}
-
-Flashcards:
-"""
-        return prompt
-    
-    def _chunk_text(self, text: str, max_tokens: int = 400) -> List[str]:
-        """Split text into chunks if too long"""
-        tokens = self.tokenizer.encode(text)
-        if len(tokens) <= max_tokens:
-            return [text]
-        
-        # Simple sentence-based chunking
-        sentences = text.split('. ')
-        chunks = []
-        current_chunk = ""
-        
-        for sentence in sentences:
-            test_chunk = current_chunk + sentence + ". "
-            if len(self.tokenizer.encode(test_chunk)) > max_tokens and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence + ". "
-            else:
-                current_chunk = test_chunk
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        
+        # Resolved (CUDA if available) on first use, so no torch import here
+        self._device = device
+        self.dtype = dtype
+        self.threads = threads
+        
+        # Generation settings; part of the cache key
+        self.generation_params = {
+            'max_length': 300,
+            'temperature': 0.7,
+            'do_sample': True
+        }
+        # Size max_new_tokens from the cards requested per chunk and stop decoding
+        # once they are complete (see LLM/stopping.py); part of the cache key
+        self.adaptive_decoding = True
+        # Encode once, sample many; part of the cache key
+        self.samples_per_chunk = max(1, samples_per_chunk)
+        self.sample_strategy = 'sample'
+        self.draft_model_name = draft_model_name
+        self.cache = cache
+        self.seed = seed
+        # Stage timers, token counts and parse yield go here (see LLM/telemetry.py)
+        self.metrics: MetricsSink = NULL_SINK
+        
+        self._handle: Optional[ModelHandle] = None
+        self._draft_handle: Optional[ModelHandle] = None
+        self._prompt_builder: Optional[PromptBuilder] = None
+        # Per-chunk prompt token usage of the last generate_flashcards call
+        self.last_token_usage: List[Dict[str, int]] = []
+        # Per-generate-call decode lengths and stop reasons of the last call
+        self.last_decode_stats: List[Dict] = []
+    
+    @property
+    def device(self) -> str:
+        if self._device is None:
+            self._device = default_device()
+        return self._device
+    
+    @property
+    def handle(self) -> ModelHandle:
+        """Shared model handle, loaded on first use"""
+        if self._handle is None:
+            if self.device == "cpu":
+                configure_threads(self.threads)
+            self._handle = get_model(self.model_name, self.device, self.dtype)
+        return self._handle
+    
+    @property
+    def draft_handle(self) -> Optional[ModelHandle]:
+        """Shared handle of the assisted decoding draft model, loaded on first use"""
+        if self.draft_model_name is None:
+            return None
+        if self._draft_handle is None:
+            if self.draft_model_name == self.model_name:
+                raise ValueError("The draft model must be a smaller model than the one it assists")
+            handle = get_model(self.draft_model_name, self.device, self.dtype)
+            if handle.model.config.vocab_size != self.model.config.vocab_size:
+                raise ValueError(f"Draft model {self.draft_model_name} does not share the vocabulary of {self.model_name}")
+            self._draft_handle = handle
+        return self._draft_handle
+    
+    @property
+    def model(self):
+        return self.handle.model
+    
+    @property
+    def tokenizer(self):
+        return self.handle.tokenizer
+    
+    @property
+    def prompt_builder(self) -> PromptBuilder:
+        if self._prompt_builder is None:
+            self._prompt_builder = PromptBuilder(self.tokenizer, max_input_tokens=MAX_INPUT_TOKENS)
+        return self._prompt_builder
+    
+    def _create_prompt(self, text: str, num_cards: int, num_examples: Optional[int] = None) -> str:
+        """Create optimized prompt for Flan-T5 (all few-shot examples by default)"""
+        return self.prompt_builder.build_text(text, num_cards, num_examples)
+    
+    def _build_prompt(self, text: str, num_cards: int) -> List[int]:
+        """Prompt token IDs sized to the encoder window; records token usage"""
+        return self._build_prompts([text], [num_cards])[0]
+    
+    def _build_prompts(self, texts: List[str], num_cards: List[int]) -> List[List[int]]:
+        """Prompt token IDs for many chunks, their text tokenized in a single call"""
+        prompts = []
+        for input_ids, usage in self.prompt_builder.build_batch(texts, num_cards):
+            self.last_token_usage.append(usage)
+            prompts.append(input_ids)
+        return prompts
+    
+    def _split_sentences(self, text: str) -> List[str]:
+        """Split text on sentence boundaries"""
+        return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+    
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts with a single tokenizer call"""
+        if not texts:
+            return []
+        encoded = self.tokenizer(texts, add_special_tokens=False, return_attention_mask=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+    
+    def _prompt_overhead(self) -> int:
+        """
+        Tokens the zero-shot prompt template adds around a chunk.
+        Few-shot examples only use whatever room the chunk leaves.
+        """
+        return self.prompt_builder.template_overhead(num_examples=0)
+    
+    def _split_long_sentence(self, sentence: str, budget: int) -> List[tuple]:
+        """Break a sentence that exceeds the budget into word runs that fit"""
+        words = sentence.split()
+        counts = self._count_tokens(words)
+        pieces = []
+        current, current_tokens = [], 0
+        for word, count in zip(words, counts):
+            if current and current_tokens + count > budget:
+                pieces.append((" ".join(current), current_tokens))
+                current, current_tokens = [], 0
+            current.append(word)
+            current_tokens += count
+        if current:
+            pieces.append((" ".join(current), current_tokens))
+        return pieces
+    
+    def _sentence_units(self, sentences: Iterable[str], budget: int) -> Iterator[Tuple[str, int]]:
+        """(sentence, token count) pairs, tokenized in batches; sentences over budget are split"""
+        sentences = iter(sentences)
+        while True:
+            batch = list(islice(sentences, TOKENIZE_BATCH))
+            if not batch:
+                return
+            for sentence, count in zip(batch, self._count_tokens(batch)):
+                if count > budget:
+                    yield from self._split_long_sentence(sentence, budget)
+                else:
+                    yield sentence, count
+    
+    def _chunk_sentences(self, sentences: Iterable[str], max_tokens: int = 400,
+                         overlap_sentences: int = 0) -> Iterator[str]:
+        """
+        Chunks that fit the encoder window once wrapped in the prompt, built
+        from a stream of sentences as it is read. Sentences are tokenized in
+        batches and collected up to the token budget. With a result cache a
+        full chunk is cut after its anchor sentence (see ANCHOR_MIN_FILL) and
+        the sentences past it start the next chunk; without one it is cut at
+        the budget. overlap_sentences repeats the last sentences of a chunk at
+        the start of the next one.
+        """
+        budget = min(max_tokens, MAX_INPUT_TOKENS - self._prompt_overhead())
+        if budget <= 0:
+            raise ValueError("Prompt template leaves no room for text in the encoder window")
+        anchored = self.cache is not None
+        anchor_tokens = budget * ANCHOR_MIN_FILL
+        
+        # (sentence, token count, content hash) of the chunk being filled
+        current, current_tokens = [], 0
+        for sentence, count in self._sentence_units(sentences, budget):
+            while current and current_tokens + count > budget:
+                cut = self._anchor(current, anchor_tokens) if anchored else len(current)
+                yield " ".join(s for s, _, _ in current[:cut])
+                rest = current[cut:]
+                # Carry the overlap forward only if the next sentence still fits
+                carried = current[:cut][-overlap_sentences:] if overlap_sentences > 0 else []
+                if len(carried) >= cut:
+                    carried = carried[1:]
+                current = carried + rest
+                current_tokens = sum(c for _, c, _ in current)
+                if carried and current_tokens + count > budget:
+                    current = rest
+                    current_tokens = sum(c for _, c, _ in current)
+            current.append((sentence, count, zlib.crc32(sentence.encode('utf-8'))))
+            current_tokens += count
         
+        if current:
+            yield " ".join(s for s, _, _ in current)
+    
+    @staticmethod
+    def _anchor(current: List[Tuple[str, int, int]], anchor_tokens: float) -> int:
+        """
+        Sentences to cut off a full chunk: up to the lowest-hash sentence among
+        those that leave the chunk at least anchor_tokens long (all of them if
+        none does). The choice depends on the sentences' content, not on where
+        the chunk started, so boundaries before and after an edit line up again.
+        """
+        best, best_hash = len(current), None
+        tokens = 0
+        for i, (_, count, sentence_hash) in enumerate(current, 1):
+            tokens += count
+            if tokens >= anchor_tokens and (best_hash is None or sentence_hash < best_hash):
+                best, best_hash = i, sentence_hash
+        return best
+    
+    def _chunk_text(self, text: str, max_tokens: int = 400, overlap_sentences: int = 0) -> List[str]:
+        """Split text into chunks that fit the encoder window (see _chunk_sentences)"""
+        chunks = list(self._chunk_sentences(self._split_sentences(text), max_tokens, overlap_sentences))
+        # Text that fits in one chunk is passed on as written
+        if len(chunks) == 1:
+            return [text.strip()]
         return chunks
     
-    def generate_flashcards(self, text: str, num_cards: int = 20) -> List[Dict[str, str]]:
-        """Generate flashcards from text"""
-        try:
-            # Chunk text if necessary
+    def _decode_params(self, num_cards: Optional[List[int]],
+                       samples: Optional[int] = None) -> Tuple[Dict, Optional[object]]:
+        """
+        generate() settings for a batch, plus its CardStoppingCriteria when decoding adaptively.
+        With samples_per_chunk > 1 the encoder still runs once per prompt; generate
+        expands its outputs to num_return_sequences decoder rows per prompt.
+        samples overrides samples_per_chunk (assisted decoding draws one at a time).
+        """
+        if self.sample_strategy not in SAMPLE_STRATEGIES:
+            raise ValueError(f"sample_strategy must be one of {SAMPLE_STRATEGIES}")
+        samples = self.samples_per_chunk if samples is None else samples
+        params = dict(self.generation_params, num_return_sequences=samples)
+        beams = samples > 1 and self.sample_strategy == 'diverse_beam'
+        if beams:
+            params.pop('temperature', None)
+            params.update(do_sample=False, num_beams=samples,
+                          num_beam_groups=samples, diversity_penalty=DIVERSITY_PENALTY)
+        if not self.adaptive_decoding or not num_cards:
+            return params, None
+        from LLM.stopping import CardStoppingCriteria, max_new_tokens_for
+        # max_length counts the decoder start token
+        limit = params.pop('max_length', 300) - 1
+        params['max_new_tokens'] = max_new_tokens_for(max(num_cards), limit)
+        if beams:
+            # Beam search reorders its rows every step, so per-row progress cannot be tracked
+            return params, None
+        targets = [n for n in num_cards for _ in range(samples)]
+        return params, CardStoppingCriteria(self.tokenizer, targets)
+    
+    def _record_decode(self, num_cards: Optional[List[int]], generated: int, budget: int, stopping=None,
+                       acceptance: Optional[Dict] = None):
+        """Log and keep the decode length of one generate call and the tokens saved"""
+        limit = self.generation_params.get('max_length', 300) - 1
+        samples = 1 if acceptance is not None else self.samples_per_chunk
+        stats = {
+            'sequences': len(num_cards) * samples if num_cards else None,
+            'cards_requested': num_cards,
+            'max_new_tokens': budget,
+            'generated_tokens': generated,
+            # Relative to decoding up to the fixed max_length
+            'tokens_saved': max(0, limit - generated),
+            'stop_reasons': stopping.reasons if stopping is not None else None
+        }
+        if acceptance is not None:
+            stats['acceptance'] = acceptance
+        self.last_decode_stats.append(stats)
+        logger.info(f"Decoded {generated}/{budget} tokens, {stats['tokens_saved']} saved vs max_length; "
+                    f"stop reasons: {stats['stop_reasons']}")
+        if acceptance is not None:
+            logger.info(f"Assisted decoding: accepted {acceptance['accepted_tokens']}/{acceptance['draft_tokens']} "
+                        f"draft tokens ({acceptance['acceptance_rate']:.0%}) in {acceptance['target_passes']} target passes")
+    
+    def _generate(self, prompts: List[List[int]], num_cards: Optional[List[int]] = None):
+        """
+        Run a single padded generate call over a batch of prompt token IDs.
+        num_cards (cards requested per prompt) enables the adaptive budget
+        and early stopping. Returns samples_per_chunk sequences per prompt,
+        grouped by prompt.
+        """
+        if self.draft_model_name is not None:
+            return self._generate_assisted(prompts, num_cards)
+        
+        # Imported here so the package can be imported without torch
+        import torch
+        
+        inputs = self.tokenizer.pad(
+            {"input_ids": prompts},
+            padding=True,
+            return_tensors="pt"
+        )
+        inputs = inputs.to(self.device)
+        
+        params, stopping = self._decode_params(num_cards)
+        if stopping is not None:
+            from transformers import StoppingCriteriaList
+            params['stopping_criteria'] = StoppingCriteriaList([stopping])
+        
+        # The model is shared across sessions; run one generate at a time
+        with self.handle.lock, torch.inference_mode():
+            if self.seed is not None:
+                torch.manual_seed(self.seed)
+            outputs = self.model.generate(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                pad_token_id=self.tokenizer.eos_token_id,
+                **params
+            )
+        
+        budget = params.get('max_new_tokens', params.get('max_length', 300) - 1)
+        self._record_decode(num_cards, outputs.shape[1] - 1, budget, stopping)
+        return outputs
+    
+    def _generate_assisted(self, prompts: List[List[int]], num_cards: Optional[List[int]] = None):
+        """
+        _generate with assisted decoding: the draft model proposes a few tokens
+        and the target model checks them all in one forward pass, keeping those
+        it agrees with. Greedy output is the target model's own. transformers
+        only assists one sequence at a time, so every prompt and sample is a
+        separate call; outputs are padded into one batch as _generate returns
+        them. Acceptance stats go into last_decode_stats and the metrics sink.
+        """
+        import torch
+        from transformers import StoppingCriteriaList
+        
+        if self.samples_per_chunk > 1 and self.sample_strategy == 'diverse_beam':
+            raise ValueError("Assisted decoding draws one sample at a time; use sample_strategy='sample'")
+        draft = self.draft_handle
+        pad = self.tokenizer.pad_token_id
+        sequences = []
+        
+        with self.handle.lock, draft.lock, torch.inference_mode():
+            for i, prompt in enumerate(prompts):
+                targets = num_cards[i:i + 1] if num_cards else None
+                input_ids = torch.tensor([prompt], device=self.device)
+                for sample in range(self.samples_per_chunk):
+                    if self.seed is not None:
+                        # One sequence per call, so the global generator can be seeded per chunk
+                        torch.manual_seed(row_seed(self.seed, prompt, sample))
+                    params, stopping = self._decode_params(targets, samples=1)
+                    if stopping is not None:
+                        params['stopping_criteria'] = StoppingCriteriaList([stopping])
+                    # Each target pass keeps the accepted draft tokens plus one of its own
+                    passes = {'target': 0, 'draft': 0}
+                    hooks = [self.model.register_forward_hook(_call_counter(passes, 'target')),
+                             draft.model.register_forward_hook(_call_counter(passes, 'draft'))]
+                    try:
+                        output = self.model.generate(
+                            input_ids=input_ids,
+                            attention_mask=torch.ones_like(input_ids),
+                            pad_token_id=self.tokenizer.eos_token_id,
+                            assistant_model=draft.model,
+                            **params
+                        )[0]
+                    finally:
+                        for hook in hooks:
+                            hook.remove()
+                    sequences.append(output)
+                    
+                    # Every draft pass proposes one token; output starts with the decoder start token
+                    generated = output.shape[0] - 1
+                    accepted = max(0, generated - passes['target'])
+                    acceptance = {
+                        'draft_tokens': passes['draft'],
+                        'accepted_tokens': accepted,
+                        'target_passes': passes['target'],
+                        'acceptance_rate': accepted / passes['draft'] if passes['draft'] else 0.0
+                    }
+                    budget = params.get('max_new_tokens', params.get('max_length', 300) - 1)
+                    self._record_decode(targets, generated, budget, stopping, acceptance)
+                    self.metrics.count('draft_tokens', passes['draft'])
+                    self.metrics.count('draft_tokens_accepted', accepted)
+                    self.metrics.count('target_passes', passes['target'])
+        
+        return torch.nn.utils.rnn.pad_sequence(sequences, batch_first=True, padding_value=pad)
+    
+    def _decode(self, outputs) -> List[str]:
+        """Decode generated token IDs to response strings"""
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    def _output_tokens(self, outputs) -> int:
+        """Generated tokens in a batch of outputs, without padding, EOS or the decoder start token"""
+        pad, eos = self.tokenizer.pad_token_id, self.tokenizer.eos_token_id
+        if hasattr(outputs, 'ne'):
+            return int((outputs.ne(pad) & outputs.ne(eos)).sum())
+        return sum(1 for row in outputs for token in row if token != pad and token != eos)
+    
+    def _generate_batch(self, prompts: List[List[int]], num_cards: Optional[List[int]] = None) -> List[List[str]]:
+        """Generate and decode the responses for a batch of prompts: samples_per_chunk per prompt"""
+        metrics = self.metrics
+        with metrics.timer('generate') as timer:
+            outputs = self._generate(prompts, num_cards)
+        with metrics.timer('decode'):
+            responses = self._decode(outputs)
+        if metrics.enabled:
+            output_tokens = self._output_tokens(outputs)
+            metrics.count('generate_calls')
+            metrics.count('input_tokens', sum(len(p) for p in prompts))
+            metrics.count('output_tokens', output_tokens)
+            if timer.seconds:
+                metrics.observe('output_tokens_per_second', output_tokens / timer.seconds)
+        k = self.samples_per_chunk
+        return [responses[i * k:(i + 1) * k] for i in range(len(prompts))]
+    
+    def _cache_key(self, chunk: str, num_cards: int) -> Optional[str]:
+        """
+        Cache key for a chunk, or None when its results must not be cached.
+        After an edit, chunks away from it keep their text (see ANCHOR_MIN_FILL)
+        and are reused; the edited chunk and usually a neighbour or two are
+        generated again. The key includes the cards asked of the chunk, which
+        follow from the total, so a different card count regenerates them all.
+        Seeded sampling seeds each generate call, so a sampled chunk's cards
+        also depend on the chunks batched with it; the first result is kept.
+        """
+        if self.cache is None:
+            return None
+        if self.generation_params.get('do_sample') and self.seed is None:
+            return None
+        params = dict(self.output_settings(), num_cards=num_cards)
+        return ResultCache.make_key(chunk, self.model_name, params, PROMPT_VERSION)
+    
+    def output_settings(self) -> Dict:
+        """Settings besides the model and prompt that change the cards generated for a chunk"""
+        settings = dict(self.generation_params, seed=self.seed,
+                        dtype=self.dtype, backend=self.backend, adaptive=self.adaptive_decoding,
+                        samples=self.samples_per_chunk, sample_strategy=self.sample_strategy)
+        if self.draft_model_name is not None:
+            # Same greedy output, but sampled output differs for a given seed
+            settings['draft_model'] = self.draft_model_name
+        return settings
+    
+    def iter_flashcards(self, text: str, num_cards: int = 20) -> Iterator[List[Flashcard]]:
+        """Yield the parsed cards of each chunk as soon as its batch is decoded"""
+        with self.metrics.timer('chunk'):
             chunks = self._chunk_text(text)
-            all_flashcards = []
-            
-            cards_per_chunk = max(1, num_cards // len(chunks))
+        yield from self._iter_chunk_flashcards(chunks, num_cards, len(chunks))
+    
+    def iter_flashcards_from_sentences(self, sentences: Iterable[str], num_cards: int = 20) -> Iterator[List[Flashcard]]:
+        """
+        Chunk a stream of sentences as it is read, then generate as
+        iter_flashcards does. The sentences are read twice: once to count the
+        chunks, which sets each chunk's share of the cards, and again as the
+        chunks are generated, so the chunks are never all held at once and
+        reading stops once enough cards are in. Pass something that can be
+        iterated again (a list or normalizer.SentenceFile); a one-shot iterator
+        is read into a list first.
+        """
+        if iter(sentences) is sentences:
+            sentences = list(sentences)
+        # Includes reading the stream, which the chunker consumes as it goes
+        with self.metrics.timer('chunk'):
+            total = sum(1 for _ in self._chunk_sentences(sentences))
+        yield from self._iter_chunk_flashcards(self._chunk_sentences(sentences), num_cards, total)
+    
+    def _iter_chunk_flashcards(self, chunks: Iterable[str], num_cards: int, total: int) -> Iterator[List[Flashcard]]:
+        """Generate the cards of each of the total chunks in padded batches, reusing cached results"""
+        if not total:
+            return
+        produced = 0
+        self.last_token_usage = []
+        self.last_decode_stats = []
+        metrics = self.metrics
+        metrics.count('chunks', total)
+        
+        cards_per_chunk = max(1, num_cards // total)
+        
+        chunks = iter(chunks)
+        start = 0
+        while True:
+            with metrics.timer('chunk'):
+                batch = list(islice(chunks, self.batch_size))
+            if not batch:
+                break
+            results: List[Optional[List[Flashcard]]] = [None] * len(batch)
+            keys: List[Optional[str]] = [None] * len(batch)
+            texts = []
+            targets = []
+            pending = []
             
-            for i, chunk in enumerate(chunks):
-                # Adjust cards for last chunk
-                if i == len(chunks) - 1:
-                    remaining_cards = num_cards - len(all_flashcards)
+            for offset, chunk in enumerate(batch):
+                # Adjust cards for last chunk, assuming the earlier chunks
+                # of this batch deliver their share
+                if start + offset == total - 1:
+                    remaining_cards = num_cards - produced - cards_per_chunk * offset
                     cards_to_generate = max(remaining_cards, 1)
                 else:
                     cards_to_generate = cards_per_chunk
                 
-                prompt = self._create_prompt(chunk, cards_to_generate)
-                
-                # Generate response
-                inputs = self.tokenizer.encode(prompt, return_tensors="pt", max_length=512, truncation=True)
-                inputs = inputs.to(self.device)
+                # Reuse cards generated earlier for identical chunks
+                keys[offset] = self._cache_key(chunk, cards_to_generate)
+                if keys[offset] is not None:
+                    results[offset] = self.cache.get(keys[offset])
+                    if results[offset] is not None:
+                        metrics.count('cache_hits')
+                        continue
+                    metrics.count('cache_misses')
                 
-                with torch.no_grad():
-                    outputs = self.model.generate(
-                        inputs,
-                        max_length=300,
-                        num_return_sequences=1,
-                        temperature=0.7,
-                        do_sample=True,
-                        pad_token_id=self.tokenizer.eos_token_id
-                    )
-                
-                response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-                
-                # Parse flashcards from response
-                flashcards = self._parse_flashcards(response)
-                all_flashcards.extend(flashcards)
+                texts.append(chunk)
+                targets.append(cards_to_generate)
+                pending.append(offset)
+            
+            # Encode and generate the uncached chunks at once
+            if texts:
+                with metrics.timer('prompt'):
+                    prompts = self._build_prompts(texts, targets)
+                responses = self._generate_batch(prompts, targets)
                 
-                if len(all_flashcards) >= num_cards:
-                    break
+                # Parse flashcards from each response
+                for offset, samples in zip(pending, responses):
+                    with metrics.timer('parse'):
+                        results[offset] = self._parse_samples(samples)
+                    metrics.observe('cards_parsed_per_chunk', len(results[offset]))
+                    if keys[offset] is not None:
+                        self.cache.put(keys[offset], results[offset])
+            
+            for offset, flashcards in enumerate(results):
+                flashcards = flashcards[:num_cards - produced]
+                for card in flashcards:
+                    card.chunk = start + offset
+                if flashcards:
+                    produced += len(flashcards)
+                    yield flashcards
             
-            return all_flashcards[:num_cards]
+            start += len(batch)
+            if produced >= num_cards:
+                break
+        
+        template_tokens = sum(u['template_tokens'] for u in self.last_token_usage)
+        content_tokens = sum(u['content_tokens'] for u in self.last_token_usage)
+        logger.info(f"Prompt tokens: {template_tokens} template, {content_tokens} content "
+                    f"over {len(self.last_token_usage)} chunks")
+        if self.last_decode_stats:
+            saved = sum(s['tokens_saved'] for s in self.last_decode_stats)
+            logger.info(f"Adaptive decoding saved {saved} decode steps over {len(self.last_decode_stats)} generate calls")
+    
+    def generate_flashcards(self, text: str, num_cards: int = 20) -> List[Flashcard]:
+        """Generate flashcards from text"""
+        try:
+            all_flashcards = []
+            for flashcards in self.iter_flashcards(text, num_cards):
+                all_flashcards.extend(flashcards)
+            return all_flashcards
         
         except Exception as e:
             logger.error(f"Error generating flashcards: {e}")
             return []
     
-    def _parse_flashcards(self, response: str) -> List[Dict[str, str]]:
+    def _parse_samples(self, samples: List[str]) -> List[Flashcard]:
+        """
+        Cards of every sample drawn for one chunk, merged. A repeated question
+        is dropped, unless the earlier copy had no answer and this one does.
+        """
+        if len(samples) == 1:
+            return self._parse_flashcards(samples[0])
+        merged: Dict[str, Flashcard] = {}
+        for sample in samples:
+            for card in self._parse_flashcards(sample):
+                key = re.sub(r'\W+', '', card.question.lower())
+                if key not in merged or (merged[key].answer == NO_ANSWER and card.answer != NO_ANSWER):
+                    merged[key] = card
+        return list(merged.values())
+    
+    def _parse_flashcards(self, response: str) -> List[Flashcard]:
         """Parse flashcards from model response (flexible for unlabeled Q/A)"""
         flashcards = []
+        inferred = 0
         
         # Split by --- or double newlines
         sections = response.split('---')
@@ -161,7 +650,8 @@ Flashcards:
             sections = response.split('\n\n')
         
         for section in sections:
-            lines = [l.strip() for l in section.strip().split('\n') if l.strip()]
+            # Bare labels (e.g. where decoding stopped at the next card) carry no text
+            lines = [l.strip() for l in section.strip().split('\n') if l.strip() and l.strip() not in ('Q:', 'A:')]
             question = None
             answer = None
             
@@ -174,6 +664,7 @@ Flashcards:
             
             # If not found, try to infer question/answer
             if not question and lines:
+                inferred += 1
                 # If the first line looks like a question
                 if lines[0].endswith('?'):
                     question = lines[0]
@@ -184,11 +675,12 @@ Flashcards:
                     question = lines[0]
             
             if question:
-                flashcards.append({
-                    'question': question,
-                    'answer': answer if answer else '(No answer provided)',
-                    'difficulty': 'Medium'  # Default difficulty
-                })
+                # Medium is the default difficulty
+                flashcards.append(Flashcard(question, answer if answer else NO_ANSWER, 'Medium'))
         
+        if self.metrics.enabled:
+            self.metrics.count('cards_parsed', len(flashcards))
+            self.metrics.count('cards_inferred', inferred)
+            self.metrics.count('cards_unanswered', sum(card.answer == NO_ANSWER for card in flashcards))
         return flashcards
 
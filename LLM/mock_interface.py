@@ -0,0 +1,132 @@
+from typing import List, Dict, Optional
+import re
+import time
+import zlib
+from LLM.llm_interface import FlanT5Interface, SENTENCE_BOUNDARY
+from LLM.model_registry import ModelHandle
+
+MOCK_MODEL_NAME = "mock"
+
+# Words, single punctuation marks and newlines are tokens
+TOKEN = re.compile(r"\w+|[^\w\s]|\n")
+NO_SPACE_BEFORE = re.compile(r"[^\w\s(\[\"']")
+NO_SPACE_AFTER = ("\n", "(", "[")
+
+class MockTokenizer:
+    """
+    Deterministic stand-in for the T5 tokenizer: words and punctuation map to
+    IDs assigned on first sight. Implements the parts of the tokenizer API the
+    interface and PromptBuilder use.
+    """
+
+    pad_token_id = 0
+    eos_token_id = 1
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[str] = ["<pad>", "</s>"]
+
+    def _id(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = self._ids[token] = len(self._tokens)
+            self._tokens.append(token)
+        return token_id
+
+    def encode(self, text: str, add_special_tokens: bool = True) -> List[int]:
+        ids = [self._id(t) for t in TOKEN.findall(text)]
+        return ids + [self.eos_token_id] if add_special_tokens else ids
+
+    def __call__(self, texts, add_special_tokens: bool = True, return_attention_mask: bool = False) -> Dict[str, List]:
+        if isinstance(texts, str):
+            return {"input_ids": self.encode(texts, add_special_tokens)}
+        return {"input_ids": [self.encode(t, add_special_tokens) for t in texts]}
+
+    def decode(self, ids: List[int], skip_special_tokens: bool = False) -> str:
+        parts = []
+        previous = "\n"
+        for token_id in ids:
+            if skip_special_tokens and token_id in (self.pad_token_id, self.eos_token_id):
+                continue
+            token = self._tokens[token_id]
+            if parts and token != "\n" and previous not in NO_SPACE_AFTER and not NO_SPACE_BEFORE.match(token):
+                parts.append(" ")
+            parts.append(token)
+            previous = token
+        return "".join(parts)
+
+    def batch_decode(self, sequences: List[List[int]], skip_special_tokens: bool = False) -> List[str]:
+        return [self.decode(ids, skip_special_tokens) for ids in sequences]
+
+class MockT5Interface(FlanT5Interface):
+    """
+    Offline, deterministic backend for benchmarks and tests of the pipeline.
+    Chunking, prompting, caching and parsing are inherited from FlanT5Interface;
+    generate turns sentences of each chunk into Q/A cards after a configurable
+    delay, so timings measure the pipeline rather than the model.
+    latency: seconds per generate call
+    encoder_latency: seconds per prompt for the encoder pass
+    token_latency: seconds per output token of the longest response in a batch
+    unanswered_every: about one card in n has no answer, exercising grounding (0 = never)
+    extra_cards: cards written beyond the number requested, like a model that runs on
+    """
+
+    backend = "mock"
+
+    def __init__(self, batch_size: int = 8, latency: float = 0.0, token_latency: float = 0.0,
+                 unanswered_every: int = 4, extra_cards: int = 0, encoder_latency: float = 0.0, **kwargs):
+        kwargs.setdefault('seed', 0)
+        super().__init__(MOCK_MODEL_NAME, batch_size=batch_size, device="cpu", **kwargs)
+        self.latency = latency
+        self.encoder_latency = encoder_latency
+        self.token_latency = token_latency
+        self.unanswered_every = unanswered_every
+        self.extra_cards = extra_cards
+
+    @property
+    def handle(self) -> ModelHandle:
+        if self._handle is None:
+            self._handle = ModelHandle(self.model_name, None, MockTokenizer(), self.device, self.dtype)
+        return self._handle
+
+    def _respond(self, prompt: str, sample: int = 0) -> str:
+        """Cards built from the prompt's sentences; each sample starts one sentence later"""
+        requested = re.search(r"generate (\d+) flashcards", prompt)
+        num_cards = int(requested.group(1)) if requested else 1
+        text = prompt.rsplit("Text:", 1)[-1].rsplit("Flashcards:", 1)[0]
+
+        cards = []
+        for sentence in SENTENCE_BOUNDARY.split(text.strip())[sample:sample + num_cards + self.extra_cards]:
+            words = re.findall(r"\w+", sentence)
+            if not words:
+                continue
+            topic = max(words, key=len)
+            card = f"Q: What does the text say about {topic}?"
+            # Chosen by content, not position, so the same chunk always gives the same cards
+            if not self.unanswered_every or zlib.crc32(sentence.encode('utf-8')) % self.unanswered_every:
+                card += f"\nA: {sentence}"
+            cards.append(card)
+        return "\n---\n".join(cards)
+
+    def _generate(self, prompts: List[List[int]], num_cards: Optional[List[int]] = None) -> List[List[int]]:
+        with self.handle.lock:
+            responses = [self._respond(prompt, sample) for prompt in self.tokenizer.batch_decode(prompts)
+                         for sample in range(self.samples_per_chunk)]
+            outputs = [self.tokenizer.encode(r) for r in responses]
+            limit = self.generation_params.get('max_length', 300) - 1
+            params, stopping = self._decode_params(num_cards)
+            budget = params.get('max_new_tokens', limit)
+
+            # Replay the decode one step at a time, as generate would
+            steps = 0
+            for step in range(min(budget, max((len(o) for o in outputs), default=0))):
+                steps += 1
+                if stopping is not None and stopping.update([o[step:step + 1] for o in outputs]):
+                    break
+            outputs = [o[:steps] for o in outputs]
+
+            delay = self.latency + self.encoder_latency * len(prompts) + self.token_latency * steps
+            if delay:
+                time.sleep(delay)
+        self._record_decode(num_cards, steps, budget, stopping)
+        return outputs
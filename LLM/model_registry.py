@@ -0,0 +1,149 @@
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+
+# torch and transformers are imported inside the functions that need them so
+# that importing the package (CLI --help, exports) stays fast
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "google/flan-t5-base"
+
+# Draft model for assisted decoding: same vocabulary as every Flan-T5 size
+DEFAULT_DRAFT_MODEL_NAME = "google/flan-t5-small"
+
+# Weight formats the registry can load:
+#   float32  - full precision (baseline)
+#   bfloat16 - half the memory, fast on CPUs with AVX512-BF16/AMX
+#   int8     - dynamic int8 quantization of the linear layers (CPU only)
+DTYPES = ("float32", "bfloat16", "int8")
+
+def configure_threads(threads: Optional[int] = None):
+    """Set torch intra-op threads (defaults to torch's own choice) and one inter-op thread"""
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        # Generation is a sequential loop; inter-op parallelism only adds overhead
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before the first parallel op runs
+        pass
+
+def default_device() -> str:
+    """CUDA when available, CPU otherwise"""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def load_tokenizer(model_name: str, fast: bool = True):
+    """
+    The Rust-backed T5TokenizerFast, which encodes and decodes whole batches
+    natively, or the SentencePiece T5Tokenizer when the fast one cannot be
+    loaded (tokenizers not installed, or no tokenizer.json to load or convert)
+    """
+    from transformers import T5Tokenizer
+    if fast:
+        try:
+            from transformers import T5TokenizerFast
+            return T5TokenizerFast.from_pretrained(model_name)
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Fast tokenizer unavailable for {model_name}, using SentencePiece: {e}")
+    return T5Tokenizer.from_pretrained(model_name)
+
+class ModelHandle:
+    """A loaded model and tokenizer shared by every interface in the process"""
+
+    def __init__(self, model_name: str, model, tokenizer, device: str, dtype: str):
+        self.model_name = model_name
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.dtype = dtype
+        # Serializes generate calls; the model is not safe to run concurrently
+        self.lock = threading.Lock()
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded models keyed by (model name, device, dtype).
+    Models load lazily on first request and are shared across Streamlit sessions
+    and threads. Loading is guarded per key, so concurrent first requests load
+    a model only once without blocking lookups of models already loaded.
+    """
+
+    def __init__(self):
+        self._handles: Dict[Tuple[str, str, str], ModelHandle] = {}
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, model_name: str, device: Optional[str], dtype: str) -> Tuple[str, str, str]:
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}', expected one of {DTYPES}")
+        device = device or default_device()
+        if dtype == "int8" and device != "cpu":
+            raise ValueError("int8 dynamic quantization is only supported on CPU")
+        return (model_name, device, dtype)
+
+    def get(self, model_name: str = DEFAULT_MODEL_NAME,
+            device: Optional[str] = None,
+            dtype: str = "float32") -> ModelHandle:
+        """Return the shared handle for a model, loading it on first use"""
+        key = self._key(model_name, device, dtype)
+        handle = self._handles.get(key)
+        if handle is not None:
+            return handle
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have finished loading while we waited
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = self._load(*key)
+                self._handles[key] = handle
+        return handle
+
+    def _load(self, model_name: str, device: str, dtype: str) -> ModelHandle:
+        import torch
+        from transformers import T5ForConditionalGeneration
+        logger.info(f"Loading {model_name} on {device} ({dtype})")
+        tokenizer = load_tokenizer(model_name)
+        if dtype == "int8":
+            model = T5ForConditionalGeneration.from_pretrained(model_name, torch_dtype=torch.float32)
+            model.eval()
+            # Weights stored as int8, activations quantized on the fly
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        else:
+            model = T5ForConditionalGeneration.from_pretrained(model_name, torch_dtype=getattr(torch, dtype))
+        model.to(device)
+        model.eval()
+        return ModelHandle(model_name, model, tokenizer, device, dtype)
+
+    def preload(self, model_name: str = DEFAULT_MODEL_NAME,
+                device: Optional[str] = None,
+                dtype: str = "float32") -> ModelHandle:
+        """Load a model ahead of the first request (e.g. at server start)"""
+        return self.get(model_name, device, dtype)
+
+    def loaded(self) -> List[Tuple[str, str, str]]:
+        """Keys of the models currently loaded"""
+        return list(self._handles)
+
+    def clear(self):
+        """Drop every loaded model"""
+        with self._lock:
+            self._handles.clear()
+            self._key_locks.clear()
+
+# Shared by the whole process
+registry = ModelRegistry()
+
+def get_model(model_name: str = DEFAULT_MODEL_NAME,
+              device: Optional[str] = None,
+              dtype: str = "float32") -> ModelHandle:
+    return registry.get(model_name, device, dtype)
+
+def preload(model_name: str = DEFAULT_MODEL_NAME,
+            device: Optional[str] = None,
+            dtype: str = "float32") -> ModelHandle:
+    return registry.preload(model_name, device, dtype)
@@ -0,0 +1,115 @@
+from typing import Iterable, Iterator, List, Union
+from pathlib import Path
+import re
+from LLM.llm_interface import SENTENCE_BOUNDARY
+
+# Characters read per block when streaming a file
+BLOCK_SIZE = 1 << 20
+
+# A URL runs until whitespace or a character outside this single class
+URL = re.compile(r"https?://[!$-_a-z]+")
+
+def _clean_token(token: str) -> str:
+    """Token with URLs removed; empty if it is (or still contains) an e-mail address"""
+    if '@' in token or '://' in token:
+        token = URL.sub('', token)
+        if '@' in token:
+            return ''
+    return token
+
+def _normalize_tokens(tokens: List[str]) -> str:
+    return ' '.join(filter(None, map(_clean_token, tokens)))
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace and strip URLs and e-mail addresses in one pass.
+    The text is split on whitespace once and each token is checked with
+    plain substring tests; the URL pattern (a single character class, so it
+    cannot backtrack) only runs on the rare tokens that contain "://" or "@".
+    """
+    return _normalize_tokens(text.split())
+
+def read_blocks(path: Union[str, Path], block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Decoded blocks of a UTF-8 text file, read with a bounded buffer"""
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+def iter_normalized(blocks: Iterable[str]) -> Iterator[str]:
+    """
+    Normalize a stream of text blocks. A token cut off at the end of a block
+    is carried into the next one, so joining the pieces gives the same text
+    as normalize_text() on the whole input.
+    """
+    carry = ''
+    started = False
+    for block in blocks:
+        text = carry + block
+        tokens = text.split()
+        carry = tokens.pop() if tokens and not text[-1].isspace() else ''
+        piece = _normalize_tokens(tokens)
+        if piece:
+            yield ' ' + piece if started else piece
+            started = True
+    piece = _clean_token(carry)
+    if piece:
+        yield ' ' + piece if started else piece
+
+def _tail_start(text: str) -> int:
+    """
+    Where a sentence boundary could still complete once more text arrives:
+    the whitespace run near the end (whose look-ahead may be cut off) and the
+    two characters before it that the look-behind needs
+    """
+    start = max(0, len(text) - 2)
+    while start > 0 and text[start - 1].isspace():
+        start -= 1
+    return max(0, start - 2)
+
+def iter_sentences(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    Sentences of a stream of normalized text, split as the chunker splits them.
+    Only the short tail where a boundary may still complete is scanned again
+    with the next piece; the rest of an unfinished sentence is kept aside, so
+    text without boundaries streams in linear time.
+    """
+    pending: List[str] = []
+    tail = ""
+    for piece in pieces:
+        text = tail + piece
+        last = 0
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            pending.append(text[last:match.start()])
+            sentence = "".join(pending).strip()
+            pending = []
+            if sentence:
+                yield sentence
+            last = match.end()
+        rest = text[last:]
+        split = _tail_start(rest)
+        pending.append(rest[:split])
+        tail = rest[split:]
+    sentence = ("".join(pending) + tail).strip()
+    if sentence:
+        yield sentence
+
+def read_sentences(path: Union[str, Path], block_size: int = BLOCK_SIZE) -> List[str]:
+    """Normalized sentences of a text file, which is never held in memory whole"""
+    return list(SentenceFile(path, block_size))
+
+class SentenceFile:
+    """
+    Normalized sentences of a text file as a re-iterable stream: every pass
+    reads and normalizes the file again, so several passes over a large
+    document never hold it in memory.
+    """
+
+    def __init__(self, path: Union[str, Path], block_size: int = BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+
+    def __iter__(self) -> Iterator[str]:
+        return iter_sentences(iter_normalized(read_blocks(self.path, self.block_size)))
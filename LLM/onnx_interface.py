@@ -0,0 +1,125 @@
+from typing import Optional
+from pathlib import Path
+import logging
+import os
+import shutil
+import tempfile
+
+from LLM.llm_interface import FlanT5Interface
+from LLM.model_registry import DEFAULT_MODEL_NAME, ModelHandle, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Exported graphs are kept here, one directory per model
+DEFAULT_ONNX_CACHE = Path(os.environ.get(
+    "FLASHCARD_ONNX_CACHE", Path.home() / ".cache" / "flashcard-generator" / "onnx"
+))
+
+# Written last into a finished export; a directory without it is incomplete
+EXPORT_MARKER = ".export-complete"
+
+class OnnxModelRegistry(ModelRegistry):
+    """
+    Registry of Flan-T5 models running on ONNX Runtime.
+    The first load exports the encoder and the decoder (with and without KV
+    cache inputs) to ONNX and saves them with the tokenizer; later loads,
+    in this or any other process, read the saved graphs directly without
+    constructing the PyTorch model. An export is written to a temporary
+    directory next to its final one and renamed into place when complete,
+    so a crash mid-export or workers exporting at the same time never leave
+    a half-written directory to be loaded.
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_ONNX_CACHE):
+        super().__init__()
+        self.cache_dir = Path(cache_dir)
+
+    def _key(self, model_name: str, device: Optional[str], dtype: str):
+        if dtype != "float32":
+            raise ValueError("The ONNX backend only exports float32 graphs")
+        return (model_name, device or "cpu", dtype)
+
+    def export_dir(self, model_name: str) -> Path:
+        return self.cache_dir / model_name.replace("/", "--")
+
+    def _load(self, model_name: str, device: str, dtype: str) -> ModelHandle:
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX backend needs optimum and onnxruntime: pip install optimum[onnxruntime]"
+            ) from e
+
+        provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+        export_dir = self.export_dir(model_name)
+        if (export_dir / EXPORT_MARKER).exists():
+            logger.info(f"Loading ONNX graphs for {model_name} from {export_dir}")
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True, provider=provider)
+            tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        else:
+            logger.info(f"Exporting {model_name} to ONNX in {export_dir} (one-off)")
+            model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, use_cache=True,
+                                                         provider=provider)
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self._save_export(export_dir, model, tokenizer)
+        return ModelHandle(model_name, model, tokenizer, device, dtype)
+
+    @staticmethod
+    def _save_export(export_dir: Path, model, tokenizer):
+        """Save the graphs and tokenizer to a sibling directory, then rename it into place"""
+        export_dir.parent.mkdir(parents=True, exist_ok=True)
+        if export_dir.exists() and not (export_dir / EXPORT_MARKER).exists():
+            # Left by an interrupted export; move it aside (another worker may beat us to it)
+            stale = Path(tempfile.mkdtemp(dir=export_dir.parent, prefix=f"{export_dir.name}.stale-"))
+            moved = stale / export_dir.name
+            try:
+                os.replace(export_dir, moved)
+                if (moved / EXPORT_MARKER).exists():
+                    # Completed by another worker since the check above; put it back
+                    os.replace(moved, export_dir)
+            except OSError:
+                pass
+            shutil.rmtree(stale, ignore_errors=True)
+        partial = Path(tempfile.mkdtemp(dir=export_dir.parent, prefix=f"{export_dir.name}.partial-"))
+        try:
+            model.save_pretrained(partial)
+            tokenizer.save_pretrained(partial)
+            (partial / EXPORT_MARKER).touch()
+            os.replace(partial, export_dir)
+        except OSError:
+            if not (export_dir / EXPORT_MARKER).exists():
+                raise
+            # Another process finished the same export first; its copy is as good as ours
+            logger.info(f"{export_dir} was exported concurrently; keeping that copy")
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+
+# Shared by the whole process
+onnx_registry = OnnxModelRegistry()
+
+class OnnxT5Interface(FlanT5Interface):
+    """
+    Flan-T5 served by ONNX Runtime.
+    Chunking, prompting, batching, caching and parsing are inherited from
+    FlanT5Interface; only the model behind generate changes, so it can be
+    passed to FlashcardGenerator as is.
+    """
+
+    backend = "onnx"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, batch_size: int = 8,
+                 device: Optional[str] = "cpu", registry: Optional[OnnxModelRegistry] = None, **kwargs):
+        super().__init__(model_name, batch_size=batch_size, device=device, dtype="float32", **kwargs)
+        if self.draft_model_name is not None:
+            raise ValueError("Assisted decoding needs the torch backend")
+        # None means the process-wide registry; keeps the interface picklable for worker pools
+        self._registry = registry
+
+    @property
+    def handle(self) -> ModelHandle:
+        """Shared ONNX Runtime session handle, exported or loaded on first use"""
+        if self._handle is None:
+            registry = self._registry or onnx_registry
+            self._handle = registry.get(self.model_name, self.device, self.dtype)
+        return self._handle
@@ -0,0 +1,153 @@
+from typing import List, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the wording or examples change so cached results are not reused
+PROMPT_VERSION = "2"
+
+INSTRUCTIONS = """Read the following text and generate {num_cards} flashcards. For each flashcard, you MUST provide both a question and a short, factual answer, based only on the text. Format each as:
+Q: <question>
+A: <answer>
+---
+"""
+
+EXAMPLES_HEADER = "\nHere are some examples:\n"
+
+EXAMPLES = [
+    ("What is photosynthesis?",
+     "Photosynthesis is the process by which green plants use sunlight to synthesize food from carbon dioxide and water."),
+    ("Who painted the Mona Lisa?",
+     "Leonardo da Vinci painted the Mona Lisa."),
+    ("What is the capital of France?",
+     "Paris is the capital of France."),
+    ("Who led the Salt March in India?",
+     "Mahatma Gandhi led the Salt March in India."),
+    ("When did India gain independence from British rule?",
+     "India gained independence on August 15, 1947."),
+    ("What is the main idea of the passage?",
+     "The main idea is the struggle for India's independence from British rule."),
+    ("What is the significance of the Renaissance?",
+     "The Renaissance marked a period of cultural, artistic, and scientific rebirth in Europe."),
+    ("What is Python used for?",
+     "Python is used for web development, data science, artificial intelligence, and automation."),
+    ("What is the Ganges River known for?",
+     "The Ganges River is considered sacred in Hinduism and is a major river in India."),
+    ("What is the process of human respiration?",
+     "Human respiration is the process of inhaling oxygen and exhaling carbon dioxide."),
+]
+
+TEXT_HEADER = "\nText:\n"
+
+TAIL = "\n\nFlashcards:\n"
+
+def _example_block(question: str, answer: str) -> str:
+    return f"Q: {question}\nA: {answer}\n---\n"
+
+class PromptBuilder:
+    """
+    Token-budget aware prompt builder for Flan-T5.
+    The instruction, example and framing blocks are tokenized once and their
+    token IDs cached, so every prompt is assembled from IDs. As many few-shot
+    examples are included as the budget allows after the chunk text, falling
+    back to a zero-shot prompt, so the chunk itself is never truncated.
+    """
+
+    def __init__(self, tokenizer, max_input_tokens: int = 512, max_examples: Optional[int] = None):
+        self.tokenizer = tokenizer
+        self.max_input_tokens = max_input_tokens
+        self.max_examples = len(EXAMPLES) if max_examples is None else max_examples
+
+        self._instruction_ids: Dict[int, List[int]] = {}
+        blocks = self._encode_batch([EXAMPLES_HEADER, TEXT_HEADER, TAIL]
+                                    + [_example_block(q, a) for q, a in EXAMPLES])
+        self._examples_header_ids, self._text_header_ids, self._tail_ids = blocks[:3]
+        self._example_ids = blocks[3:]
+        self._eos_ids = [tokenizer.eos_token_id] if tokenizer.eos_token_id is not None else []
+
+    def _encode(self, text: str) -> List[int]:
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    def _encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """Token IDs of many texts from a single tokenizer call"""
+        if not texts:
+            return []
+        return self.tokenizer(texts, add_special_tokens=False, return_attention_mask=False)["input_ids"]
+
+    def _instructions(self, num_cards: int) -> List[int]:
+        """Instruction IDs, cached per requested card count"""
+        ids = self._instruction_ids.get(num_cards)
+        if ids is None:
+            ids = self._encode(INSTRUCTIONS.format(num_cards=num_cards))
+            self._instruction_ids[num_cards] = ids
+        return ids
+
+    def template_overhead(self, num_examples: int = 0, num_cards: int = 100) -> int:
+        """Template tokens around the chunk text for a given number of examples"""
+        overhead = (len(self._instructions(num_cards)) + len(self._text_header_ids)
+                    + len(self._tail_ids) + len(self._eos_ids))
+        if num_examples > 0:
+            overhead += len(self._examples_header_ids)
+            overhead += sum(len(ids) for ids in self._example_ids[:num_examples])
+        return overhead
+
+    def build(self, text: str, num_cards: int,
+              content_ids: Optional[List[int]] = None) -> Tuple[List[int], Dict[str, int]]:
+        """
+        Build prompt token IDs for a chunk.
+        Returns the IDs and a usage dict splitting template and content tokens.
+        """
+        if content_ids is None:
+            content_ids = self._encode(text)
+        instruction_ids = self._instructions(num_cards)
+
+        room = self.max_input_tokens - self.template_overhead(0, num_cards) - len(content_ids)
+
+        # Content too long even for a zero-shot prompt: keep what fits and report it
+        truncated = 0
+        if room < 0:
+            truncated = -room
+            content_ids = content_ids[:len(content_ids) - truncated]
+            logger.warning(f"Chunk exceeds prompt budget, truncated {truncated} tokens")
+            room = 0
+
+        # Add examples in order while they fit
+        example_ids: List[int] = []
+        num_examples = 0
+        if room > len(self._examples_header_ids):
+            room -= len(self._examples_header_ids)
+            for ids in self._example_ids[:self.max_examples]:
+                if len(ids) > room:
+                    break
+                example_ids.extend(ids)
+                room -= len(ids)
+                num_examples += 1
+        if num_examples:
+            example_ids = self._examples_header_ids + example_ids
+
+        input_ids = (instruction_ids + example_ids + self._text_header_ids
+                     + list(content_ids) + self._tail_ids + self._eos_ids)
+        usage = {
+            'template_tokens': len(input_ids) - len(content_ids),
+            'content_tokens': len(content_ids),
+            'examples': num_examples,
+            'truncated_tokens': truncated,
+            'total_tokens': len(input_ids)
+        }
+        return input_ids, usage
+
+    def build_batch(self, texts: List[str], num_cards: List[int]) -> List[Tuple[List[int], Dict[str, int]]]:
+        """build() for many chunks, their text encoded in one tokenizer call"""
+        return [self.build(text, cards, ids)
+                for text, cards, ids in zip(texts, num_cards, self._encode_batch(texts))]
+
+    def build_text(self, text: str, num_cards: int, num_examples: Optional[int] = None) -> str:
+        """Prompt as a string, with all examples unless num_examples is given"""
+        if num_examples is None:
+            num_examples = self.max_examples
+        parts = [INSTRUCTIONS.format(num_cards=num_cards)]
+        if num_examples > 0:
+            parts.append(EXAMPLES_HEADER)
+            parts.extend(_example_block(q, a) for q, a in EXAMPLES[:num_examples])
+        parts.extend([TEXT_HEADER, text, TAIL])
+        return "".join(parts)
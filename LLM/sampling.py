@@ -0,0 +1,8 @@
+from typing import List
+from array import array
+import zlib
+
+def row_seed(seed: int, prompt: List[int], sample: int = 0) -> int:
+    """Seed for one decoded sequence: the run's seed, the prompt's token IDs and the sample number"""
+    digest = zlib.crc32(array('i', prompt).tobytes())
+    return (seed * 1_000_003 + digest * 101 + sample) % (1 << 63)
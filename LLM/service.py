@@ -0,0 +1,303 @@
+from typing import Dict, Iterator, Optional
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may take, queueing included, unless it asks for less
+DEFAULT_TIMEOUT = 120.0
+
+# How often the dispatcher looks for workers that died
+WATCH_INTERVAL = 1.0
+
+# Seconds past its deadline an abandoned job may take to report done before it stops counting
+ABANDON_GRACE = 60.0
+
+class QueueFull(Exception):
+    """Every worker is busy and the request queue is at its limit"""
+
+class JobTimeout(Exception):
+    """A request ran past its deadline"""
+
+class JobError(Exception):
+    """Generation failed or produced no cards; the message says why"""
+
+def _worker_main(worker_id: int, threads: int, generator_kwargs: Dict, tasks, results):
+    """
+    Worker process loop: load the model once, report ready, then generate
+    decks for tasks until a None task arrives. Cards are sent back one by one
+    as ('card', job_id, card) messages, followed by the worker's telemetry
+    ('metrics', worker_id, snapshot) and ('done', job_id, error).
+    """
+    from LLM.flashCard_genrator import load_worker_generator
+    from LLM.telemetry import InMemorySink
+    metrics = InMemorySink()
+    generator = load_worker_generator(threads, dict(generator_kwargs, metrics=metrics))
+    results.put(('ready', worker_id, os.getpid()))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id = task['id']
+        results.put(('start', job_id, worker_id))
+        if time.time() > task['deadline']:
+            # The client has given up while this waited in the queue
+            results.put(('done', job_id, 'timeout'))
+            continue
+        error = None
+        count = 0
+        try:
+            for card in generator.iter_flashcards(task['text'], task['num_cards'], task['difficulty']):
+                results.put(('card', job_id, card.to_dict()))
+                count += 1
+                if time.time() > task['deadline']:
+                    error = 'timeout'
+                    break
+            if not count and not error:
+                error = generator.last_error or "No flashcards generated"
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed on job {job_id}: {e}")
+            error = f"Error generating flashcards: {e}"
+        results.put(('metrics', worker_id, metrics.snapshot()))
+        results.put(('done', job_id, error))
+
+class Job:
+    """One submitted request; iterate cards() to receive its flashcards as they are generated"""
+
+    def __init__(self, job_id: int, deadline: float):
+        self.id = job_id
+        self.deadline = deadline
+        self.messages: queue.Queue = queue.Queue()
+        self.cards_sent = 0
+        # Set once the client stops reading; later messages are dropped
+        self.abandoned = False
+
+    def cards(self) -> Iterator[Dict[str, str]]:
+        """
+        Yield cards until the worker reports the job done. Raises JobTimeout
+        past the deadline and JobError when the worker reports a failure.
+        """
+        while True:
+            remaining = self.deadline - time.time()
+            if remaining <= 0:
+                raise JobTimeout(f"Request timed out after {self.cards_sent} cards")
+            try:
+                kind, payload = self.messages.get(timeout=remaining)
+            except queue.Empty:
+                raise JobTimeout(f"Request timed out after {self.cards_sent} cards")
+            if kind == 'card':
+                self.cards_sent += 1
+                yield payload
+            elif payload == 'timeout':
+                raise JobTimeout(f"Request timed out after {self.cards_sent} cards")
+            elif payload:
+                raise JobError(payload)
+            else:
+                return
+
+class WorkerPool:
+    """
+    Fixed pool of worker processes, each holding its own FlashcardGenerator
+    (and model) for the lifetime of the pool. Requests share one task queue;
+    at most workers + max_queue are accepted at a time and submit() raises
+    QueueFull beyond that, so overload is refused quickly instead of piling
+    up. A dispatcher thread routes the workers' messages to their jobs and
+    watches the workers: when one dies, the job it was running fails and a
+    worker that had loaded its model is started again in its place.
+    """
+
+    def __init__(self, workers: int = 1, generator_kwargs: Optional[Dict] = None, max_queue: int = 16,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.workers = max(1, workers)
+        self.generator_kwargs = dict(generator_kwargs or {})
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.processes = []
+        self.ready_workers = set()
+        # Latest telemetry snapshot of each worker
+        self.worker_metrics: Dict[int, Dict] = {}
+        self.jobs: Dict[int, Job] = {}
+        # Worker running each started job
+        self.running: Dict[int, int] = {}
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.crashed = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        self._closing = False
+        # Workers that died before loading their model; not restarted
+        self._failed = set()
+
+    def start(self):
+        """Start the workers; they report ready once their model is loaded"""
+        self._threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # spawn: forking a process that already initialised torch is unsafe
+        self._context = multiprocessing.get_context('spawn')
+        self.tasks = self._context.Queue()
+        self.results = self._context.Queue()
+        self.processes = [self._spawn(worker_id) for worker_id in range(self.workers)]
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def _spawn(self, worker_id: int):
+        process = self._context.Process(target=_worker_main, daemon=True,
+                                        args=(worker_id, self._threads, self.generator_kwargs,
+                                              self.tasks, self.results))
+        process.start()
+        return process
+
+    def _dispatch(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                message = self.results.get(timeout=WATCH_INTERVAL)
+            except queue.Empty:
+                message = ()
+            if time.monotonic() - last_check >= WATCH_INTERVAL:
+                self._check_workers()
+                last_check = time.monotonic()
+            if message is None:
+                break
+            if not message:
+                continue
+            kind, key, payload = message
+            if kind == 'ready':
+                logger.info(f"Worker {key} ready (pid {payload})")
+                with self._lock:
+                    self.ready_workers.add(key)
+                continue
+            if kind == 'metrics':
+                with self._lock:
+                    self.worker_metrics[key] = payload
+                continue
+            if kind == 'start':
+                with self._lock:
+                    self.running[key] = payload
+                continue
+            with self._lock:
+                job = self.jobs.get(key)
+                if kind == 'done':
+                    self.jobs.pop(key, None)
+                    self.running.pop(key, None)
+                    self.completed += 1
+            # Messages for a job the client abandoned are dropped
+            if job is not None and not job.abandoned:
+                job.messages.put((kind, payload))
+
+    def _check_workers(self):
+        """Fail the jobs of workers that died and restart them; forget abandoned jobs that never finish"""
+        if self._closing:
+            return
+        for worker_id, process in enumerate(self.processes):
+            if worker_id in self._failed or process.is_alive():
+                continue
+            with self._lock:
+                was_ready = worker_id in self.ready_workers
+                self.ready_workers.discard(worker_id)
+                lost = [job_id for job_id, worker in self.running.items() if worker == worker_id]
+                jobs = []
+                for job_id in lost:
+                    del self.running[job_id]
+                    job = self.jobs.pop(job_id, None)
+                    if job is not None:
+                        jobs.append(job)
+                self.crashed += 1
+            logger.error(f"Worker {worker_id} (pid {process.pid}) died with exit code {process.exitcode}"
+                         f"{'; restarting it' if was_ready else ''}")
+            for job in jobs:
+                if not job.abandoned:
+                    job.messages.put(('done', f"Worker {worker_id} died while generating"))
+            if was_ready:
+                self.processes[worker_id] = self._spawn(worker_id)
+            else:
+                # It never loaded its model; starting it again would fail the same way
+                self._failed.add(worker_id)
+        now = time.time()
+        with self._lock:
+            for job_id in [job_id for job_id, job in self.jobs.items()
+                           if job.abandoned and now > job.deadline + ABANDON_GRACE]:
+                del self.jobs[job_id]
+                self.running.pop(job_id, None)
+
+    def alive(self) -> int:
+        return sum(p.is_alive() for p in self.processes)
+
+    @property
+    def ready(self) -> bool:
+        """True while at least one worker has loaded its model and is running"""
+        with self._lock:
+            ready = list(self.ready_workers)
+        return any(self.processes[worker_id].is_alive() for worker_id in ready)
+
+    def submit(self, text: str, num_cards: int = 20, difficulty: str = "Mixed",
+               timeout: Optional[float] = None) -> Job:
+        """Queue a deck request; raises QueueFull when the pool is saturated"""
+        timeout = min(timeout or self.timeout, self.timeout)
+        with self._lock:
+            if len(self.jobs) >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFull(f"{len(self.jobs)} requests in progress")
+            job = Job(next(self._ids), time.time() + timeout)
+            self.jobs[job.id] = job
+        self.tasks.put({'id': job.id, 'text': text, 'num_cards': num_cards,
+                        'difficulty': difficulty, 'deadline': job.deadline})
+        return job
+
+    def abandon(self, job: Job, timed_out: bool = False):
+        """
+        Drop the messages of a job the client stopped reading. Its worker keeps
+        generating until the deadline, so the job still counts against the
+        queue limit until the worker reports it done.
+        """
+        with self._lock:
+            if job.id in self.jobs:
+                job.abandoned = True
+            if timed_out:
+                self.timed_out += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'workers_alive': self.alive(),
+                'workers_ready': len(self.ready_workers),
+                'in_progress': len(self.jobs),
+                'max_queue': self.max_queue,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'crashed': self.crashed
+            }
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Telemetry of all workers combined: counters and summary counts and sums added up"""
+        counters: Dict[str, float] = {}
+        summaries: Dict[str, Dict] = {}
+        with self._lock:
+            snapshots = list(self.worker_metrics.values())
+        for snapshot in snapshots:
+            for name, value in snapshot['counters'].items():
+                counters[name] = counters.get(name, 0) + value
+            for name, summary in snapshot['summaries'].items():
+                total = summaries.setdefault(name, {'count': 0, 'sum': 0.0})
+                total['count'] += summary['count']
+                total['sum'] += summary['sum']
+        return {'counters': counters, 'summaries': summaries}
+
+    def close(self, timeout: float = 5.0):
+        self._closing = True
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.results.put(None)
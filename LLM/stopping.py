@@ -0,0 +1,133 @@
+from typing import List, Optional
+import re
+
+# Decoder tokens one Q/A pair takes, with headroom; sizes max_new_tokens
+TOKENS_PER_CARD = 48
+
+# Room for separators and any preamble before the first card
+DECODE_SLACK = 16
+
+# Q: and A: only count at the start of a word (or straight after a separator), so
+# text such as "USA:" or "FAQ:" inside a card is not taken for a label
+MARKER = re.compile(r'(?<![^\s-])(?:Q|A):|-{3,}')
+
+def max_new_tokens_for(num_cards: int, limit: int) -> int:
+    """Decode budget for a prompt asking for num_cards cards, capped at limit"""
+    return max(1, min(limit, DECODE_SLACK + TOKENS_PER_CARD * num_cards))
+
+class CardProgress:
+    """
+    Incremental parse of one partial decode. Text is fed in as it is decoded;
+    a card counts as complete once the marker after it ("Q:" or "---")
+    appears, so stopping there never leaves a half-written card.
+    stop_reason becomes 'cards' when the requested number is complete,
+    'repetition' when a question repeats, or 'end' on an empty card ("---"
+    twice), which the model emits once it has run out of material.
+    """
+
+    __slots__ = ('target', 'text', 'scan', 'state', 'field_start', 'question', 'cards', 'seen', 'stop_reason')
+
+    def __init__(self, target: int):
+        self.target = max(1, target)
+        self.text = ''
+        self.scan = 0
+        self.state = None
+        self.field_start = 0
+        self.question = ''
+        self.cards = 0
+        self.seen = set()
+        self.stop_reason: Optional[str] = None
+
+    def feed(self, piece: str) -> Optional[str]:
+        """Append decoded text; returns the stop reason once decoding can stop"""
+        self.text += piece
+        for match in MARKER.finditer(self.text, self.scan):
+            # A separator at the very end may still grow; look again next time
+            if match.end() == len(self.text) and match.group()[0] == '-':
+                break
+            self._marker(match)
+            self.scan = match.end()
+            if self.stop_reason:
+                break
+        return self.stop_reason
+
+    def _marker(self, match: re.Match):
+        content = self.text[self.field_start:match.start()].strip()
+        kind = match.group()
+        if kind == 'A:':
+            if self.state == 'Q':
+                self.question = content
+            self.state = 'A'
+        else:
+            # A question without an answer still becomes a card (it is grounded later)
+            if self.state == 'Q' and content:
+                self.question = content
+                self._complete()
+            elif self.state == 'A':
+                self._complete()
+            elif self.state == 'sep' and kind != 'Q:' and not content:
+                self.stop_reason = 'end'
+            self.state = 'Q' if kind == 'Q:' else 'sep'
+        self.field_start = match.end()
+
+    def _complete(self):
+        key = re.sub(r'\W+', '', self.question.lower())
+        if key in self.seen:
+            self.stop_reason = 'repetition'
+            return
+        self.seen.add(key)
+        self.cards += 1
+        if self.cards >= self.target:
+            self.stop_reason = 'cards'
+
+class CardStoppingCriteria:
+    """
+    Stopping criterion for model.generate (the transformers StoppingCriteria
+    call protocol) that decodes only the tokens added since the previous step
+    and feeds them to one CardProgress per sequence. The new tokens are decoded
+    after the sequence's previous token and that token's own text is cut off
+    again, since a tokenizer drops the space before the first token it
+    decodes. Generation stops once
+    every sequence in the batch has its cards, repeats itself, ends its deck
+    or has produced EOS.
+    """
+
+    def __init__(self, tokenizer, targets: List[int]):
+        self.tokenizer = tokenizer
+        self.progress = [CardProgress(t) for t in targets]
+        self.done = [False] * len(targets)
+        self.reasons: List[Optional[str]] = [None] * len(targets)
+        self.last: List[List[int]] = [[] for _ in targets]
+        self.consumed = 0
+
+    def __call__(self, input_ids, scores=None, **kwargs) -> bool:
+        new_ids = input_ids[:, self.consumed:].tolist()
+        self.consumed = input_ids.shape[1]
+        return self.update(new_ids)
+
+    def update(self, new_ids: List[List[int]]) -> bool:
+        """Feed each sequence's new token IDs; True once every sequence is done"""
+        eos = self.tokenizer.eos_token_id
+        active, rows, contexts = [], [], []
+        for i, ids in enumerate(new_ids):
+            if self.done[i]:
+                continue
+            if eos in ids:
+                ids = ids[:ids.index(eos)]
+                self.done[i] = True
+                self.reasons[i] = 'eos'
+            active.append(i)
+            rows.append(self.last[i] + ids)
+            contexts.append(self.last[i])
+            if ids:
+                self.last[i] = ids[-1:]
+        # One decode call for the whole batch per step
+        texts = self.tokenizer.batch_decode(rows + contexts, skip_special_tokens=True)
+        for i, text, context in zip(active, texts, texts[len(rows):]):
+            if text.startswith(context):
+                text = text[len(context):]
+            reason = self.progress[i].feed(text)
+            if reason:
+                self.done[i] = True
+                self.reasons[i] = reason
+        return all(self.done)
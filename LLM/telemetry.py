@@ -0,0 +1,260 @@
+from typing import Dict, Iterable, Optional, Union
+from pathlib import Path
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages timed as "<stage>_seconds", in pipeline order
+STAGES = ('preprocess', 'chunk', 'prompt', 'generate', 'decode', 'parse', 'postprocess', 'dedup')
+
+PROMETHEUS_PREFIX = 'flashcards_'
+
+class _NullTimer:
+    """Timer of a disabled sink: measures nothing"""
+
+    __slots__ = ()
+    seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ('sink', 'name', 'start', 'seconds')
+
+    def __init__(self, sink: 'MetricsSink', name: str):
+        self.sink = sink
+        self.name = name
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        self.sink.observe(f"{self.name}_seconds", self.seconds)
+        return False
+
+class MetricsSink:
+    """
+    Where instrumentation goes. This base class is the null sink: every call
+    is a no-op and timer() hands out one shared do-nothing context manager,
+    so instrumented code costs a method call per chunk when telemetry is off.
+    Callers that would do extra work to compute a value check enabled first.
+    """
+
+    enabled = False
+
+    def count(self, name: str, value: float = 1):
+        """Add to a counter (cards parsed, cache hits, tokens, ...)"""
+
+    def observe(self, name: str, value: float):
+        """Record one sample of a measurement (a stage duration, cards per chunk, ...)"""
+
+    def timer(self, name: str):
+        """Context manager observing the time spent inside as "<name>_seconds"; .seconds holds it after"""
+        return _NULL_TIMER
+
+    def close(self):
+        pass
+
+NULL_SINK = MetricsSink()
+
+class InMemorySink(MetricsSink):
+    """Counters and running summaries (count, sum, min, max, last) kept in process"""
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.summaries: Dict[str, list] = {}
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            summary = self.summaries.get(name)
+            if summary is None:
+                self.summaries[name] = [1, value, value, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = min(summary[2], value)
+                summary[3] = max(summary[3], value)
+                summary[4] = value
+
+    def timer(self, name: str):
+        return _Timer(self, name)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copy of the counters and summaries"""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'summaries': {name: {'count': c, 'sum': s, 'min': lo, 'max': hi, 'last': last,
+                                     'mean': s / c if c else 0.0}
+                              for name, (c, s, lo, hi, last) in self.summaries.items()}
+            }
+
+    def summary(self) -> Dict[str, float]:
+        """The headline numbers: time per stage, throughput, parse yield and cache use"""
+        snapshot = self.snapshot()
+        counters, summaries = snapshot['counters'], snapshot['summaries']
+
+        def total(name: str) -> float:
+            return summaries.get(name, {}).get('sum', 0.0)
+
+        def ratio(part: float, whole: float) -> float:
+            return part / whole if whole else 0.0
+
+        parsed = counters.get('cards_parsed', 0)
+        cache_lookups = counters.get('cache_hits', 0) + counters.get('cache_misses', 0)
+        result = {f"{stage}_seconds": total(f"{stage}_seconds") for stage in STAGES}
+        result.update({
+            'decks': counters.get('decks', 0),
+            'chunks': counters.get('chunks', 0),
+            'input_tokens': counters.get('input_tokens', 0),
+            'output_tokens': counters.get('output_tokens', 0),
+            'output_tokens_per_second': ratio(counters.get('output_tokens', 0), total('generate_seconds')),
+            'cards_parsed': parsed,
+            'cards_kept': counters.get('cards_kept', 0),
+            'cards_per_chunk': summaries.get('cards_parsed_per_chunk', {}).get('mean', 0.0),
+            # Cards the parser had to infer without Q:/A: labels
+            'fallback_rate': ratio(counters.get('cards_inferred', 0), parsed),
+            # Missing answers filled in from the source text
+            'autofill_rate': ratio(counters.get('answers_autofilled', 0), parsed),
+            'cache_hit_rate': ratio(counters.get('cache_hits', 0), cache_lookups),
+            # Assisted decoding: draft tokens the target model accepted
+            'draft_tokens': counters.get('draft_tokens', 0),
+            'draft_tokens_accepted': counters.get('draft_tokens_accepted', 0),
+            'target_passes': counters.get('target_passes', 0),
+            'draft_acceptance_rate': ratio(counters.get('draft_tokens_accepted', 0), counters.get('draft_tokens', 0))
+        })
+        return result
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.summaries.clear()
+
+class JsonlSink(MetricsSink):
+    """Appends every measurement to a JSON-lines file, one event per line"""
+
+    enabled = True
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _write(self, kind: str, name: str, value: float):
+        line = json.dumps({'time': time.time(), 'type': kind, 'name': name, 'value': value})
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+
+    def count(self, name: str, value: float = 1):
+        self._write('count', name, value)
+
+    def observe(self, name: str, value: float):
+        self._write('observe', name, value)
+
+    def timer(self, name: str):
+        return _Timer(self, name)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def render_prometheus(counters: Dict[str, float], summaries: Optional[Dict[str, Dict]] = None,
+                      gauges: Optional[Dict[str, float]] = None) -> str:
+    """Prometheus text exposition format for counters, summaries (count and sum) and gauges"""
+    lines = []
+    for name, value in sorted(counters.items()):
+        metric = PROMETHEUS_PREFIX + name
+        lines += [f"# TYPE {metric}_total counter", f"{metric}_total {value}"]
+    for name, summary in sorted((summaries or {}).items()):
+        metric = PROMETHEUS_PREFIX + name
+        lines += [f"# TYPE {metric} summary", f"{metric}_count {summary['count']}", f"{metric}_sum {summary['sum']}"]
+    for name, value in sorted((gauges or {}).items()):
+        metric = PROMETHEUS_PREFIX + name
+        lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    return '\n'.join(lines) + '\n'
+
+class PrometheusSink(InMemorySink):
+    """In-process counters exposed in Prometheus text format, optionally over HTTP at /metrics"""
+
+    def __init__(self):
+        super().__init__()
+        self._server = None
+
+    def render(self) -> str:
+        snapshot = self.snapshot()
+        return render_prometheus(snapshot['counters'], snapshot['summaries'])
+
+    def serve(self, port: int = 9100, host: str = '127.0.0.1'):
+        """Serve /metrics from a background thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        sink = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = sink.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+class MultiSink(MetricsSink):
+    """Sends every measurement to several sinks"""
+
+    def __init__(self, sinks: Iterable[MetricsSink]):
+        self.sinks = [sink for sink in sinks if sink.enabled]
+        self.enabled = bool(self.sinks)
+
+    def count(self, name: str, value: float = 1):
+        for sink in self.sinks:
+            sink.count(name, value)
+
+    def observe(self, name: str, value: float):
+        for sink in self.sinks:
+            sink.observe(name, value)
+
+    def timer(self, name: str):
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
@@ -1,12 +1,17 @@
 import streamlit as st
+import logging
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from LLM.flashCard_genrator import FlashcardGenerator
-from  LLM.export import FlashcardExporter
-import pandas as pd
-import io
+from  LLM.export import FlashcardExporter, FORMATS
+from LLM.model_registry import preload, DEFAULT_MODEL_NAME
+from LLM.deck_store import DeckStore, hash_text, deck_params
+from LLM.cards import Deck
+from LLM.telemetry import InMemorySink, STAGES
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
 
 # Page config
 st.set_page_config(
@@ -18,12 +23,33 @@ st.set_page_config(
 st.title("🎯 AI Flashcard Generator")
 st.markdown("Generate flashcards from your study materials using Flan-T5")
 
+@st.cache_resource(show_spinner="Loading Flan-T5 model...")
+def load_shared_model():
+    """Load the model once per server process; every session shares it"""
+    return preload(DEFAULT_MODEL_NAME)
+
+load_shared_model()
+
+@st.cache_resource
+def load_deck_store():
+    """One deck store connection per server process, shared by every session"""
+    return DeckStore()
+
+deck_store = load_deck_store()
+
 # Initialize session state
 if 'flashcards' not in st.session_state:
-    st.session_state.flashcards = []
+    # Columnar, so long decks stay small in session state
+    st.session_state.flashcards = Deck()
+if 'deck_version' not in st.session_state:
+    # Bumped on every generation so cached export payloads go stale
+    st.session_state.deck_version = 0
+if 'metrics' not in st.session_state:
+    # Telemetry of this session's generations, summarized in the sidebar
+    st.session_state.metrics = InMemorySink()
 if 'generator' not in st.session_state:
-    with st.spinner("Loading Flan-T5 model..."):
-        st.session_state.generator = FlashcardGenerator()
+    # Cheap: the generator reuses the model loaded above
+    st.session_state.generator = FlashcardGenerator(metrics=st.session_state.metrics)
 
 # Sidebar for configuration
 st.sidebar.header("⚙️ Configuration")
@@ -31,6 +57,51 @@ st.sidebar.header("⚙️ Configuration")
 num_cards = st.sidebar.slider("Number of flashcards", 5, 50, 20)
 difficulty = st.sidebar.selectbox("Difficulty level", 
                                  ["Mixed", "Easy", "Medium", "Hard"])
+reuse_saved = st.sidebar.checkbox("Reuse saved decks", value=True,
+                                  help="Load the saved deck instead of generating when the same text "
+                                       "was already turned into cards with these settings")
+
+def open_deck(deck_id: int):
+    st.session_state.flashcards = deck_store.cards(deck_id)
+    st.session_state.deck_version += 1
+
+# Saved decks, searchable by question and answer text
+st.sidebar.header("📚 Deck Library")
+library_query = st.sidebar.text_input("Search saved cards", placeholder="e.g. photosynthesis")
+if library_query.strip():
+    results = deck_store.search(library_query, limit=20)
+    if not results:
+        st.sidebar.caption("No matching cards.")
+    for i, card in enumerate(results):
+        with st.sidebar.expander(f"{card['question'][:50]}"):
+            st.write(f"**Answer:** {card['answer']}")
+            st.caption(f"Deck: {card['deck']}")
+            st.button("Open deck", key=f"open_deck_{i}", on_click=open_deck, args=(card['deck_id'],))
+else:
+    library = deck_store.stats()
+    st.sidebar.caption(f"{library['cards']} cards in {library['decks']} saved decks")
+
+def render_telemetry(area):
+    """Summary of this session's generation telemetry"""
+    summary = st.session_state.metrics.summary()
+    with area.container():
+        if not summary['decks']:
+            st.caption("Generate a deck to see timings here.")
+            return
+        col_a, col_b = st.columns(2)
+        col_a.metric("Tokens/s", f"{summary['output_tokens_per_second']:.0f}")
+        col_b.metric("Cards/chunk", f"{summary['cards_per_chunk']:.1f}")
+        col_a.metric("Auto-filled", f"{summary['autofill_rate']:.0%}")
+        col_b.metric("Unlabeled", f"{summary['fallback_rate']:.0%}")
+        st.caption(f"{summary['decks']} decks, {summary['chunks']} chunks, "
+                   f"{summary['input_tokens']} tokens in, {summary['output_tokens']} out, "
+                   f"cache hit rate {summary['cache_hit_rate']:.0%}")
+        st.caption("Time per stage: " + ", ".join(
+            f"{stage} {summary[f'{stage}_seconds']:.2f}s" for stage in STAGES))
+
+st.sidebar.header("📈 Telemetry")
+telemetry_area = st.sidebar.empty()
+render_telemetry(telemetry_area)
 
 # Main content area
 col1, col2 = st.columns([1, 1])
@@ -43,12 +114,14 @@ with col1:
                            ["Upload file", "Paste text"])
     
     text_input = ""
+    deck_name = ""
     
     if input_method == "Upload file":
         uploaded_file = st.file_uploader("Choose a text file", 
                                        type=['txt', 'md'])
         if uploaded_file is not None:
             text_input = str(uploaded_file.read(), "utf-8")
+            deck_name = Path(uploaded_file.name).stem
             st.text_area("File content preview:", text_input[:500] + "...", 
                         height=200, disabled=True)
     else:
@@ -59,13 +132,40 @@ with col1:
     
     # Generate button
     if st.button("🚀 Generate Flashcards", type="primary"):
-        if text_input.strip():
-            with st.spinner("Generating flashcards..."):
-                st.session_state.flashcards = st.session_state.generator.generate_from_text(
-                    text_input, num_cards, difficulty
-                )
+        generator = st.session_state.generator
+        source_hash = hash_text(text_input)
+        params = deck_params(generator.llm, num_cards, difficulty,
+                             dedup_threshold=generator.near_duplicate_threshold)
+        saved_deck = deck_store.find_deck(source_hash, params) if reuse_saved else None
+        if text_input.strip() and saved_deck is not None:
+            open_deck(saved_deck)
+            st.success(f"Loaded {len(st.session_state.flashcards)} flashcards from a saved deck "
+                       "(same text and settings)")
+        elif text_input.strip():
+            st.session_state.flashcards = Deck()
+            st.session_state.deck_version += 1
+            # Cards are shown here as they arrive, then replaced by the full list below
+            with col2:
+                live_area = st.empty()
+                live_cards = live_area.container()
+            try:
+                with st.spinner("Generating flashcards..."):
+                    for card in st.session_state.generator.iter_flashcards(text_input, num_cards, difficulty):
+                        st.session_state.flashcards.append(card)
+                        with live_cards:
+                            i = len(st.session_state.flashcards)
+                            with st.expander(f"Card {i}: {card['question'][:50]}..."):
+                                st.write(f"**Question:** {card['question']}")
+                                st.write(f"**Answer:** {card['answer']}")
+                        render_telemetry(telemetry_area)
+            except Exception as e:
+                st.session_state.generator.last_error = f"Error generating flashcards: {e}"
+            live_area.empty()
+            render_telemetry(telemetry_area)
             
             if st.session_state.flashcards:
+                deck_store.add_deck(st.session_state.flashcards, source_hash, params,
+                                    name=deck_name or text_input.strip()[:40])
                 st.success(f"Generated {len(st.session_state.flashcards)} flashcards!")
             else:
                 error_msg = getattr(st.session_state.generator, 'last_error', None)
@@ -90,51 +190,22 @@ with col2:
         # Export options
         st.subheader("📤 Export Options")
         
-        col_export1, col_export2 = st.columns(2)
+        export_format = st.selectbox("Format", list(FORMATS),
+                                     format_func=lambda fmt: f"{fmt} ({FORMATS[fmt][0]})")
         
-        with col_export1:
-            # CSV export
-            csv_data = pd.DataFrame(st.session_state.flashcards).to_csv(index=False)
-            st.download_button(
-                label="📊 Download CSV",
-                data=csv_data,
-                file_name="flashcards.csv",
-                mime="text/csv"
-            )
-            
-            # Anki export
-            anki_data = "\n".join([f"{card['question']},{card['answer']}" 
-                                  for card in st.session_state.flashcards])
-            st.download_button(
-                label="🃏 Download Anki CSV",
-                data=anki_data,
-                file_name="flashcards_anki.csv",
-                mime="text/csv"
-            )
+        # Only the selected format is serialized, once per deck
+        export_key = (st.session_state.deck_version, export_format)
+        if st.session_state.get('export_key') != export_key:
+            st.session_state.export_data = FlashcardExporter.to_bytes(st.session_state.flashcards, export_format)
+            st.session_state.export_key = export_key
         
-        with col_export2:
-            # JSON export
-            import json
-            json_data = json.dumps({
-                'flashcards': st.session_state.flashcards,
-                'total_cards': len(st.session_state.flashcards)
-            }, indent=2)
-            st.download_button(
-                label="📋 Download JSON",
-                data=json_data,
-                file_name="flashcards.json",
-                mime="application/json"
-            )
-            
-            # Quizlet export
-            quizlet_data = "\n".join([f"{card['question']}\t{card['answer']}" 
-                                     for card in st.session_state.flashcards])
-            st.download_button(
-                label="📚 Download Quizlet",
-                data=quizlet_data,
-                file_name="flashcards_quizlet.txt",
-                mime="text/plain"
-            )
+        extension, mime = FORMATS[export_format]
+        st.download_button(
+            label="⬇️ Download",
+            data=st.session_state.export_data,
+            file_name=f"flashcards{extension}",
+            mime=mime
+        )
     else:
         st.info("Generate flashcards to see them here!")
 
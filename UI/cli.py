@@ -1,65 +1,217 @@
 import argparse
+import logging
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from LLM.flashCard_genrator import FlashcardGenerator
-from LLM.export import FlashcardExporter
+from LLM.export import FlashcardExporter, FORMATS
+from LLM.corpus import CorpusRunner, find_corpus_files
+from LLM.llm_interface import FlanT5Interface
+from LLM.onnx_interface import OnnxT5Interface
+from LLM.model_registry import DEFAULT_MODEL_NAME, DEFAULT_DRAFT_MODEL_NAME, DTYPES
+from LLM.deck_store import DeckStore, DEFAULT_DECK_STORE, hash_file, deck_params
+from LLM.telemetry import InMemorySink, JsonlSink, MultiSink, STAGES
+
+def create_llm(args):
+    """Model interface for the chosen backend (weights load lazily)"""
+    if args.backend == 'onnx':
+        return OnnxT5Interface(args.model, samples_per_chunk=args.samples)
+    return FlanT5Interface(args.model, dtype=args.dtype, samples_per_chunk=args.samples,
+                           draft_model_name=args.draft_model)
 
 def main():
     parser = argparse.ArgumentParser(description='Generate flashcards from text using Flan-T5')
-    parser.add_argument('--input', '-i', required=True, help='Input text file')
-    parser.add_argument('--output', '-o', default='flashcards.csv', help='Output file')
+    parser.add_argument('--input', '-i',
+                       help='Input text file, or a directory / glob of .txt and .md files (corpus mode)')
+    parser.add_argument('--output', '-o', default='flashcards.csv',
+                       help='Output file (corpus mode: output directory, or the merged deck with --merge)')
     parser.add_argument('--num-cards', '-n', type=int, default=20, help='Number of flashcards to generate')
     parser.add_argument('--difficulty', '-d', choices=['Easy', 'Medium', 'Hard', 'Mixed'], 
                        default='Mixed', help='Difficulty level')
-    parser.add_argument('--format', '-f', choices=['csv', 'json', 'anki', 'quizlet'], 
+    parser.add_argument('--format', '-f', choices=list(FORMATS), 
                        default='csv', help='Export format')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Corpus mode: number of worker processes')
+    parser.add_argument('--model', '-m', default=DEFAULT_MODEL_NAME,
+                       help='Model name, e.g. google/flan-t5-large for better cards')
+    parser.add_argument('--draft-model', nargs='?', const=DEFAULT_DRAFT_MODEL_NAME,
+                       help='Assisted decoding: a small model (default flan-t5-small when given without '
+                            'a value) drafts tokens for --model to verify; faster for large models. '
+                            'Experimental, needs --experimental')
+    parser.add_argument('--experimental', action='store_true',
+                       help='Allow experimental options (--draft-model)')
+    parser.add_argument('--dtype', choices=list(DTYPES), default='float32',
+                       help='Model weights: float32, bfloat16 or int8 (dynamic quantization, CPU only)')
+    parser.add_argument('--backend', choices=['torch', 'onnx'], default='torch',
+                       help='Inference runtime (onnx needs optimum[onnxruntime])')
+    parser.add_argument('--samples', type=int, default=1,
+                       help='Decoder samples per chunk from one encoder pass; more cards per chunk')
+    parser.add_argument('--dedup-threshold', type=float, default=0.6,
+                       help='Similarity above which cards count as near-duplicates (0 disables; '
+                            'with --merge also applied across the corpus)')
+    parser.add_argument('--merge', action='store_true',
+                       help='Corpus mode: write one merged deck instead of one deck per file')
+    parser.add_argument('--store', nargs='?', const=str(DEFAULT_DECK_STORE),
+                       help='Save decks to this deck store (default path when given without a value) '
+                            'and reuse a stored deck when the input and settings match')
+    parser.add_argument('--force', action='store_true',
+                       help='With --store: generate again even when a matching deck is stored')
+    parser.add_argument('--search', '-s',
+                       help='Search the cards in the deck store instead of generating')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum search results')
+    parser.add_argument('--metrics',
+                       help='Append stage timings, token counts and parse yield to this JSON-lines file '
+                            'and print a summary')
     
     args = parser.parse_args()
     
-    # Read input file
-    try:
-        with open(args.input, 'r', encoding='utf-8') as f:
-            text = f.read()
-    except FileNotFoundError:
-        print(f"Error: File '{args.input}' not found")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    
+    if args.search:
+        run_search(args)
         return
-    except Exception as e:
-        print(f"Error reading file: {e}")
+    if not args.input:
+        parser.error('--input is required unless --search is given')
+    if args.backend == 'onnx' and args.draft_model:
+        parser.error('--draft-model needs the torch backend')
+    if args.draft_model and not args.experimental:
+        parser.error('--draft-model is experimental (assisted decoding has not been checked against '
+                     'real models yet); add --experimental to use it')
+    
+    if not Path(args.input).is_file():
+        run_corpus(args)
         return
     
+    llm = create_llm(args)
+    store = None
+    if args.store:
+        store = DeckStore(args.store)
+        source_hash = hash_file(args.input)
+        params = deck_params(llm, args.num_cards, args.difficulty, dedup_threshold=args.dedup_threshold)
+        deck_id = None if args.force else store.find_deck(source_hash, params)
+        if deck_id is not None:
+            # Same input, same settings: export the stored deck without loading the model
+            count = FlashcardExporter.stream_to_file(store.cards(deck_id), args.output, args.format)
+            print(f"Input already in the deck store (deck {deck_id}); skipped generation")
+            print(f"Exported {count} flashcards to: {args.output}")
+            return
+    
     print("Initializing Flan-T5 model...")
-    generator = FlashcardGenerator()
+    summary_sink = InMemorySink() if args.metrics else None
+    metrics = MultiSink([summary_sink, JsonlSink(args.metrics)]) if args.metrics else None
+    generator = FlashcardGenerator(llm, near_duplicate_threshold=args.dedup_threshold or None, metrics=metrics)
     
     print(f"Generating {args.num_cards} flashcards...")
-    flashcards = generator.generate_from_text(text, args.num_cards, args.difficulty)
+    preview = []
+    generated = []
     
-    if not flashcards:
-        print("No flashcards generated. Please check your input text.")
-        return
+    def progress(cards):
+        # Report each card as it is written
+        for card in cards:
+            if len(preview) < 3:
+                preview.append(card)
+            if store:
+                generated.append(card)
+            print(f"  + {card['question'][:60]}")
+            yield card
     
-    # Export flashcards
+    # Export flashcards as they arrive
     exporter = FlashcardExporter()
+    # The input file is read in blocks as generation proceeds, never all at once
+    flashcards = generator.iter_flashcards_from_file(args.input, args.num_cards, args.difficulty)
+    try:
+        count = exporter.stream_to_file(progress(flashcards), args.output, args.format)
+    except Exception as e:
+        print(f"Error generating flashcards: {e}")
+        return
+    finally:
+        if metrics:
+            metrics.close()
     
-    if args.format == 'csv':
-        output_file = exporter.to_csv(flashcards, args.output)
-    elif args.format == 'json':
-        output_file = exporter.to_json(flashcards, args.output)
-    elif args.format == 'anki':
-        output_file = exporter.to_anki(flashcards, args.output)
-    elif args.format == 'quizlet':
-        output_file = exporter.to_quizlet(flashcards, args.output)
+    if not count:
+        Path(args.output).unlink(missing_ok=True)
+        print(generator.last_error or "No flashcards generated. Please check your input text.")
+        return
     
-    print(f"Generated {len(flashcards)} flashcards")
-    print(f"Exported to: {output_file}")
+    print(f"Generated {count} flashcards")
+    if metrics:
+        print_summary(summary_sink.summary())
+        print(f"Metrics: {args.metrics}")
+    print(f"Exported to: {args.output}")
+    if store:
+        deck_id = store.add_deck(generated, source_hash, params, name=Path(args.input).stem)
+        print(f"Saved to deck store {args.store} (deck {deck_id})")
     
     # Preview first few cards
     print("\nPreview:")
-    for i, card in enumerate(flashcards[:3]):
+    for i, card in enumerate(preview):
         print(f"\nCard {i+1}:")
         print(f"Q: {card['question']}")
         print(f"A: {card['answer']}")
 
+def print_summary(summary):
+    """One-screen telemetry summary of a run"""
+    stages = ', '.join(f"{stage} {summary[f'{stage}_seconds'] * 1000:.0f}ms" for stage in STAGES)
+    print(f"Stages: {stages}")
+    print(f"Tokens: {summary['input_tokens']} in, {summary['output_tokens']} out "
+          f"({summary['output_tokens_per_second']:.1f} tokens/s)")
+    print(f"Parse yield: {summary['cards_per_chunk']:.1f} cards/chunk over {summary['chunks']} chunks, "
+          f"{summary['fallback_rate']:.0%} unlabeled, {summary['autofill_rate']:.0%} auto-filled answers, "
+          f"{summary['cards_kept']} kept")
+    if summary['draft_tokens']:
+        # Counted from forward passes (see FlanT5Interface._generate_assisted), so the rate can be checked
+        print(f"Assisted decoding: {summary['draft_tokens_accepted']}/{summary['draft_tokens']} draft tokens "
+              f"accepted ({summary['draft_acceptance_rate']:.0%}) in {summary['target_passes']} target passes")
+
+def run_search(args):
+    """Print the stored cards that best match a search"""
+    store = DeckStore(args.store or DEFAULT_DECK_STORE)
+    results = store.search(args.search, args.limit)
+    if not results:
+        print(f"No cards match '{args.search}' ({store.stats()['cards']} cards in {store.path})")
+        return
+    for i, card in enumerate(results):
+        print(f"\n{i+1}. [{card['deck']} #{card['deck_id']}]")
+        print(f"Q: {card['question']}")
+        print(f"A: {card['answer']}")
+
+def run_corpus(args):
+    """Generate decks for every text file in a directory or glob"""
+    if args.store:
+        print("Note: --store applies to single files; corpus mode resumes from its manifest instead")
+    files = find_corpus_files(args.input)
+    if not files:
+        print(f"Error: No .txt or .md files found for '{args.input}'")
+        return
+    
+    output = args.output
+    if not args.merge and Path(output).suffix:
+        # Default output is a file name; use its stem as the deck directory
+        output = str(Path(output).with_suffix(''))
+    
+    runner = CorpusRunner(files, output, fmt=args.format, num_cards=args.num_cards,
+                          difficulty=args.difficulty, workers=args.workers,
+                          merge=args.merge, root=args.input,
+                          generator_kwargs={'llm_interface': create_llm(args)},
+                          dedup_threshold=args.dedup_threshold or None)
+    
+    def progress(result, stats):
+        status = f"error: {result['error']}" if result['error'] else f"{result['cards']} cards"
+        print(f"[{stats['files'] + stats['failed']}/{len(files) - stats['skipped']}] {result['path']}: {status} "
+              f"({stats['files_per_minute']:.1f} files/min, {stats['cards_per_minute']:.1f} cards/min)")
+    
+    print(f"Found {len(files)} files, running with {args.workers} worker(s)...")
+    stats = runner.run(progress)
+    
+    print(f"\nProcessed {stats['files']} files ({stats['failed']} failed, {stats['skipped']} already done)")
+    print(f"Generated {stats['cards']} flashcards in {stats['seconds']:.1f}s "
+          f"({stats['files_per_minute']:.1f} files/min, {stats['cards_per_minute']:.1f} cards/min)")
+    if args.merge:
+        print(f"Merged {stats['merged_cards']} flashcards into: {output}")
+    else:
+        print(f"Decks written to: {output}")
+    print(f"Manifest: {runner.manifest_path} (re-run the same command to resume)")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,306 @@
+import argparse
+import json
+import logging
+import math
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.export import FlashcardExporter, FORMATS, TEXT_WRITERS
+from LLM.model_registry import DEFAULT_MODEL_NAME, DEFAULT_DRAFT_MODEL_NAME, DTYPES
+from LLM.service import WorkerPool, QueueFull, JobTimeout, JobError, DEFAULT_TIMEOUT
+from LLM.telemetry import render_prometheus
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard', 'Mixed')
+
+# Default response format: one JSON card per line, then a status line
+NDJSON = 'ndjson'
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_CARDS = 200
+
+def create_llm(args):
+    """Model interface for the chosen backend (weights load lazily, inside each worker)"""
+    if args.backend == 'mock':
+        from LLM.mock_interface import MockT5Interface
+        return MockT5Interface(latency=args.mock_latency, token_latency=args.mock_token_latency,
+                               samples_per_chunk=args.samples)
+    if args.backend == 'onnx':
+        from LLM.onnx_interface import OnnxT5Interface
+        return OnnxT5Interface(args.model, samples_per_chunk=args.samples)
+    from LLM.llm_interface import FlanT5Interface
+    return FlanT5Interface(args.model, dtype=args.dtype, samples_per_chunk=args.samples,
+                           draft_model_name=args.draft_model)
+
+class ChunkedWriter:
+    """Text file object over a chunked HTTP response; each flush() sends one chunk"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.parts = []
+
+    def write(self, text: str) -> int:
+        self.parts.append(text)
+        return len(text)
+
+    def flush(self):
+        data = ''.join(self.parts).encode('utf-8')
+        self.parts = []
+        if data:
+            self.wfile.write(b'%X\r\n%s\r\n' % (len(data), data))
+            self.wfile.flush()
+
+    def close(self):
+        self.flush()
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+class DeckRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /decks   {"text": ..., "num_cards": 20, "difficulty": "Mixed", "format": "ndjson", "timeout": 60}
+                  Streams cards as they are generated. "ndjson" (the default) sends one
+                  card per line and a final {"done": ...} line; csv, json, anki and quizlet
+                  stream the export file itself; apkg is sent once the deck is complete.
+                  timeout (seconds) is capped at the server's --timeout.
+    GET /healthz  200 while the server is up
+    GET /readyz   200 once every worker has loaded its model, otherwise 503
+    GET /stats    pool counters
+    GET /metrics  worker telemetry and pool counters in Prometheus text format
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FlashcardServer/1.0'
+
+    @property
+    def pool(self) -> WorkerPool:
+        return self.server.pool
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/healthz':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/readyz':
+            ready = self.pool.ready
+            self._send_json(200 if ready else 503, {'ready': ready, **self.pool.stats()})
+        elif self.path == '/stats':
+            self._send_json(200, self.pool.stats())
+        elif self.path == '/metrics':
+            metrics = self.pool.metrics()
+            gauges = {f"pool_{name}": value for name, value in self.pool.stats().items()}
+            body = render_prometheus(metrics['counters'], metrics['summaries'], gauges).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+    def _read_request(self) -> dict:
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            # The body is left unread, so it must not be taken for the next request
+            self.close_connection = True
+            if length < 0:
+                raise ValueError('Content-Length must be a non-negative integer')
+            raise ValueError(f"Request body over {MAX_BODY_BYTES} bytes")
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(request, dict) or not isinstance(request.get('text'), str):
+            raise ValueError('Expected a JSON object with a "text" string')
+        num_cards = request.setdefault('num_cards', 20)
+        if not isinstance(num_cards, int) or not 1 <= num_cards <= MAX_CARDS:
+            raise ValueError(f"num_cards must be an integer from 1 to {MAX_CARDS}")
+        timeout = request.get('timeout')
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout < math.inf:
+                raise ValueError('timeout must be a positive number of seconds')
+            # Never longer than the server allows
+            request['timeout'] = min(timeout, self.pool.timeout)
+        if request.setdefault('difficulty', 'Mixed') not in DIFFICULTIES:
+            raise ValueError(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+        fmt = request.setdefault('format', NDJSON)
+        if fmt != NDJSON and fmt not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join([NDJSON] + list(FORMATS))}")
+        return request
+
+    def do_POST(self):
+        if self.path != '/decks':
+            self.close_connection = True
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+        try:
+            request = self._read_request()
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            self._send_json(400, {'error': str(e)})
+            return
+        if not self.pool.ready:
+            self._send_json(503, {'error': 'Workers are still loading the model'}, {'Retry-After': '5'})
+            return
+        try:
+            job = self.pool.submit(request['text'], request['num_cards'], request['difficulty'],
+                                   request.get('timeout'))
+        except QueueFull as e:
+            self._send_json(503, {'error': f"Server busy: {e}"}, {'Retry-After': '1'})
+            return
+
+        cards = job.cards()
+        timed_out = False
+        try:
+            # Wait for the first card so an empty deck or a timeout can still get a proper status
+            try:
+                first = next(cards)
+            except StopIteration:
+                first = None
+            if first is None:
+                self._send_json(422, {'error': 'No flashcards generated'})
+                return
+            self._stream(request['format'], first, cards)
+        except JobTimeout as e:
+            timed_out = True
+            if not job.cards_sent:
+                self._send_json(504, {'error': str(e)})
+        except JobError as e:
+            if not job.cards_sent:
+                self._send_json(422, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info(f"Client went away during job {job.id}")
+        finally:
+            self.pool.abandon(job, timed_out)
+
+    def _stream(self, fmt: str, first, cards):
+        """Send the deck in the requested format, card by card where the format allows it"""
+        def deck():
+            yield first
+            yield from cards
+
+        if fmt == 'apkg':
+            # A zip can only be finished once every card is in
+            body = FlashcardExporter.to_bytes(deck(), fmt)
+            self.send_response(200)
+            self.send_header('Content-Type', FORMATS[fmt][1])
+            self.send_header('Content-Disposition', f'attachment; filename="flashcards{FORMATS[fmt][0]}"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        if fmt == NDJSON:
+            self.send_header('Content-Type', 'application/x-ndjson')
+        else:
+            self.send_header('Content-Type', f"{FORMATS[fmt][1]}; charset=utf-8")
+            self.send_header('Content-Disposition', f'attachment; filename="flashcards{FORMATS[fmt][0]}"')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        writer = ChunkedWriter(self.wfile)
+        try:
+            if fmt == NDJSON:
+                self._stream_ndjson(deck(), writer)
+            else:
+                TEXT_WRITERS[fmt](deck(), writer, flush=True)
+        except (JobTimeout, JobError) as e:
+            # Headers are gone; the truncated export is all the client gets
+            logger.warning(f"Deck cut short: {e}")
+            raise
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _stream_ndjson(cards, writer: ChunkedWriter):
+        count = 0
+        try:
+            for card in cards:
+                writer.write(json.dumps(card, ensure_ascii=False) + '\n')
+                writer.flush()
+                count += 1
+        except (JobTimeout, JobError) as e:
+            # Mid-stream failures are reported in the status line
+            writer.write(json.dumps({'done': False, 'cards': count, 'error': str(e)}) + '\n')
+            raise
+        writer.write(json.dumps({'done': True, 'cards': count}) + '\n')
+
+class DeckServer(ThreadingHTTPServer):
+    """HTTP server whose handler threads share one worker pool"""
+
+    daemon_threads = True
+
+    def __init__(self, address, pool: WorkerPool):
+        super().__init__(address, DeckRequestHandler)
+        self.pool = pool
+
+def main():
+    parser = argparse.ArgumentParser(description='Flashcard generation HTTP service')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Worker processes, each holding its own copy of the model')
+    parser.add_argument('--max-queue', type=int, default=16,
+                        help='Requests allowed to wait for a worker; more get 503')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='Longest a request may take in seconds, queueing included')
+    parser.add_argument('--backend', choices=['torch', 'onnx', 'mock'], default='torch',
+                        help='Inference runtime (mock needs no model, for load tests)')
+    parser.add_argument('--model', '-m', default=DEFAULT_MODEL_NAME,
+                        help='Model name, e.g. google/flan-t5-large for better cards')
+    parser.add_argument('--draft-model', nargs='?', const=DEFAULT_DRAFT_MODEL_NAME,
+                        help='Assisted decoding: a small model (default flan-t5-small when given without '
+                             'a value) drafts tokens for --model to verify; faster for large models. '
+                             'Experimental, needs --experimental')
+    parser.add_argument('--experimental', action='store_true',
+                        help='Allow experimental options (--draft-model)')
+    parser.add_argument('--dtype', choices=list(DTYPES), default='float32',
+                        help='Model weights: float32, bfloat16 or int8 (dynamic quantization, CPU only)')
+    parser.add_argument('--samples', type=int, default=1,
+                        help='Decoder samples per chunk from one encoder pass; more cards per chunk')
+    parser.add_argument('--dedup-threshold', type=float, default=0.6,
+                        help='Similarity above which cards count as near-duplicates (0 disables)')
+    parser.add_argument('--mock-latency', type=float, default=0.0, help='Mock backend: seconds per generate call')
+    parser.add_argument('--mock-token-latency', type=float, default=0.0, help='Mock backend: seconds per decode step')
+    args = parser.parse_args()
+    if args.backend != 'torch' and args.draft_model:
+        parser.error('--draft-model needs the torch backend')
+    if args.draft_model and not args.experimental:
+        parser.error('--draft-model is experimental (assisted decoding has not been checked against '
+                     'real models yet); add --experimental to use it')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    pool = WorkerPool(args.workers, {
+        'llm_interface': create_llm(args),
+        'near_duplicate_threshold': args.dedup_threshold or None
+    }, max_queue=args.max_queue, timeout=args.timeout)
+    pool.start()
+    server = DeckServer((args.host, args.port), pool)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} with {args.workers} "
+          f"{args.backend} worker(s); /readyz turns 200 once the models are loaded", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+if __name__ == "__main__":
+    main()
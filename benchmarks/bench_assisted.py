@@ -0,0 +1,108 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Real-model runs must never download weights
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+from LLM.model_registry import DEFAULT_DRAFT_MODEL_NAME
+from bench_pipeline import make_text, model_available
+
+def greedy(llm):
+    """Deterministic decoding, so assisted output can be compared token for token"""
+    llm.generation_params = {'max_length': 300, 'do_sample': False}
+    return llm
+
+def tokens(llm, row) -> list:
+    """Generated token IDs of one output row, without padding and EOS"""
+    pad, eos = llm.tokenizer.pad_token_id, llm.tokenizer.eos_token_id
+    return [t for t in row.tolist() if t != pad and t != eos]
+
+def run(llm, prompts, targets, batch_size: int) -> dict:
+    """Generate every prompt in batches; seconds, output tokens and the generated rows"""
+    llm.last_decode_stats = []
+    rows = []
+    output_tokens = 0
+    start = time.perf_counter()
+    for i in range(0, len(prompts), batch_size):
+        outputs = llm._generate(prompts[i:i + batch_size], targets[i:i + batch_size])
+        output_tokens += llm._output_tokens(outputs)
+        rows.extend(tokens(llm, row) for row in outputs)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'output_tokens': output_tokens,
+            'tokens_per_second': output_tokens / seconds if seconds else 0.0, 'rows': rows}
+
+def main():
+    parser = argparse.ArgumentParser(description='Assisted decoding with a draft model vs plain decoding, greedy')
+    parser.add_argument('--model', default='google/flan-t5-large', help='Target model')
+    parser.add_argument('--draft-model', default=DEFAULT_DRAFT_MODEL_NAME, help='Draft model')
+    parser.add_argument('--dtype', default='float32', help='Weights of both models')
+    parser.add_argument('--size', default='64k', help='Input size (see bench_pipeline.py)')
+    parser.add_argument('--chunks', type=int, default=8, help='Chunks of the input to generate for')
+    parser.add_argument('--cards-per-chunk', type=int, default=3, help='Cards requested per chunk')
+    parser.add_argument('--batch-size', type=int, default=8, help='Prompts per plain batched generate call')
+    parser.add_argument('--threads', type=int, default=0, help='torch threads (0 = torch default)')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    missing = [name for name in (args.model, args.draft_model) if not model_available(name)]
+    if missing:
+        print(f"Needs torch and the cached weights of {', '.join(missing)}; nothing to compare")
+        return
+
+    logging.disable(logging.INFO)
+    from LLM.llm_interface import FlanT5Interface
+    # Both interfaces share the target model (and tokenizer) through the registry
+    plain = greedy(FlanT5Interface(args.model, dtype=args.dtype, threads=args.threads or None))
+    assisted = greedy(FlanT5Interface(args.model, dtype=args.dtype, threads=args.threads or None,
+                                      draft_model_name=args.draft_model))
+    load_start = time.perf_counter()
+    plain.handle
+    assisted.draft_handle
+    print(f"Loaded {args.model} and {args.draft_model} ({args.dtype}) in {time.perf_counter() - load_start:.1f}s")
+
+    chunks = plain._chunk_text(make_text(args.size))[:args.chunks]
+    targets = [args.cards_per_chunk] * len(chunks)
+    prompts = plain._build_prompts(chunks, targets)
+
+    # Warm up both models once
+    run(plain, prompts[:1], targets[:1], 1)
+    run(assisted, prompts[:1], targets[:1], 1)
+
+    results = {
+        'plain, one prompt per call': run(plain, prompts, targets, 1),
+        f'plain, batches of {args.batch_size}': run(plain, prompts, targets, args.batch_size),
+        'assisted': run(assisted, prompts, targets, 1),
+    }
+    stats = [s['acceptance'] for s in assisted.last_decode_stats]
+    draft_tokens = sum(s['draft_tokens'] for s in stats)
+    accepted = sum(s['accepted_tokens'] for s in stats)
+
+    reference = results['plain, one prompt per call']
+    print(f"{len(prompts)} chunks, {args.cards_per_chunk} cards each, greedy")
+    for name, r in results.items():
+        identical = sum(a == b for a, b in zip(r['rows'], reference['rows']))
+        r['identical_to_plain'] = identical
+        print(f"{name:>28}  {r['seconds']:7.2f}s  {r['tokens_per_second']:6.1f} tokens/s "
+              f"({r['tokens_per_second'] / reference['tokens_per_second']:.2f}x)  "
+              f"identical outputs {identical}/{len(prompts)}")
+    print(f"Draft acceptance: {accepted}/{draft_tokens} tokens "
+          f"({accepted / draft_tokens if draft_tokens else 0:.0%}), "
+          f"{sum(s['target_passes'] for s in stats)} target passes for "
+          f"{results['assisted']['output_tokens']} tokens")
+
+    if args.output:
+        for r in results.values():
+            del r['rows']
+        args.output.write_text(json.dumps({
+            'model': args.model, 'draft_model': args.draft_model, 'dtype': args.dtype,
+            'results': results, 'acceptance': stats
+        }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import torch
+from LLM.llm_interface import FlanT5Interface
+
+SAMPLE_PATH = Path(__file__).parent.parent / "sample.txt"
+
+def run(llm: FlanT5Interface, text: str, num_cards: int, batch_size: int, repeats: int) -> dict:
+    """Time generate_flashcards for one batch size"""
+    llm.batch_size = batch_size
+    timings = []
+    cards = 0
+    for _ in range(repeats):
+        torch.manual_seed(0)
+        start = time.perf_counter()
+        flashcards = llm.generate_flashcards(text, num_cards)
+        timings.append(time.perf_counter() - start)
+        cards += len(flashcards)
+    best = min(timings)
+    return {
+        'batch_size': batch_size,
+        'best_seconds': best,
+        'cards_per_run': cards / repeats,
+        'cards_per_second': (cards / repeats) / best if best else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare batched and serial chunk generation')
+    parser.add_argument('--model', default='google/flan-t5-base', help='Model name')
+    parser.add_argument('--scale', type=int, default=8, help='How many times to repeat sample.txt')
+    parser.add_argument('--num-cards', type=int, default=200, help='Cards requested (high so no early exit)')
+    parser.add_argument('--batch-sizes', default='1,4,8,16', help='Comma separated batch sizes')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per batch size')
+    args = parser.parse_args()
+
+    text = " ".join([SAMPLE_PATH.read_text(encoding='utf-8')] * args.scale)
+    llm = FlanT5Interface(args.model)
+    chunks = llm._chunk_text(text)
+    print(f"Input: {len(text)} chars, {len(chunks)} chunks, torch threads: {torch.get_num_threads()}")
+
+    # Warm up so the first measurement does not pay for lazy initialisation
+    llm.batch_size = 1
+    llm.generate_flashcards(chunks[0], 1)
+
+    baseline = None
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        result = run(llm, text, args.num_cards, batch_size, args.repeats)
+        if baseline is None:
+            baseline = result['best_seconds']
+        print(f"batch_size={result['batch_size']:>3}  "
+              f"time={result['best_seconds']:.2f}s  "
+              f"cards={result['cards_per_run']:.1f}  "
+              f"cards/s={result['cards_per_second']:.2f}  "
+              f"speedup={baseline / result['best_seconds']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import gc
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.cards import Flashcard, Deck
+from LLM.dedup import NearDuplicateDetector
+from LLM.export import write_csv
+
+SAMPLE_PATH = Path(__file__).parent.parent / "sample.txt"
+
+def make_rows(count: int) -> list:
+    """(question, answer, difficulty) rows built from the sample's vocabulary, strings not shared"""
+    rng = random.Random(0)
+    words = SAMPLE_PATH.read_text(encoding='utf-8').split()
+    return [(f"What does {' '.join(rng.choices(words, k=5))} mean?", ' '.join(rng.choices(words, k=15)),
+             rng.choice(['Easy', 'Medium', 'Hard'])) for _ in range(count)]
+
+BUILDERS = {
+    'dicts': lambda rows: [{'question': q, 'answer': a, 'difficulty': d} for q, a, d in rows],
+    'flashcards': lambda rows: [Flashcard(q, a, d) for q, a, d in rows],
+    'deck': lambda rows: Deck(Flashcard(q, a, d) for q, a, d in rows),
+}
+
+def measure(fn) -> tuple:
+    """(result, bytes still allocated by it, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, seconds
+
+def run_dedup(cards: list) -> NearDuplicateDetector:
+    detector = NearDuplicateDetector()
+    detector.deduplicate(cards)
+    return detector
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory of a deck as dicts, slotted Flashcards and a columnar Deck')
+    parser.add_argument('--cards', type=int, default=300_000, help='Cards in the deck')
+    parser.add_argument('--dedup-cards', type=int, default=20_000, help='Cards run through the near-duplicate detector')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    rows = make_rows(args.cards)
+    text_bytes = sum(sys.getsizeof(q) + sys.getsizeof(a) for q, a, _ in rows)
+    print(f"{args.cards} cards, {text_bytes / 1e6:.1f} MB of question/answer strings (shared by every variant)")
+
+    results = []
+    for name, build in BUILDERS.items():
+        deck, size, seconds = measure(lambda: build(rows))
+        start = time.perf_counter()
+        write_csv(deck, io.StringIO())
+        export_seconds = time.perf_counter() - start
+        results.append({'variant': name, 'container_mb': size / 1e6, 'bytes_per_card': size / args.cards,
+                        'build_seconds': seconds, 'csv_export_seconds': export_seconds})
+        del deck
+    for r in results:
+        print(f"{r['variant']:>10}  container={r['container_mb']:7.1f}MB ({r['bytes_per_card']:5.0f} B/card)  "
+              f"build={r['build_seconds']:.2f}s  csv_export={r['csv_export_seconds']:.2f}s")
+
+    # The detector keeps every distinct card and its signature for the whole run
+    cards = BUILDERS['dicts'](rows[:args.dedup_cards])
+    detector, size, seconds = measure(lambda: run_dedup(cards))
+    print(f"dedup of {len(cards)} cards: {size / 1e6:.1f}MB retained ({size / len(cards):.0f} B/card), "
+          f"{seconds:.2f}s")
+    results.append({'variant': 'dedup', 'cards': len(cards), 'retained_mb': size / 1e6, 'seconds': seconds})
+
+    if args.output:
+        args.output.write_text(json.dumps({'cards': args.cards, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
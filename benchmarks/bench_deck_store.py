@@ -0,0 +1,78 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.deck_store import DeckStore, hash_text
+
+SAMPLE_PATH = Path(__file__).parent.parent / "sample.txt"
+
+QUERIES = ['renaissance', 'leonardo painting', 'humanism', 'scientific revolution', 'printing pres',
+           'classical greek roman', 'nonexistentword']
+
+def make_cards(words: list, count: int, rng: random.Random) -> list:
+    """Synthetic cards built from the sample's vocabulary"""
+    return [{
+        'question': f"What does {' '.join(rng.choices(words, k=6))} mean?",
+        'answer': ' '.join(rng.choices(words, k=18)),
+        'difficulty': 'Medium'
+    } for _ in range(count)]
+
+def timed(fn, repeats: int) -> list:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Deck store bulk writes and full-text search vs a LIKE scan')
+    parser.add_argument('--cards', type=int, default=200_000, help='Cards stored in total')
+    parser.add_argument('--deck-size', type=int, default=50, help='Cards per deck')
+    parser.add_argument('--repeats', type=int, default=20, help='Runs per query')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = SAMPLE_PATH.read_text(encoding='utf-8').split()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DeckStore(Path(tmp) / 'decks.db')
+        start = time.perf_counter()
+        decks = args.cards // args.deck_size
+        for i in range(decks):
+            store.add_deck(make_cards(words, args.deck_size, rng), hash_text(str(i)), {'num_cards': args.deck_size},
+                           name=f"deck {i}")
+        write_seconds = time.perf_counter() - start
+        print(f"Stored {args.cards} cards in {decks} decks: {write_seconds:.1f}s "
+              f"({args.cards / write_seconds:.0f} cards/s, one transaction per deck)")
+
+        results = []
+        for query in QUERIES:
+            fts = timed(lambda: store.search(query, 20), args.repeats)
+            pattern = f"%{query}%"
+            like = timed(lambda: store._db.execute(
+                "SELECT question, answer FROM cards WHERE question LIKE ? OR answer LIKE ? LIMIT 20",
+                (pattern, pattern)).fetchall(), max(1, args.repeats // 4))
+            r = {
+                'query': query,
+                'matches': len(store.search(query, 20)),
+                'fts_ms': statistics.median(fts) * 1000,
+                'like_ms': statistics.median(like) * 1000
+            }
+            results.append(r)
+            print(f"{query!r:<26} matches={r['matches']:>2}  fts={r['fts_ms']:>7.2f}ms  "
+                  f"like_scan={r['like_ms']:>8.2f}ms")
+        store.close()
+
+    if args.output:
+        args.output.write_text(json.dumps({'cards': args.cards, 'write_seconds': write_seconds,
+                                           'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.llm_interface import SENTENCE_BOUNDARY
+from LLM.normalizer import read_sentences
+
+SAMPLE_PATH = Path(__file__).parent.parent / "sample.txt"
+
+def legacy_sentences(path: Path) -> list:
+    """The previous path: read the whole file, three regex passes, then split"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    text = re.sub(r'\S*@\S*\s?', '', text)
+    text = text.strip()
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+VARIANTS = {
+    'legacy': legacy_sentences,
+    'stream': read_sentences,
+}
+
+def make_input(path: Path, megabytes: int, long_tokens: int, long_token_length: int):
+    """sample.txt with links, addresses and a few long unbroken tokens (e.g. inlined base64)"""
+    sample = SAMPLE_PATH.read_text(encoding='utf-8')
+    paragraph = (f"{sample}\nSee https://en.wikipedia.org/wiki/Renaissance?ref=notes#art or write "
+                 f"to notes@example.edu for the reading list.\n\n")
+    blob = "QUJD" * (long_token_length // 4)
+    repeats = megabytes * 1_000_000 // len(paragraph)
+    spacing = max(1, repeats // (long_tokens + 1))
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(repeats):
+            f.write(paragraph)
+            if long_tokens and i % spacing == spacing - 1 and i // spacing < long_tokens:
+                f.write(f"data:image/png;base64,{blob}\n\n")
+
+def generate(path: Path, num_cards: int) -> dict:
+    """The whole file-to-deck path on the mock model, as the CLI runs it"""
+    import logging
+    logging.disable(logging.WARNING)
+    from LLM.flashCard_genrator import FlashcardGenerator
+    from LLM.mock_interface import MockT5Interface
+    start = time.perf_counter()
+    cards = FlashcardGenerator(MockT5Interface()).generate_from_file(str(path), num_cards)
+    return {
+        'variant': 'generate',
+        'seconds': time.perf_counter() - start,
+        'cards': len(cards),
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+def measure(variant: str, path: Path, num_cards: int = 20) -> dict:
+    """Run inside a fresh process so peak RSS belongs to this variant alone"""
+    if variant == 'generate':
+        return generate(path, num_cards)
+    start = time.perf_counter()
+    sentences = VARIANTS[variant](path)
+    seconds = time.perf_counter() - start
+    return {
+        'variant': variant,
+        'seconds': seconds,
+        'sentences': len(sentences),
+        'chars': sum(len(s) for s in sentences),
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the streaming normalizer with the three-pass preprocessor')
+    parser.add_argument('--megabytes', type=int, default=50, help='Input size')
+    parser.add_argument('--long-tokens', type=int, default=5, help='Unbroken tokens without an "@" in the input')
+    parser.add_argument('--long-token-length', type=int, default=20000, help='Characters per long token')
+    parser.add_argument('--num-cards', type=int, default=20,
+                        help='Cards requested in the generate run (mock model)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--input', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.input, args.num_cards)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'input.txt'
+        make_input(path, args.megabytes, args.long_tokens, args.long_token_length)
+        print(f"Input: {path.stat().st_size / 1e6:.1f} MB, "
+              f"{args.long_tokens} tokens of {args.long_token_length} chars without '@'")
+
+        results = []
+        for variant in list(VARIANTS) + ['generate']:
+            cmd = [sys.executable, __file__, '--child', variant, '--input', str(path),
+                   '--num-cards', str(args.num_cards)]
+            output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        generated = results.pop()
+
+    baseline = results[0]
+    for r in results:
+        print(f"{r['variant']:>7}  time={r['seconds']:.2f}s ({baseline['seconds'] / r['seconds']:.1f}x)  "
+              f"peak_rss={r['peak_rss_mb']:.0f}MB  sentences={r['sentences']}  chars={r['chars']}")
+    print(f"Generate {args.num_cards} cards (mock model): time={generated['seconds']:.2f}s  "
+          f"peak_rss={generated['peak_rss_mb']:.0f}MB  cards={generated['cards']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Real-model runs must never download weights
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+from LLM.flashCard_genrator import FlashcardGenerator
+from LLM.export import FlashcardExporter, FORMATS
+from LLM.mock_interface import MockT5Interface
+
+ROOT = Path(__file__).parent.parent
+SAMPLE_PATH = ROOT / "sample.txt"
+
+# Input sizes in characters; 'sample' is sample.txt as is
+SIZES = {'sample': 0, '64k': 64_000, '1m': 1_000_000, '4m': 4_000_000}
+
+STAGES = ['preprocess', 'chunk', 'prompt', 'generate', 'decode', 'parse', 'postprocess', 'dedup', 'export']
+
+def make_text(size: str) -> str:
+    """
+    sample.txt repeated up to the requested size. Every copy tags its
+    sentences with a part number so cards are not all exact duplicates.
+    """
+    sample = SAMPLE_PATH.read_text(encoding='utf-8')
+    target = SIZES[size]
+    if not target:
+        return sample
+    parts = []
+    length = 0
+    while length < target:
+        part = re.sub(r'\.(\s|$)', f' (part {len(parts) + 1}).\\1', sample)
+        parts.append(part)
+        length += len(part) + 2
+    return "\n\n".join(parts)[:target]
+
+def model_available(model_name: str) -> bool:
+    """Whether torch is installed and the model's weights are in the local HF cache"""
+    try:
+        import torch  # noqa: F401
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return False
+    return isinstance(try_to_load_from_cache(model_name, "config.json"), str)
+
+def run_pipeline(llm, text: str, cards_per_chunk: int, formats) -> dict:
+    """One pass through every pipeline stage, timing each separately"""
+    generator = FlashcardGenerator(llm)
+    stages = dict.fromkeys(STAGES, 0.0)
+    clock = time.perf_counter
+
+    start = clock()
+    cleaned = generator._preprocess_text(text)
+    stages['preprocess'] = clock() - start
+
+    start = clock()
+    chunks = llm._chunk_text(cleaned)
+    stages['chunk'] = clock() - start
+
+    start = clock()
+    prompts = llm._build_prompts(chunks, [cards_per_chunk] * len(chunks))
+    stages['prompt'] = clock() - start
+
+    responses = []
+    for i in range(0, len(prompts), llm.batch_size):
+        start = clock()
+        outputs = llm._generate(prompts[i:i + llm.batch_size])
+        stages['generate'] += clock() - start
+        start = clock()
+        responses.extend(llm._decode(outputs))
+        stages['decode'] += clock() - start
+
+    start = clock()
+    cards = [card for response in responses for card in llm._parse_flashcards(response)]
+    stages['parse'] = clock() - start
+    parsed = len(cards)
+
+    start = clock()
+    cards = generator._postprocess_flashcards(cards, "Mixed", original_text=text)
+    stages['postprocess'] = clock() - start
+
+    start = clock()
+    detector = generator._near_duplicate_detector()
+    if detector is not None:
+        cards = detector.deduplicate(cards)
+    stages['dedup'] = clock() - start
+
+    start = clock()
+    for fmt in formats:
+        FlashcardExporter.to_bytes(cards, fmt)
+    stages['export'] = clock() - start
+
+    return {'chunks': len(chunks), 'parsed_cards': parsed, 'cards': len(cards), 'stages': stages}
+
+def bench(backend: str, llm, size: str, args) -> dict:
+    """Best time per stage over several passes"""
+    text = make_text(size)
+    runs = [run_pipeline(llm, text, args.cards_per_chunk, args.formats) for _ in range(args.repeats)]
+    stages = {name: min(run['stages'][name] for run in runs) for name in STAGES}
+    return {
+        'backend': backend,
+        'size': size,
+        'chars': len(text),
+        'chunks': runs[0]['chunks'],
+        'parsed_cards': runs[0]['parsed_cards'],
+        'cards': runs[0]['cards'],
+        'repeats': args.repeats,
+        'stages': stages,
+        'total': sum(stages.values())
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(results: list, baseline_path: Path, tolerance: float) -> bool:
+    """Print per-stage ratios against a previous results file; True if any stage regressed"""
+    baseline = {(r['backend'], r['size']): r for r in json.loads(baseline_path.read_text())['results']}
+    regressed = False
+    print(f"\nCompared with {baseline_path} (ratio = new / old, tolerance {tolerance:.2f}x)")
+    for result in results:
+        old = baseline.get((result['backend'], result['size']))
+        if old is None:
+            continue
+        ratios = []
+        for name in STAGES + ['total']:
+            new_seconds = result['total'] if name == 'total' else result['stages'][name]
+            old_seconds = old['total'] if name == 'total' else old['stages'].get(name, 0.0)
+            # Ignore stages too fast to time reliably
+            if max(new_seconds, old_seconds) < 0.001:
+                continue
+            ratio = new_seconds / old_seconds if old_seconds else float('inf')
+            flag = '!' if ratio > tolerance else ''
+            regressed |= ratio > tolerance
+            ratios.append(f"{name}={ratio:.2f}{flag}")
+        print(f"{result['backend']:<6} {result['size']:<7} " + "  ".join(ratios))
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description='Time every stage of the flashcard pipeline')
+    parser.add_argument('--sizes', default='sample,64k,1m,4m', help=f"Comma separated sizes from {list(SIZES)}")
+    parser.add_argument('--repeats', type=int, default=3, help='Passes per size (best time is kept)')
+    parser.add_argument('--cards-per-chunk', type=int, default=3, help='Cards requested per chunk')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Comma separated export formats')
+    parser.add_argument('--batch-size', type=int, default=8, help='Chunks per generate call')
+    parser.add_argument('--mock-latency', type=float, default=0.0, help='Mock seconds per generate call')
+    parser.add_argument('--mock-token-latency', type=float, default=0.0, help='Mock seconds per output token')
+    parser.add_argument('--model', default='google/flan-t5-base', help='Real model (skipped unless cached)')
+    parser.add_argument('--real-sizes', default='sample', help='Sizes to run on the real model ("" = none)')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    parser.add_argument('--compare', type=Path, help='Previous JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.2, help='Slowdown ratio counted as a regression')
+    args = parser.parse_args()
+    args.formats = [f for f in args.formats.split(',') if f]
+
+    logging.disable(logging.INFO)
+
+    results = []
+    # Untimed pass so lazy imports (numpy, sqlite3, ...) do not land in the first stage timings
+    run_pipeline(MockT5Interface(), make_text('sample'), args.cards_per_chunk, args.formats)
+    mock = MockT5Interface(batch_size=args.batch_size, latency=args.mock_latency,
+                           token_latency=args.mock_token_latency)
+    for size in args.sizes.split(','):
+        results.append(bench('mock', mock, size, args))
+
+    real_sizes = [s for s in args.real_sizes.split(',') if s]
+    if real_sizes:
+        if model_available(args.model):
+            from LLM.llm_interface import FlanT5Interface
+            real = FlanT5Interface(args.model, batch_size=args.batch_size, seed=0)
+            for size in real_sizes:
+                results.append(bench('real', real, size, args))
+        else:
+            print(f"Skipping real-model runs: torch or cached weights for {args.model} not available")
+
+    print(f"{'backend':<7} {'size':<7} {'chunks':>6} {'parsed':>6} {'cards':>6} " +
+          " ".join(f"{name:>11}" for name in STAGES) + f" {'total':>9}")
+    for r in results:
+        print(f"{r['backend']:<7} {r['size']:<7} {r['chunks']:>6} {r['parsed_cards']:>6} {r['cards']:>6} " +
+              " ".join(f"{r['stages'][name] * 1000:9.1f}ms" for name in STAGES) +
+              f" {r['total']:8.2f}s")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
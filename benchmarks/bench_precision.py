@@ -0,0 +1,90 @@
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bench_pipeline import model_available
+
+SAMPLE_PATH = Path(__file__).parent.parent / "sample.txt"
+
+def measure(model_name: str, dtype: str, scale: int, num_cards: int, repeats: int, threads: int) -> dict:
+    """Run inside a fresh process so peak RSS belongs to this dtype alone"""
+    import torch
+    from LLM.llm_interface import FlanT5Interface
+
+    text = " ".join([SAMPLE_PATH.read_text(encoding='utf-8')] * scale)
+    llm = FlanT5Interface(model_name, dtype=dtype, seed=0, threads=threads or None)
+
+    load_start = time.perf_counter()
+    llm.handle
+    load_seconds = time.perf_counter() - load_start
+
+    timings = []
+    cards = 0
+    answered = 0
+    output_tokens = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        flashcards = llm.generate_flashcards(text, num_cards)
+        timings.append(time.perf_counter() - start)
+        cards += len(flashcards)
+        answered += sum(1 for c in flashcards if c['answer'] != '(No answer provided)')
+        output_tokens += sum(len(llm.tokenizer.encode(c['question'] + ' ' + c['answer'])) for c in flashcards)
+
+    best = min(timings)
+    return {
+        'dtype': dtype,
+        'threads': torch.get_num_threads(),
+        'load_seconds': load_seconds,
+        'best_seconds': best,
+        'mean_seconds': sum(timings) / len(timings),
+        'cards_per_run': cards / repeats,
+        # Cards that parsed into a labelled question and answer
+        'parse_success_rate': answered / cards if cards else 0.0,
+        'output_tokens_per_second': (output_tokens / repeats) / best if best else 0.0,
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare fp32, bf16 and int8 CPU inference')
+    parser.add_argument('--model', default='google/flan-t5-base', help='Model name')
+    parser.add_argument('--dtypes', default='float32,bfloat16,int8', help='Comma separated dtypes')
+    parser.add_argument('--scale', type=int, default=4, help='How many times to repeat sample.txt')
+    parser.add_argument('--num-cards', type=int, default=20, help='Cards requested per run')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per dtype')
+    parser.add_argument('--threads', type=int, default=0, help='torch threads (0 = torch default)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = measure(args.model, args.child, args.scale, args.num_cards, args.repeats, args.threads)
+        print(json.dumps(result))
+        return
+
+    if not model_available(args.model):
+        print(f"Needs torch and the cached weights of {args.model}; nothing to compare")
+        return
+
+    results = []
+    for dtype in args.dtypes.split(','):
+        cmd = [sys.executable, __file__, '--child', dtype, '--model', args.model,
+               '--scale', str(args.scale), '--num-cards', str(args.num_cards),
+               '--repeats', str(args.repeats), '--threads', str(args.threads)]
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    baseline = results[0]
+    for r in results:
+        print(f"{r['dtype']:>9}  load={r['load_seconds']:.1f}s  "
+              f"latency={r['best_seconds']:.2f}s ({baseline['best_seconds'] / r['best_seconds']:.2f}x)  "
+              f"tok/s={r['output_tokens_per_second']:.1f}  "
+              f"peak_rss={r['peak_rss_mb']:.0f}MB  "
+              f"parse_ok={r['parse_success_rate']:.0%}  cards={r['cards_per_run']:.1f}")
+
+if __name__ == "__main__":
+    main()
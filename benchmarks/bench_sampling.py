@@ -0,0 +1,89 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Real-model runs must never download weights
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+from LLM.flashCard_genrator import FlashcardGenerator
+from LLM.mock_interface import MockT5Interface
+from bench_pipeline import make_text, model_available
+
+def run(llm, text: str, num_cards: int, samples: int, strategy: str, repeats: int) -> dict:
+    """Unique cards per encoder pass and per second for one sampling setting"""
+    llm.samples_per_chunk = samples
+    llm.sample_strategy = strategy
+    # The input repeats sample.txt, so near-duplicate removal would discard almost
+    # everything; count cards that are unique as written instead
+    generator = FlashcardGenerator(llm, near_duplicate_threshold=None)
+    generator.max_duplicate_chunks = 0
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cards = generator.generate_from_text(text, num_cards)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    # One encoder pass per chunk prompt sent to the model
+    passes = len(llm.last_token_usage)
+    return {
+        'samples': samples,
+        'strategy': strategy,
+        'encoder_passes': passes,
+        'cards': len(cards),
+        'cards_per_pass': len(cards) / passes if passes else 0.0,
+        'best_seconds': best,
+        'cards_per_second': len(cards) / best if best else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Cards per encoder pass: single sample vs encode-once, sample-many')
+    parser.add_argument('--backend', choices=['auto', 'mock', 'real'], default='auto',
+                        help='auto uses the real model when its weights are cached')
+    parser.add_argument('--model', default='google/flan-t5-base', help='Real model name')
+    parser.add_argument('--size', default='64k', help='Input size (see bench_pipeline.py)')
+    parser.add_argument('--num-cards', type=int, default=40, help='Cards requested')
+    parser.add_argument('--samples', default='1,2,4', help='Comma separated samples per chunk')
+    parser.add_argument('--strategies', default='sample,diverse_beam', help='Strategies tried for samples > 1')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per setting')
+    parser.add_argument('--encoder-latency', type=float, default=0.05, help='Mock seconds per encoder pass')
+    parser.add_argument('--token-latency', type=float, default=0.004, help='Mock seconds per decode step')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    backend = args.backend
+    if backend == 'auto':
+        backend = 'real' if model_available(args.model) else 'mock'
+    if backend == 'real':
+        from LLM.llm_interface import FlanT5Interface
+        llm = FlanT5Interface(args.model, seed=0)
+    else:
+        llm = MockT5Interface(encoder_latency=args.encoder_latency, token_latency=args.token_latency)
+
+    text = make_text(args.size)
+    print(f"Backend: {backend}, input: {len(text)} chars, {args.num_cards} cards requested")
+
+    results = []
+    for samples in [int(s) for s in args.samples.split(',')]:
+        strategies = args.strategies.split(',') if samples > 1 else ['sample']
+        for strategy in strategies:
+            results.append(run(llm, text, args.num_cards, samples, strategy, args.repeats))
+
+    baseline = results[0]
+    for r in results:
+        print(f"samples={r['samples']} {r['strategy']:<12}  passes={r['encoder_passes']:>3}  "
+              f"cards={r['cards']:>3}  cards/pass={r['cards_per_pass']:.2f}  "
+              f"time={r['best_seconds']:.2f}s  cards/s={r['cards_per_second']:.2f} "
+              f"({r['cards_per_second'] / baseline['cards_per_second']:.2f}x)")
+
+    if args.output:
+        args.output.write_text(json.dumps({'backend': backend, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Import-time budgets in seconds (median wall time of a fresh interpreter,
+# interpreter start-up included). The heavy modules must not be imported.
+CASES = [
+    ('cli --help', [sys.executable, str(ROOT / 'UI' / 'cli.py'), '--help'], 0.5),
+    ('import LLM', [sys.executable, '-c', 'import LLM'], 0.15),
+    ('import generator + exporter', [sys.executable, '-c',
+        'import sys, LLM.flashCard_genrator, LLM.export, LLM.corpus; '
+        'heavy = [m for m in ("torch", "transformers", "pandas") if m in sys.modules]; '
+        'sys.exit("heavy imports: " + ", ".join(heavy) if heavy else 0)'], 0.3),
+]
+
+def time_command(cmd, runs: int) -> float:
+    """Median wall time of a command over several runs"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Check start-up time against the import budget')
+    parser.add_argument('--runs', type=int, default=7, help='Runs per case')
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, '-c', 'pass'], args.runs)
+    print(f"{'interpreter start-up':<30} {baseline * 1000:7.1f} ms")
+
+    over_budget = False
+    for name, cmd, budget in CASES:
+        try:
+            seconds = time_command(cmd, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<30} FAILED (exit {e.returncode})")
+            over_budget = True
+            continue
+        status = 'ok' if seconds <= budget else 'OVER BUDGET'
+        over_budget |= seconds > budget
+        print(f"{name:<30} {seconds * 1000:7.1f} ms  (budget {budget * 1000:.0f} ms)  {status}")
+
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Real-model runs must never download weights
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+from LLM.mock_interface import MockT5Interface
+from bench_pipeline import make_text, model_available
+
+def run(llm, text: str, num_cards: int, adaptive: bool, repeats: int) -> dict:
+    """Decode steps, stop reasons and latency with adaptive decoding on or off"""
+    llm.adaptive_decoding = adaptive
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cards = llm.generate_flashcards(text, num_cards)
+        timings.append(time.perf_counter() - start)
+    stats = llm.last_decode_stats
+    reasons = Counter(r for s in stats for r in (s['stop_reasons'] or ['eos or max_length']))
+    return {
+        'adaptive': adaptive,
+        'num_cards': num_cards,
+        'chunks': len(llm.last_token_usage),
+        'cards': len(cards),
+        'best_seconds': min(timings),
+        'generate_calls': len(stats),
+        'generated_tokens': sum(s['generated_tokens'] for s in stats),
+        'tokens_saved': sum(s['tokens_saved'] for s in stats),
+        'stop_reasons': dict(reasons)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Decode steps saved by card-aware stopping and adaptive max_new_tokens')
+    parser.add_argument('--backend', choices=['auto', 'mock', 'real'], default='auto',
+                        help='auto uses the real model when its weights are cached')
+    parser.add_argument('--model', default='google/flan-t5-base', help='Real model name')
+    parser.add_argument('--size', default='64k', help='Input size (see bench_pipeline.py)')
+    parser.add_argument('--num-cards', default='5,20,60', help='Comma separated card counts')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per setting')
+    parser.add_argument('--token-latency', type=float, default=0.002, help='Mock seconds per decode step')
+    parser.add_argument('--extra-cards', type=int, default=4, help='Mock cards written beyond the request')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    backend = args.backend
+    if backend == 'auto':
+        backend = 'real' if model_available(args.model) else 'mock'
+    if backend == 'real':
+        from LLM.llm_interface import FlanT5Interface
+        llm = FlanT5Interface(args.model, seed=0)
+    else:
+        llm = MockT5Interface(token_latency=args.token_latency, extra_cards=args.extra_cards)
+
+    text = make_text(args.size)
+    print(f"Backend: {backend}, input: {len(text)} chars")
+
+    results = []
+    for num_cards in [int(n) for n in args.num_cards.split(',')]:
+        baseline = run(llm, text, num_cards, False, args.repeats)
+        adaptive = run(llm, text, num_cards, True, args.repeats)
+        results += [baseline, adaptive]
+        for r in (baseline, adaptive):
+            print(f"cards={num_cards:>3} adaptive={str(r['adaptive']):<5}  "
+                  f"time={r['best_seconds']:.2f}s  decode_steps={r['generated_tokens']:>5}  "
+                  f"saved={r['tokens_saved']:>5} over {r['generate_calls']} calls  "
+                  f"cards_out={r['cards']:>3}  stops={r['stop_reasons']}")
+        print(f"  speedup {baseline['best_seconds'] / adaptive['best_seconds']:.2f}x")
+
+    if args.output:
+        args.output.write_text(json.dumps({'backend': backend, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.flashCard_genrator import FlashcardGenerator
+from LLM.mock_interface import MockT5Interface
+from LLM.telemetry import NULL_SINK, InMemorySink, JsonlSink, PrometheusSink
+from bench_pipeline import make_text
+
+def run(make_sink, text: str, num_cards: int, repeats: int) -> float:
+    """Best wall time of a mock generation with the given sink"""
+    timings = []
+    for _ in range(repeats):
+        sink = make_sink()
+        generator = FlashcardGenerator(MockT5Interface(), metrics=sink)
+        start = time.perf_counter()
+        generator.generate_from_text(text, num_cards)
+        timings.append(time.perf_counter() - start)
+        sink.close()
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost of telemetry on the mock pipeline, per sink')
+    parser.add_argument('--size', default='1m', help='Input size (see bench_pipeline.py)')
+    parser.add_argument('--num-cards', type=int, default=400, help='Cards requested')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per sink')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    text = make_text(args.size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sinks = {
+            'null': lambda: NULL_SINK,
+            'memory': InMemorySink,
+            'prometheus': PrometheusSink,
+            'jsonl': lambda: JsonlSink(Path(tmp) / 'metrics.jsonl'),
+        }
+        results = {name: run(make_sink, text, args.num_cards, args.repeats) for name, make_sink in sinks.items()}
+
+    baseline = results['null']
+    print(f"Input: {len(text)} chars, {args.num_cards} cards requested (mock backend, no latency)")
+    for name, seconds in results.items():
+        print(f"{name:>10}  {seconds * 1000:8.1f}ms  ({(seconds / baseline - 1) * 100:+.1f}%)")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
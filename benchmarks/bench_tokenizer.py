@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Real tokenizer runs must never download files
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+
+from LLM.flashCard_genrator import FlashcardGenerator
+from LLM.mock_interface import MockT5Interface, MockTokenizer
+from LLM.model_registry import ModelHandle
+from bench_pipeline import make_text
+
+class TokenizerClock:
+    """Seconds and calls spent in the tokenizer"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+class TimedTokenizer:
+    """
+    Tokenizer wrapper adding the time of every encode/decode call to a clock.
+    per_item replays batch calls one text or sequence at a time, as the
+    pipeline tokenized before batching.
+    """
+
+    def __init__(self, tokenizer, clock: TokenizerClock, per_item: bool = False):
+        self._tokenizer = tokenizer
+        self.clock = clock
+        self.per_item = per_item
+        self.paused = False
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
+    def _timed(self, fn, *args, calls: int = 1, **kwargs):
+        if self.paused:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.clock.seconds += time.perf_counter() - start
+            self.clock.calls += calls
+
+    def encode(self, text, **kwargs):
+        return self._timed(self._tokenizer.encode, text, **kwargs)
+
+    def __call__(self, texts, **kwargs):
+        if self.per_item and isinstance(texts, list):
+            return self._timed(lambda: {'input_ids': [self._tokenizer(t, **kwargs)['input_ids'] for t in texts]},
+                               calls=len(texts))
+        return self._timed(self._tokenizer, texts, **kwargs)
+
+    def decode(self, ids, **kwargs):
+        return self._timed(self._tokenizer.decode, ids, **kwargs)
+
+    def batch_decode(self, sequences, **kwargs):
+        if self.per_item:
+            sequences = list(sequences)
+            return self._timed(lambda: [self._tokenizer.decode(ids, **kwargs) for ids in sequences],
+                               calls=len(sequences))
+        return self._timed(self._tokenizer.batch_decode, sequences, **kwargs)
+
+class TimedMockInterface(MockT5Interface):
+    """Mock model over a given tokenizer; only the pipeline's own tokenizer calls are timed"""
+
+    def __init__(self, tokenizer, per_item: bool, **kwargs):
+        super().__init__(**kwargs)
+        self.clock = TokenizerClock()
+        self._timed = TimedTokenizer(tokenizer, self.clock, per_item)
+        # Stopping decodes every step of a real generate call, so it is timed even inside _generate
+        self._stopping_tokenizer = TimedTokenizer(tokenizer, self.clock, per_item)
+        self._handle = ModelHandle(self.model_name, None, self._timed, self.device, self.dtype)
+
+    def _decode_params(self, num_cards):
+        params, stopping = super()._decode_params(num_cards)
+        if stopping is not None:
+            stopping.tokenizer = self._stopping_tokenizer
+        return params, stopping
+
+    def _generate(self, prompts, num_cards=None):
+        # The mock decoding prompts and encoding its responses stands in for the model
+        self._timed.paused = True
+        try:
+            return super()._generate(prompts, num_cards)
+        finally:
+            self._timed.paused = False
+
+def tokenizer_available(model_name: str) -> bool:
+    """Whether the model's tokenizer files are in the local HF cache"""
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return False
+    return isinstance(try_to_load_from_cache(model_name, "spiece.model"), str)
+
+def load_tokenizers(backend: str, model_name: str) -> dict:
+    """Tokenizers to compare, by name"""
+    if backend == 'mock':
+        return {'mock': MockTokenizer()}
+    from LLM.model_registry import load_tokenizer
+    tokenizers = {'sentencepiece': load_tokenizer(model_name, fast=False)}
+    fast = load_tokenizer(model_name)
+    if fast.is_fast:
+        tokenizers['fast'] = fast
+    return tokenizers
+
+def run(tokenizer, per_item: bool, text: str, num_cards: int, token_latency: float, repeats: int) -> dict:
+    """Best of repeats: total pipeline time and the time spent tokenizing"""
+    best = None
+    for _ in range(repeats):
+        llm = TimedMockInterface(tokenizer, per_item, token_latency=token_latency)
+        # The mock's cards repeat across chunks; dedup would drop them and stop the run after a few chunks
+        generator = FlashcardGenerator(llm, near_duplicate_threshold=None)
+        generator.max_duplicate_chunks = 0
+        start = time.perf_counter()
+        cards = generator.generate_from_text(text, num_cards)
+        total = time.perf_counter() - start
+        if best is None or total < best['total_seconds']:
+            best = {'total_seconds': total, 'tokenizer_seconds': llm.clock.seconds,
+                    'tokenizer_calls': llm.clock.calls, 'cards': len(cards)}
+    best['tokenizer_share'] = best['tokenizer_seconds'] / best['total_seconds']
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Tokenizer time as a share of the pipeline, per-item vs batched calls')
+    parser.add_argument('--backend', choices=['auto', 'mock', 'real'], default='auto',
+                        help='auto uses the real T5 tokenizers when their files are cached')
+    parser.add_argument('--model', default='google/flan-t5-base', help='Model whose tokenizer to load')
+    parser.add_argument('--size', default='1m', help='Input size (see bench_pipeline.py)')
+    parser.add_argument('--num-cards', type=int, default=400, help='Cards requested')
+    parser.add_argument('--token-latency', type=float, default=0.0,
+                        help='Mock seconds per decode step, standing in for the model')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per setting')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    backend = args.backend
+    if backend == 'auto':
+        backend = 'real' if tokenizer_available(args.model) else 'mock'
+    tokenizers = load_tokenizers(backend, args.model)
+    text = make_text(args.size)
+    print(f"Backend: {backend}, input: {len(text)} chars, {args.num_cards} cards requested, "
+          f"{args.token_latency * 1000:g}ms per decode step")
+
+    results = []
+    for name, tokenizer in tokenizers.items():
+        for per_item in (True, False):
+            r = run(tokenizer, per_item, text, args.num_cards, args.token_latency, args.repeats)
+            r.update(tokenizer=name, calls='per item' if per_item else 'batched')
+            results.append(r)
+            print(f"{name:>13} {r['calls']:>8}  total={r['total_seconds']:.2f}s  "
+                  f"tokenizer={r['tokenizer_seconds']:.2f}s ({r['tokenizer_share'] * 100:.1f}%) "
+                  f"in {r['tokenizer_calls']} calls  cards={r['cards']}")
+
+    if args.output:
+        args.output.write_text(json.dumps({'backend': backend, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+SERVER = ROOT / "UI" / "server.py"
+SAMPLE_PATH = ROOT / "sample.txt"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_ready(url: str, timeout: float):
+    """Poll /readyz until every worker has loaded its model"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/readyz', timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+def request_deck(url: str, body: bytes) -> dict:
+    """One POST /decks, reading the streamed NDJSON until the status line"""
+    start = time.perf_counter()
+    first_card = None
+    cards = 0
+    request = urllib.request.Request(url + '/decks', data=body, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            for line in response:
+                message = json.loads(line)
+                if 'question' in message:
+                    cards += 1
+                    if first_card is None:
+                        first_card = time.perf_counter() - start
+                status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return {'status': status, 'seconds': time.perf_counter() - start, 'first_card': first_card, 'cards': cards}
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def run_level(url: str, body: bytes, concurrency: int, requests: int) -> dict:
+    """Keep `concurrency` clients busy until `requests` requests have completed"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: request_deck(url, body), range(requests)))
+    elapsed = time.perf_counter() - start
+    ok = [r for r in results if r['status'] == 200]
+    latencies = [r['seconds'] for r in ok]
+    first_cards = [r['first_card'] for r in ok if r['first_card'] is not None]
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'ok': len(ok),
+        'rejected': sum(r['status'] == 503 for r in results),
+        'timed_out': sum(r['status'] == 504 for r in results),
+        'p50_seconds': percentile(latencies, 50),
+        'p99_seconds': percentile(latencies, 99),
+        'p50_first_card_seconds': percentile(first_cards, 50),
+        'requests_per_second': len(ok) / elapsed,
+        'cards_per_second': sum(r['cards'] for r in ok) / elapsed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test UI/server.py against the mock backend')
+    parser.add_argument('--url', help='Test a server that is already running instead of starting one')
+    parser.add_argument('--workers', type=int, default=2, help='Server worker processes')
+    parser.add_argument('--max-queue', type=int, default=64, help='Server request queue limit')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='Comma separated client counts')
+    parser.add_argument('--requests', type=int, default=40, help='Requests per concurrency level')
+    parser.add_argument('--num-cards', type=int, default=10, help='Cards requested per deck')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock seconds per generate call')
+    parser.add_argument('--token-latency', type=float, default=0.001, help='Mock seconds per decode step')
+    parser.add_argument('--output', type=Path, help='Write JSON results here')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        cmd = [sys.executable, str(SERVER), '--backend', 'mock', '--port', str(port),
+               '--workers', str(args.workers), '--max-queue', str(args.max_queue),
+               '--mock-latency', str(args.latency), '--mock-token-latency', str(args.token_latency)]
+        server = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    try:
+        wait_ready(url, timeout=120)
+        body = json.dumps({'text': SAMPLE_PATH.read_text(encoding='utf-8'), 'num_cards': args.num_cards}).encode('utf-8')
+        # Warm up connections and worker caches outside the measurement
+        request_deck(url, body)
+
+        print(f"Server: {url}, {args.workers} mock worker(s), {args.num_cards} cards per deck")
+        results = []
+        for concurrency in [int(c) for c in args.concurrency.split(',')]:
+            r = run_level(url, body, concurrency, args.requests)
+            results.append(r)
+            print(f"concurrency={concurrency:>3}  ok={r['ok']:>3}/{r['requests']}  rejected={r['rejected']:>3}  "
+                  f"p50={r['p50_seconds'] * 1000:>7.1f}ms  p99={r['p99_seconds'] * 1000:>7.1f}ms  "
+                  f"first_card_p50={r['p50_first_card_seconds'] * 1000:>6.1f}ms  "
+                  f"throughput={r['requests_per_second']:.1f} req/s ({r['cards_per_second']:.0f} cards/s)")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        args.output.write_text(json.dumps({'url': url, 'workers': args.workers, 'results': results}, indent=2))
+
+if __name__ == "__main__":
+    main()
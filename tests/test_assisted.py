@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from transformers import T5Config, T5ForConditionalGeneration
+
+from LLM.llm_interface import FlanT5Interface
+from LLM.model_registry import ModelHandle
+
+VOCAB = 64
+EOS = 1
+MAX_LENGTH = 24
+
+def tiny_t5(seed: int):
+    """Randomly initialised two-layer T5, small enough to build in a test"""
+    torch.manual_seed(seed)
+    config = T5Config(vocab_size=VOCAB, d_model=32, d_ff=64, d_kv=16, num_layers=2, num_heads=2,
+                      decoder_start_token_id=0, pad_token_id=0, eos_token_id=EOS)
+    return T5ForConditionalGeneration(config).eval()
+
+def assisted_llm(target, draft) -> FlanT5Interface:
+    """FlanT5Interface over the given models, decoding greedily to a fixed length"""
+    tokenizer = SimpleNamespace(pad_token_id=0, eos_token_id=EOS)
+    llm = FlanT5Interface('tiny-target', device='cpu', draft_model_name='tiny-draft')
+    llm._handle = ModelHandle('tiny-target', target, tokenizer, 'cpu', 'float32')
+    llm._draft_handle = ModelHandle('tiny-draft', draft, tokenizer, 'cpu', 'float32')
+    llm.adaptive_decoding = False
+    # min_length keeps a random model from stopping at EOS after a token or two
+    llm.generation_params = {'max_length': MAX_LENGTH, 'min_length': MAX_LENGTH, 'do_sample': False}
+    return llm
+
+PROMPTS = [[5, 9, 12, 30, EOS], [7, 7, 40, EOS]]
+
+@pytest.mark.parametrize('draft_seed', [0, 1])
+def test_assisted_output_is_the_target_greedy_output(draft_seed):
+    target = tiny_t5(0)
+    llm = assisted_llm(target, tiny_t5(draft_seed))
+
+    outputs = llm._generate_assisted(PROMPTS)
+
+    for prompt, output in zip(PROMPTS, outputs):
+        with torch.inference_mode():
+            expected = target.generate(input_ids=torch.tensor([prompt]), max_length=MAX_LENGTH,
+                                       min_length=MAX_LENGTH, do_sample=False, pad_token_id=EOS)[0]
+        assert output[:len(expected)].tolist() == expected.tolist()
+
+def test_acceptance_accounting():
+    llm = assisted_llm(tiny_t5(0), tiny_t5(0))
+
+    llm._generate_assisted(PROMPTS)
+
+    assert len(llm.last_decode_stats) == len(PROMPTS)
+    for stats in llm.last_decode_stats:
+        acceptance = stats['acceptance']
+        # Each target pass keeps the accepted draft tokens plus one of its own
+        assert acceptance['accepted_tokens'] + acceptance['target_passes'] == stats['generated_tokens']
+        assert acceptance['accepted_tokens'] <= acceptance['draft_tokens']
+        # A draft identical to the target is always right, so it saves target passes
+        assert acceptance['accepted_tokens'] > 0
+        assert acceptance['target_passes'] < stats['generated_tokens']
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / 'benchmarks'))
+
+import pytest
+
+from LLM.cache import ResultCache
+from LLM.cards import Flashcard
+from LLM.mock_interface import MockT5Interface
+from bench_pipeline import make_text
+
+def cards(n: str):
+    return [Flashcard(f"Question {n}?", f"Answer {n}", 'Hard')]
+
+def test_memory_tier_drops_the_least_recently_used():
+    cache = ResultCache(memory_entries=2)
+    cache.put('a', cards('a'))
+    cache.put('b', cards('b'))
+    assert cache.get('a') == cards('a')
+    cache.put('c', cards('c'))
+    # 'a' was used after 'b', so 'b' goes
+    assert cache.get('b') is None
+    assert cache.get('a') == cards('a') and cache.get('c') == cards('c')
+    assert cache.stats()['memory_entries'] == 2
+
+def test_disk_tier_persists_and_evicts_by_size(tmp_path):
+    path = tmp_path / 'cache.db'
+    cache = ResultCache(str(path), memory_entries=1)
+    cache.put('a', cards('a'))
+    entry = cache.stats()['disk_bytes']
+    cache.close()
+
+    # A new cache on the same file, with room for three entries
+    cache = ResultCache(str(path), memory_entries=1, max_disk_bytes=3 * entry)
+    assert cache.get('a') == cards('a')
+    assert cache.stats()['disk_hits'] == 1
+    for key in 'bcd':
+        cache.put(key, cards(key))
+    stats = cache.stats()
+    assert stats['disk_entries'] == 3 and stats['disk_bytes'] <= 3 * entry
+    # Least recently used on disk goes first; the memory tier only holds 'd'
+    assert cache.get('a') is None
+    assert [cache.get(key) for key in 'bcd'] == [cards(key) for key in 'bcd']
+    cache.close()
+
+def test_cached_cards_are_fresh_objects():
+    cache = ResultCache()
+    cache.put('a', cards('a'))
+    first = cache.get('a')
+    first[0]['answer'] = 'edited'
+    assert cache.get('a') == cards('a')
+
+SETTINGS = [('seed', 1), ('adaptive_decoding', False), ('samples_per_chunk', 2),
+            ('sample_strategy', 'diverse_beam'), ('draft_model_name', 'small'), ('dtype', 'int8'),
+            ('generation_params', {'max_length': 200, 'temperature': 0.7, 'do_sample': True})]
+
+@pytest.mark.parametrize('name, value', SETTINGS)
+def test_output_settings_change_the_key(name, value):
+    llm = MockT5Interface(cache=ResultCache())
+    key = llm._cache_key("Paris is the capital of France.", 2)
+    assert key == MockT5Interface(cache=ResultCache())._cache_key("Paris is the capital of France.", 2)
+    setattr(llm, name, value)
+    assert llm._cache_key("Paris is the capital of France.", 2) != key
+
+def test_unseeded_sampling_is_not_cached():
+    llm = MockT5Interface(cache=ResultCache(), seed=None)
+    assert llm._cache_key("Paris is the capital of France.", 2) is None
+    llm.generation_params = dict(llm.generation_params, do_sample=False)
+    assert llm._cache_key("Paris is the capital of France.", 2) is not None
+
+def test_generation_reuses_cached_chunks_until_a_setting_changes():
+    text = make_text('64k')
+    cache = ResultCache()
+    first = MockT5Interface(cache=cache).generate_flashcards(text, 10)
+    assert cache.stats()['hits'] == 0
+
+    assert MockT5Interface(cache=cache).generate_flashcards(text, 10) == first
+    hits = cache.stats()['hits']
+    assert hits > 0 and cache.stats()['misses'] == hits
+
+    llm = MockT5Interface(cache=cache)
+    llm.adaptive_decoding = False
+    llm.generate_flashcards(text, 10)
+    assert cache.stats()['hits'] == hits
@@ -0,0 +1,69 @@
+import json
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from LLM.cards import Deck, Flashcard, NO_CHUNK, card_rows
+
+CARDS = [
+    {'question': 'What is DNA?', 'answer': 'A molecule carrying genetic information', 'difficulty': 'Easy'},
+    {'question': 'Who proposed relativity?', 'answer': 'Albert Einstein', 'difficulty': 'Hard'},
+    {'question': 'What is a noun?', 'answer': '', 'difficulty': 'Medium'},
+]
+
+def test_flashcard_answers_the_dict_api():
+    card = Flashcard('What is DNA?', 'A molecule', 'Easy', chunk=3)
+    assert card['question'] == 'What is DNA?' and card.get('answer') == 'A molecule'
+    assert card.get('chunk') is None and card.get('missing', 'x') == 'x'
+    assert 'difficulty' in card and 'chunk' not in card
+    assert dict(card) == card.to_dict() == {'question': 'What is DNA?', 'answer': 'A molecule', 'difficulty': 'Easy'}
+    assert json.loads(json.dumps(dict(card))) == card
+    card['answer'] = 'A nucleic acid'
+    assert card.answer == 'A nucleic acid'
+    with pytest.raises(KeyError):
+        card['chunk']
+    with pytest.raises(KeyError):
+        card['source'] = 'notes.txt'
+
+def test_flashcard_equals_its_dict():
+    card = Flashcard.from_dict(CARDS[0])
+    assert card == CARDS[0] and CARDS[0] == card
+    assert card != dict(CARDS[0], answer='DNA')
+    assert card != dict(CARDS[0], source='notes.txt')
+    assert Flashcard.from_dict(card) is card
+    partial = Flashcard.from_dict({'question': 'Why?'})
+    assert (partial.answer, partial.difficulty, partial.chunk) == ('', 'Medium', NO_CHUNK)
+
+def test_deck_round_trips_dicts():
+    deck = Deck(CARDS)
+    assert len(deck) == len(CARDS)
+    assert deck == CARDS and list(deck) == CARDS
+    assert deck.to_dicts() == CARDS
+    assert list(card_rows(deck)) == list(card_rows(CARDS)) == [tuple(c.values()) for c in CARDS]
+    assert deck[-1] == CARDS[-1] and deck[1:] == CARDS[1:]
+    with pytest.raises(IndexError):
+        deck[len(CARDS)]
+
+def test_deck_keeps_unknown_difficulties_and_chunks():
+    deck = Deck([Flashcard('Q1?', 'A1', 'Expert', chunk=4), {'question': 'Q2?'}])
+    assert [card.difficulty for card in deck] == ['Expert', 'Medium']
+    assert [card.chunk for card in deck] == [4, NO_CHUNK]
+    merged = Deck(CARDS)
+    merged.extend(deck)
+    assert merged.to_dicts() == CARDS + deck.to_dicts()
+    assert [card.chunk for card in merged][-2:] == [4, NO_CHUNK]
+
+def test_deck_edits_and_filters():
+    deck = Deck(CARDS)
+    deck[2] = {'question': 'What is a verb?', 'answer': 'An action word', 'difficulty': 'Hard'}
+    assert deck[2] == {'question': 'What is a verb?', 'answer': 'An action word', 'difficulty': 'Hard'}
+    hard = deck.filter(lambda card: card['difficulty'] == 'Hard')
+    assert [card['question'] for card in hard] == ['Who proposed relativity?', 'What is a verb?']
+    assert deck.filter([True, False, False]) == CARDS[:1]
+
+def test_missing_difficulty_is_medium_everywhere():
+    cards = [{'question': 'Q1?', 'answer': 'A1'}]
+    assert list(card_rows(cards)) == list(card_rows(Deck(cards))) == [('Q1?', 'A1', 'Medium')]
+    assert Flashcard.from_dict(cards[0]).difficulty == 'Medium'
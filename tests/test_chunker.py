@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / 'benchmarks'))
+
+from LLM.cache import ResultCache
+from LLM.llm_interface import MAX_INPUT_TOKENS
+from LLM.mock_interface import MockT5Interface
+from LLM.sampling import row_seed
+from bench_pipeline import make_text
+
+TEXT = make_text('64k')
+
+def tokens(llm, text: str) -> int:
+    return len(llm.tokenizer.encode(text, add_special_tokens=False))
+
+def budget(llm, max_tokens: int = 400) -> int:
+    return min(max_tokens, MAX_INPUT_TOKENS - llm._prompt_overhead())
+
+def test_chunks_fill_the_budget_without_a_cache():
+    llm = MockT5Interface()
+    chunks = llm._chunk_text(TEXT)
+    limit = budget(llm)
+    for chunk, following in zip(chunks, chunks[1:]):
+        assert tokens(llm, chunk) <= limit
+        # Cut only where the next sentence would not have fitted
+        first = llm._split_sentences(following)[0]
+        assert tokens(llm, chunk) + tokens(llm, first) > limit
+
+def test_chunks_keep_every_sentence_in_order():
+    llm = MockT5Interface()
+    sentences = llm._split_sentences(TEXT)
+    chunks = llm._chunk_text(TEXT, max_tokens=60)
+    assert len(chunks) > 20
+    assert all(tokens(llm, chunk) <= 60 for chunk in chunks)
+    assert [s for chunk in chunks for s in llm._split_sentences(chunk)] == sentences
+
+def test_overlap_repeats_the_last_sentence():
+    llm = MockT5Interface()
+    sentences = llm._split_sentences(TEXT)
+    chunks = llm._chunk_text(TEXT, max_tokens=60, overlap_sentences=1)
+    assert all(tokens(llm, chunk) <= 60 for chunk in chunks)
+    overlapped = 0
+    for chunk, following in zip(chunks, chunks[1:]):
+        last = llm._split_sentences(chunk)[-1]
+        if llm._split_sentences(following)[0] == last:
+            overlapped += 1
+    # The overlap is dropped only when the next sentence would not fit after it
+    assert overlapped >= len(chunks) // 2
+    seen = []
+    for chunk in chunks:
+        for sentence in llm._split_sentences(chunk):
+            if not seen or seen[-1] != sentence:
+                seen.append(sentence)
+    assert seen == sentences
+
+def test_oversize_sentence_is_split_into_word_runs():
+    llm = MockT5Interface()
+    words = [f"word{i}" for i in range(1000)]
+    text = "A short opening sentence. " + " ".join(words) + ". A short closing sentence."
+    chunks = llm._chunk_text(text, max_tokens=100)
+    assert all(tokens(llm, chunk) <= 100 for chunk in chunks)
+    # Every word survives, in order
+    assert " ".join(chunks).split() == text.split()
+
+def test_cached_chunks_realign_after_an_edit():
+    llm = MockT5Interface(cache=ResultCache())
+    sentences = llm._split_sentences(TEXT)
+    edited = list(sentences)
+    edited[len(sentences) // 3] = "An inserted sentence that shifts things. " * 2
+    before = llm._chunk_text(" ".join(sentences))
+    after = llm._chunk_text(" ".join(edited))
+    assert all(tokens(llm, chunk) <= budget(llm) for chunk in before + after)
+    # Only the chunks around the edit change
+    assert len(set(after) - set(before)) <= 3
+    assert len(set(before) & set(after)) >= len(before) - 3
+
+def test_row_seed_is_per_prompt_and_sample():
+    assert row_seed(0, [5, 6, 7]) == row_seed(0, [5, 6, 7])
+    seeds = {row_seed(0, [5, 6, 7]), row_seed(0, [5, 6, 8]), row_seed(0, [5, 6, 7], 1), row_seed(1, [5, 6, 7])}
+    assert len(seeds) == 4
@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.corpus import CorpusRunner, find_corpus_files
+from LLM.mock_interface import MockT5Interface
+
+SAMPLE = (Path(__file__).parent.parent / 'sample.txt').read_text(encoding='utf-8')
+
+def runner(source, output, root):
+    return CorpusRunner(find_corpus_files(source), str(output), fmt='json', num_cards=5, root=root,
+                        generator_kwargs={'llm_interface': MockT5Interface()})
+
+def test_resume_recognises_files_under_another_spelling(tmp_path, monkeypatch):
+    corpus = tmp_path / 'corpus'
+    (corpus / 'a').mkdir(parents=True)
+    (corpus / 'a' / 'one.txt').write_text(SAMPLE, encoding='utf-8')
+    (corpus / 'two.md').write_text(SAMPLE, encoding='utf-8')
+
+    first = runner(str(corpus), tmp_path / 'decks', str(corpus)).run()
+    assert first['files'] == 2
+
+    # The same corpus named relative to the working directory, through a detour
+    monkeypatch.chdir(tmp_path)
+    source = os.path.join('corpus', 'a', '..')
+    second = runner(source, tmp_path / 'decks', source).run()
+    assert second['files'] == 0 and second['skipped'] == 2
+
+    with open(tmp_path / 'decks' / 'manifest.jsonl', encoding='utf-8') as f:
+        keys = sorted(json.loads(line)['key'] for line in f)
+    assert keys == ['a/one.txt', 'two.md']
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.cards import Flashcard
+from LLM.deck_store import DeckStore, deck_params, hash_text
+from LLM.mock_interface import MockT5Interface
+
+def test_settings_that_change_output_change_the_deck(tmp_path):
+    store = DeckStore(str(tmp_path / 'decks.db'))
+    source = hash_text("Paris is the capital of France.")
+    params = deck_params(MockT5Interface(), 10, 'Mixed')
+    store.add_deck([Flashcard("What is the capital of France?", "Paris")], source, params)
+    assert store.find_deck(source, deck_params(MockT5Interface(), 10, 'Mixed')) is not None
+
+    changes = [('seed', 1), ('adaptive_decoding', False), ('sample_strategy', 'diverse_beam'),
+               ('draft_model_name', 'small'), ('generation_params', {'max_length': 300, 'do_sample': False})]
+    for name, value in changes:
+        llm = MockT5Interface()
+        setattr(llm, name, value)
+        assert store.find_deck(source, deck_params(llm, 10, 'Mixed')) is None, name
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.cards import Flashcard
+from LLM.dedup import NearDuplicateDetector
+
+# Close rephrasings the default threshold merges
+REPHRASINGS = [
+    (Flashcard("Who led the Salt March?", "Mahatma Gandhi led the Salt March in 1930."),
+     Flashcard("Who led the Salt March in India?", "Mahatma Gandhi led the Salt March in India in 1930.")),
+    (Flashcard("What is Python used for?", "Python is used for web development and data science."),
+     Flashcard("What is Python used for?", "Python is used for data science and web development.")),
+    (Flashcard("What is the Ganges known for?", "The Ganges is considered sacred in Hinduism."),
+     Flashcard("What is the Ganges River known for?", "The Ganges River is considered sacred in Hinduism.")),
+    (Flashcard("What is the Renaissance?", "The Renaissance was a period of cultural rebirth in Europe."),
+     Flashcard("What was the Renaissance?", "A period of cultural rebirth in Europe.")),
+]
+
+# Different facts on the same topic, which must both be kept
+DISTINCT = [
+    (Flashcard("When did India gain independence?", "India gained independence on August 15, 1947."),
+     Flashcard("When did Pakistan gain independence?", "Pakistan gained independence on August 14, 1947.")),
+    (Flashcard("What is the capital of France?", "Paris is the capital of France."),
+     Flashcard("What is the capital of Italy?", "Rome is the capital of Italy.")),
+    (Flashcard("Where did the Renaissance begin?", "The Renaissance began in Italy in the 14th century."),
+     Flashcard("When did the Renaissance end?", "The Renaissance lasted until the 17th century.")),
+]
+
+def is_duplicate(first: Flashcard, second: Flashcard) -> bool:
+    detector = NearDuplicateDetector()
+    detector.add(first)
+    return not detector.add(second)
+
+def test_close_rephrasings_are_merged():
+    for first, second in REPHRASINGS:
+        assert is_duplicate(first, second), first.question
+
+def test_different_facts_are_kept():
+    for first, second in DISTINCT:
+        assert not is_duplicate(first, second), first.question
+
+def test_reworded_cards_are_not_caught():
+    # Shingles only see shared wording; rewordings with new vocabulary pass through
+    assert not is_duplicate(Flashcard("What is photosynthesis?", "Plants use sunlight to make food."),
+                            Flashcard("How do plants produce food?", "Through photosynthesis, powered by light."))
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import sqlite3
+import sys
+import zipfile
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from LLM import export
+from LLM.cards import Deck, Flashcard
+from LLM.export import FlashcardExporter, write_apkg
+
+CARDS = [
+    {'question': 'What is <b>bold</b>?', 'answer': 'Markup & more', 'difficulty': 'Easy'},
+    {'question': 'Who wrote "Hamlet"?', 'answer': 'Shakespeare,\tin 1600', 'difficulty': 'Hard'},
+] + [{'question': f'Question {i}?', 'answer': f'Answer {i}', 'difficulty': 'Medium'} for i in range(8)]
+
+def read_apkg(data: bytes, tmp_path: Path):
+    """Notes, cards and the col row of an .apkg payload"""
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        assert sorted(package.namelist()) == ['collection.anki2', 'media']
+        assert json.loads(package.read('media')) == {}
+        db_path = tmp_path / 'collection.anki2'
+        db_path.write_bytes(package.read('collection.anki2'))
+    db = sqlite3.connect(str(db_path))
+    try:
+        notes = db.execute("SELECT id, mid, flds, sfld, tags FROM notes ORDER BY id").fetchall()
+        cards = db.execute("SELECT nid, did, due FROM cards ORDER BY id").fetchall()
+        models, decks = db.execute("SELECT models, decks FROM col").fetchone()
+    finally:
+        db.close()
+    return notes, cards, json.loads(models), json.loads(decks)
+
+@pytest.mark.parametrize('source', [list, Deck, lambda cards: (Flashcard.from_dict(c) for c in cards)])
+def test_apkg_holds_every_card(source, tmp_path, monkeypatch):
+    # Small batches so the notes go in over several executemany calls
+    monkeypatch.setattr(export, 'APKG_BATCH_SIZE', 3)
+    buffer = io.BytesIO()
+    assert write_apkg(source(CARDS), buffer, deck_name='Biology') == len(CARDS)
+
+    notes, cards, models, decks = read_apkg(buffer.getvalue(), tmp_path)
+    assert len(notes) == len(cards) == len(CARDS)
+    assert notes[0][2] == 'What is &lt;b&gt;bold&lt;/b&gt;?\x1fMarkup &amp; more'
+    assert notes[0][3] == 'What is <b>bold</b>?'
+    assert [tags.strip() for *_, tags in notes] == [c['difficulty'] for c in CARDS]
+    # One new card per note, in deck order, in the named deck of the note type
+    assert [nid for nid, _, _ in cards] == [note[0] for note in notes]
+    assert [due for _, _, due in cards] == list(range(1, len(CARDS) + 1))
+    deck_ids = {did for _, did, _ in cards}
+    assert len(deck_ids) == 1 and decks[str(deck_ids.pop())]['name'] == 'Biology'
+    assert {mid for _, mid, _, _, _ in notes} == {int(mid) for mid in models}
+
+def test_apkg_to_file_uses_the_file_name_as_deck(tmp_path):
+    path = tmp_path / 'chemistry.apkg'
+    assert FlashcardExporter.stream_to_file(iter(CARDS), str(path), 'apkg') == len(CARDS)
+    notes, _, _, decks = read_apkg(path.read_bytes(), tmp_path)
+    assert len(notes) == len(CARDS)
+    assert 'chemistry' in [deck['name'] for deck in decks.values()]
+
+def test_text_formats_round_trip():
+    deck = Deck(CARDS)
+    rows = list(csv.reader(io.StringIO(FlashcardExporter.to_bytes(deck, 'csv').decode('utf-8'))))
+    assert rows == [['question', 'answer', 'difficulty']] + [list(c.values()) for c in CARDS]
+
+    document = json.loads(FlashcardExporter.to_bytes(deck, 'json'))
+    assert document['flashcards'] == CARDS and document['total_cards'] == len(CARDS)
+
+    rows = list(csv.reader(io.StringIO(FlashcardExporter.to_bytes(deck, 'anki').decode('utf-8'))))
+    assert rows == [[c['question'], c['answer']] for c in CARDS]
+
+    lines = FlashcardExporter.to_bytes(deck, 'quizlet').decode('utf-8').splitlines()
+    assert [line.split('\t') for line in lines] == [[c['question'], c['answer'].replace('\t', ' ')]
+                                                    for c in CARDS]
+
+def test_stream_to_file_consumes_a_generator_once(tmp_path):
+    path = tmp_path / 'cards.json'
+    assert FlashcardExporter.stream_to_file((c for c in CARDS), str(path), 'json') == len(CARDS)
+    assert json.loads(path.read_text(encoding='utf-8'))['flashcards'] == CARDS
+    with pytest.raises(ValueError):
+        FlashcardExporter.stream_to_file(CARDS, str(path), 'pdf')
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / 'benchmarks'))
+
+from LLM.flashCard_genrator import FlashcardGenerator
+from LLM.mock_interface import MockT5Interface
+from bench_pipeline import make_text
+
+TEXT = make_text('64k')
+
+def count_index_builds(generator: FlashcardGenerator) -> list:
+    builds = []
+    build = generator._build_index
+    generator._build_index = lambda sentences: builds.append(len(sentences)) or build(sentences)
+    return builds
+
+def test_index_is_not_built_when_every_card_is_answered():
+    generator = FlashcardGenerator(MockT5Interface(unanswered_every=0))
+    builds = count_index_builds(generator)
+    assert len(generator.generate_from_text(TEXT, 40)) > 0
+    assert builds == []
+
+def test_index_is_built_once_for_unanswered_cards():
+    generator = FlashcardGenerator(MockT5Interface(unanswered_every=2))
+    builds = count_index_builds(generator)
+    assert len(generator.generate_from_text(TEXT, 40)) > 0
+    assert len(builds) == 1
+
+def test_sentence_stream_matches_sentence_list(tmp_path):
+    from LLM.normalizer import SentenceFile, read_sentences
+    path = tmp_path / 'input.txt'
+    path.write_text(TEXT, encoding='utf-8')
+
+    def cards(sentences):
+        llm = MockT5Interface()
+        return [(card.question, card.answer, card.chunk)
+                for batch in llm.iter_flashcards_from_sentences(sentences, 40) for card in batch]
+
+    expected = cards(read_sentences(path))
+    assert len(expected) > 20
+    assert cards(SentenceFile(path)) == expected
+    assert cards(iter(read_sentences(path))) == expected
@@ -0,0 +1,49 @@
+import random
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.llm_interface import SENTENCE_BOUNDARY
+from LLM.normalizer import iter_normalized, iter_sentences, normalize_text
+
+SAMPLE_PATH = Path(__file__).parent.parent / "sample.txt"
+
+def whole_text_sentences(text: str) -> list:
+    """The normalizer before streaming: normalize everything, then split"""
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(normalize_text(text)) if s.strip()]
+
+def blocks(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def streamed(text: str, size: int) -> list:
+    return list(iter_sentences(iter_normalized(blocks(text, size))))
+
+def test_matches_whole_text_for_every_block_size():
+    text = SAMPLE_PATH.read_text(encoding='utf-8')
+    expected = whole_text_sentences(text)
+    for size in (1, 2, 3, 5, 7, 64, 1000, len(text)):
+        assert streamed(text, size) == expected
+
+def test_boundaries_split_across_pieces():
+    text = 'He said "Stop." Then he left! "Why?" she asked.  (Maybe) 42 is it? Yes. e.g. no\n\nEnd.'
+    expected = whole_text_sentences(text)
+    for size in range(1, 12):
+        assert streamed(text, size) == expected
+
+def test_random_text_matches_whole_text():
+    rng = random.Random(0)
+    alphabet = ['a', 'B', '7', '.', '!', '?', ' ', '  ', '\n', '"', "'", '(', ']', 'x@y.z', 'http://a.b ']
+    for _ in range(200):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        size = rng.randint(1, 10)
+        assert streamed(text, size) == whole_text_sentences(text), (text, size)
+
+def test_unnormalized_pieces_match_split():
+    text = 'One.   Two!\n\n  "Three"  four.' + ' ' * 50 + 'Five'
+    expected = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+    for size in range(1, 10):
+        assert list(iter_sentences(blocks(text, size))) == expected
+
+def test_text_without_boundaries_is_one_sentence():
+    text = 'word ' * 20000
+    assert streamed(text, 1000) == [text.strip()]
@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from LLM.onnx_interface import OnnxModelRegistry, EXPORT_MARKER
+
+class StubModel:
+    """Writes its files slowly, so concurrent exports overlap"""
+
+    def __init__(self, name: str, fail: bool = False):
+        self.name = name
+        self.fail = fail
+
+    def save_pretrained(self, path):
+        (Path(path) / 'config.json').write_text(self.name)
+        time.sleep(0.02)
+        if self.fail:
+            raise OSError("disk full")
+        (Path(path) / 'decoder_model.onnx').write_text(self.name)
+
+class StubTokenizer:
+    def save_pretrained(self, path):
+        (Path(path) / 'tokenizer.json').write_text('{}')
+
+def test_concurrent_exports_leave_one_complete_directory(tmp_path):
+    target = tmp_path / 'google--flan-t5-base'
+    # Half-written by an export that died before the tokenizer was saved
+    target.mkdir()
+    (target / 'config.json').write_text('stale')
+
+    exports = [threading.Thread(target=OnnxModelRegistry._save_export,
+                                args=(target, StubModel(str(i)), StubTokenizer())) for i in range(6)]
+    for thread in exports:
+        thread.start()
+    for thread in exports:
+        thread.join()
+
+    assert os.listdir(tmp_path) == [target.name]
+    assert sorted(os.listdir(target)) == sorted([EXPORT_MARKER, 'config.json', 'decoder_model.onnx', 'tokenizer.json'])
+    # Every file comes from the same export
+    assert (target / 'config.json').read_text() == (target / 'decoder_model.onnx').read_text()
+
+def test_failed_export_leaves_nothing_behind(tmp_path):
+    target = tmp_path / 'model'
+    with pytest.raises(OSError):
+        OnnxModelRegistry._save_export(target, StubModel('0', fail=True), StubTokenizer())
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from LLM import model_registry
+from LLM.mock_interface import MockTokenizer
+from LLM.model_registry import ModelRegistry
+
+def test_int8_is_cpu_only():
+    with pytest.raises(ValueError):
+        ModelRegistry().get('google/flan-t5-base', 'cuda', 'int8')
+    with pytest.raises(ValueError):
+        ModelRegistry().get('google/flan-t5-base', 'cpu', 'float16')
+
+def test_int8_loads_and_generates_on_cpu(tmp_path, monkeypatch):
+    torch = pytest.importorskip('torch')
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    # A tiny randomly initialised T5 saved like a downloaded model
+    torch.manual_seed(0)
+    config = T5Config(vocab_size=64, d_model=32, d_ff=64, d_kv=16, num_layers=2, num_heads=2,
+                      decoder_start_token_id=0, pad_token_id=0, eos_token_id=1)
+    T5ForConditionalGeneration(config).save_pretrained(tmp_path)
+    monkeypatch.setattr(model_registry, 'load_tokenizer', lambda name: MockTokenizer())
+
+    registry = ModelRegistry()
+    handle = registry.get(str(tmp_path), 'cpu', 'int8')
+    assert handle.dtype == 'int8'
+    # The linear layers were swapped for dynamically quantized ones
+    quantized = [m for m in handle.model.modules() if type(m).__module__.startswith('torch.ao.nn.quantized')]
+    assert quantized
+    assert not any(type(m) is torch.nn.Linear for m in handle.model.modules())
+
+    input_ids = torch.tensor([[5, 9, 12, 30, 1]])
+    with torch.inference_mode():
+        output = handle.model.generate(input_ids=input_ids, max_length=12, min_length=12, do_sample=False)
+    assert output.shape == (1, 12)
+    assert registry.get(str(tmp_path), 'cpu', 'int8') is handle
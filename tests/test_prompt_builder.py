@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.llm_interface import MAX_INPUT_TOKENS
+from LLM.mock_interface import MockTokenizer
+from LLM.prompt_builder import PromptBuilder, EXAMPLES
+
+def words(count: int) -> str:
+    return " ".join(f"w{i}" for i in range(count))
+
+def test_short_chunk_gets_every_example():
+    builder = PromptBuilder(MockTokenizer(), MAX_INPUT_TOKENS)
+    text = "The Nile flows north into the Mediterranean."
+    ids, usage = builder.build(text, 3)
+    assert usage['examples'] == len(EXAMPLES)
+    assert usage['truncated_tokens'] == 0
+    assert usage['total_tokens'] == len(ids) <= MAX_INPUT_TOKENS
+    # Same tokens as the prompt written out as text
+    assert ids == builder.tokenizer.encode(builder.build_text(text, 3))
+
+def test_examples_give_way_to_the_chunk():
+    builder = PromptBuilder(MockTokenizer(), MAX_INPUT_TOKENS)
+    room = MAX_INPUT_TOKENS - builder.template_overhead(0, 3)
+    examples = []
+    for length in list(range(0, room, 25)) + [room]:
+        ids, usage = builder.build(words(length), 3)
+        assert usage['content_tokens'] == length
+        assert usage['truncated_tokens'] == 0
+        assert len(ids) <= MAX_INPUT_TOKENS
+        # Only the examples that fit, taken in order
+        assert ids == builder.tokenizer.encode(builder.build_text(words(length), 3, usage['examples']))
+        examples.append(usage['examples'])
+    assert examples == sorted(examples, reverse=True)
+    assert examples[0] == len(EXAMPLES) and examples[-1] == 0
+
+def test_oversize_chunk_is_truncated_to_the_window():
+    builder = PromptBuilder(MockTokenizer(), MAX_INPUT_TOKENS)
+    overhead = builder.template_overhead(0, 3)
+    ids, usage = builder.build(words(600), 3)
+    assert usage['examples'] == 0
+    assert usage['content_tokens'] == MAX_INPUT_TOKENS - overhead
+    assert usage['truncated_tokens'] == 600 - usage['content_tokens']
+    assert len(ids) == MAX_INPUT_TOKENS
+
+def test_batch_matches_single_builds():
+    builder = PromptBuilder(MockTokenizer(), MAX_INPUT_TOKENS, max_examples=2)
+    texts = [words(10), words(300), words(480)]
+    assert builder.build_batch(texts, [1, 2, 3]) == [builder.build(t, n) for t, n in zip(texts, [1, 2, 3])]
+    assert builder.build(words(10), 1)[1]['examples'] == 2
@@ -0,0 +1,54 @@
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from LLM.mock_interface import MockT5Interface
+from LLM.service import WorkerPool, QueueFull, JobError
+
+SAMPLE = (Path(__file__).parent.parent / 'sample.txt').read_text(encoding='utf-8')
+
+def wait_for(condition, seconds: float = 60.0):
+    deadline = time.time() + seconds
+    while not condition():
+        assert time.time() < deadline, "timed out waiting"
+        time.sleep(0.05)
+
+@pytest.fixture
+def slow_pool():
+    # A job takes a few seconds, long enough to act on it mid-way
+    pool = WorkerPool(1, {'llm_interface': MockT5Interface(latency=3.0)}, max_queue=0, timeout=30)
+    pool.start()
+    wait_for(lambda: pool.ready)
+    yield pool
+    pool.close()
+
+def test_crashed_worker_fails_its_job_and_is_replaced(slow_pool):
+    job = slow_pool.submit(SAMPLE, 3)
+    wait_for(lambda: job.id in slow_pool.running)
+    pid = slow_pool.processes[0].pid
+    os.kill(pid, signal.SIGKILL)
+
+    start = time.time()
+    with pytest.raises(JobError):
+        list(job.cards())
+    assert time.time() - start < 10
+    assert slow_pool.stats()['in_progress'] == 0
+
+    wait_for(lambda: slow_pool.ready)
+    assert slow_pool.processes[0].pid != pid
+    assert len(list(slow_pool.submit(SAMPLE, 3).cards())) == 3
+
+def test_abandoned_job_counts_until_done(slow_pool):
+    job = slow_pool.submit(SAMPLE, 3)
+    slow_pool.abandon(job)
+    # The worker is still busy with it
+    with pytest.raises(QueueFull):
+        slow_pool.submit(SAMPLE, 3)
+    wait_for(lambda: not slow_pool.jobs)
+    assert job.messages.empty()
+    assert len(list(slow_pool.submit(SAMPLE, 3).cards())) == 3
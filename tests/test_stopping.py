@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from LLM.mock_interface import MockTokenizer
+from LLM.stopping import CardProgress, CardStoppingCriteria
+
+DECK = ("Q: What does USA: the abbreviation stand for? A: United States of America. --- "
+        "Q: What does DNA: carry? A: Genetic information. --- "
+        "Q: Where is the FAQ: section? A: At the end of the manual. --- "
+        "Q: What is RNA? A: A nucleic acid. ---")
+
+QUESTIONS = {'whatdoesusatheabbreviationstandfor', 'whatdoesdnacarry', 'whereisthefaqsection', 'whatisrna'}
+
+def test_markers_inside_words_are_text():
+    progress = CardProgress(10)
+    progress.feed(DECK + " Q:")
+    assert progress.cards == 4
+    assert progress.seen == QUESTIONS
+
+def test_markers_split_across_steps():
+    # Every split point, including between "Q" and ":" and inside "---"
+    for cut in range(1, len(DECK)):
+        progress = CardProgress(10)
+        progress.feed(DECK[:cut])
+        progress.feed(DECK[cut:] + " Q:")
+        assert progress.cards == 4, cut
+        assert progress.seen == QUESTIONS, cut
+
+def test_markers_one_character_at_a_time():
+    progress = CardProgress(3)
+    for char in DECK:
+        if progress.feed(char):
+            break
+    assert progress.stop_reason == 'cards'
+    assert progress.seen == QUESTIONS - {'whatisrna'}
+
+def test_criteria_keep_spaces_between_steps():
+    tokenizer = MockTokenizer()
+    ids = tokenizer.encode(DECK, add_special_tokens=False)
+    stopping = CardStoppingCriteria(tokenizer, [4])
+    # One token per step, as generate calls it
+    assert not any(stopping.update([[token]]) for token in ids[:-1])
+    assert stopping.update([ids[-1:] + [tokenizer.eos_token_id]])
+    assert stopping.progress[0].text == tokenizer.decode(ids)
+    assert stopping.progress[0].seen == QUESTIONS - {'whatisrna'}
+    assert stopping.reasons == ['eos']